@@ -0,0 +1,103 @@
+"""
+基准测试公共工具：导入路径、计时统计、内存与 JSON 结果输出
+"""
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+class CountingSink(io.TextIOBase):
+    """只计数不保存的输出流，用于替代 stdout"""
+
+    def __init__(self) -> None:
+        self.chars = 0
+        self.writes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        self.writes += 1
+        return len(text)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """最近秩百分位数，values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_bytes() -> int:
+    """进程峰值常驻内存（字节）；平台不支持时返回 0"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KiB，macOS 为字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(path: Optional[str], suite: str, results: List[Dict[str, Any]]) -> None:
+    """以 JSON 输出结果（path 为空时输出到 stdout），便于不同版本之间对比"""
+    document = {"suite": suite, "environment": environment(), "results": results}
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if not path:
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"结果已写入 {path}", file=sys.stderr)
+
+
+def compare(
+    baseline_path: str, results: List[Dict[str, Any]], key: str, metric: str
+) -> Dict[str, float]:
+    """与基线 JSON 对比 metric，输出变化百分比到 stderr，并返回 {key: 变化百分比}"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {item[key]: item for item in json.load(f).get("results", [])}
+    changes: Dict[str, float] = {}
+    for item in results:
+        old = baseline.get(item[key], {}).get(metric)
+        new = item.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        changes[item[key]] = change
+        print(f"{item[key]:<40} {metric}: {old:.6g} -> {new:.6g} ({change:+.1f}%)", file=sys.stderr)
+    return changes
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+destination.write 端到端吞吐基准
+
+为合成的 catalog（点 stream 与边 stream）生成 Airbyte RECORD / STATE JSONL，
+可配置主键基数、主键倾斜（Zipf 指数）与 stream 交错方式，经 destination.write
+写入可替换的后端，报告 rows/s、bytes/s、批次延迟 p50/p99 与峰值 RSS：
+
+    # 在内存后端上（每条语句 0.5ms 延迟）估算某个配置的吞吐
+    python benchmarks/bench_destination.py run --records 50000 --batch-size 64 --latency 0.0005
+
+    # 只生成数据，供其它工具或真实集群使用
+    python benchmarks/bench_destination.py generate --records 10000 > records.jsonl
+
+    # 对真实集群运行（连接配置来自 JSON 文件，写入会真正落库）
+    python benchmarks/bench_destination.py run --backend cluster --config config.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from _harness import CountingSink, compare, peak_rss_bytes, percentile, write_results
+
+from yueshu_airbyte_connector import common, destination
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+from yueshu_airbyte_connector.metrics import get_registry
+from yueshu_airbyte_connector.nebula_client import NebulaClient
+
+INTERLEAVE_MODES = ("round_robin", "blocks", "random")
+
+
+# ============================================================================
+# 合成数据
+# ============================================================================
+
+def build_catalog(vertex_streams: int, edge_streams: int, properties: int) -> Dict[str, Any]:
+    """点 stream v{i} 写入标签 V{i}；边 stream e{j} 连接 V{j % n} 与 V{(j + 1) % n}"""
+    props = json.dumps([{"source_field": f"p{k}", "dest_field": f"p{k}"} for k in range(properties)])
+    streams = []
+    for i in range(vertex_streams):
+        streams.append(
+            {
+                "stream": {"name": f"v{i}"},
+                "config": {
+                    "mapping_type": "vertex",
+                    "label": f"V{i}",
+                    "primary_key_source": "id",
+                    "properties_mapping": props,
+                },
+            }
+        )
+    for j in range(edge_streams):
+        streams.append(
+            {
+                "stream": {"name": f"e{j}"},
+                "config": {
+                    "mapping_type": "edge",
+                    "label": f"E{j}",
+                    "src_vertex_label": f"V{j % vertex_streams}",
+                    "primary_key_source": "src",
+                    "dst_vertex_label": f"V{(j + 1) % vertex_streams}",
+                    "dst_primary_key_source": "dst",
+                    "properties_mapping": props,
+                },
+            }
+        )
+    return {"streams": streams}
+
+
+class KeySampler:
+    """在 [0, cardinality) 中按 Zipf(skew) 抽取主键；skew=0 为均匀分布"""
+
+    def __init__(self, rng: random.Random, cardinality: int, skew: float) -> None:
+        self._rng = rng
+        self._keys = range(max(cardinality, 1))
+        self._cum = (
+            list(accumulate(1.0 / (k + 1) ** skew for k in self._keys)) if skew > 0 else None
+        )
+
+    def __call__(self) -> int:
+        if self._cum is None:
+            return self._rng.randrange(len(self._keys))
+        return self._rng.choices(self._keys, cum_weights=self._cum)[0]
+
+
+class Expected:
+    """生成数据应写入的不同点（label, id）与边（label, src, dst）"""
+
+    def __init__(self) -> None:
+        self.nodes: Set[Tuple[str, int]] = set()
+        self.edges: Set[Tuple[str, int, int]] = set()
+
+
+def generate_messages(
+    catalog: Dict[str, Any],
+    records: int,
+    cardinality: int,
+    skew: float,
+    interleave: str,
+    state_every: int,
+    properties: int,
+    seed: int,
+    expected: Optional[Expected] = None,
+) -> Iterator[str]:
+    """
+    按需生成 JSONL 行（不在内存中物化全部数据）
+
+    边的端点从对应点 stream 已输出的主键中抽取，保证每条边都能匹配到端点；
+    端点 stream 尚无记录时改为输出该点 stream 的一条记录。
+    """
+    rng = random.Random(seed)
+    names = [s["stream"]["name"] for s in catalog["streams"]]
+    sample = KeySampler(rng, cardinality, skew)
+    stream_of = {
+        s["config"]["label"]: s["stream"]["name"]
+        for s in catalog["streams"] if s["config"]["mapping_type"] == "vertex"
+    }
+    endpoints = {
+        s["stream"]["name"]: (stream_of[s["config"]["src_vertex_label"]], stream_of[s["config"]["dst_vertex_label"]])
+        for s in catalog["streams"] if s["config"]["mapping_type"] == "edge"
+    }
+    # 点 stream -> 已输出的不同主键（按首次输出顺序）
+    emitted: Dict[str, List[int]] = {name: [] for name in stream_of.values()}
+    seen: Dict[str, Set[int]] = {name: set() for name in stream_of.values()}
+
+    def pick(stream: str) -> int:
+        keys = emitted[stream]
+        return keys[sample() % len(keys)]
+
+    def record(stream: str) -> str:
+        data: Dict[str, Any] = {f"p{k}": f"value-{rng.randrange(10**6)}" for k in range(properties)}
+        ends = endpoints.get(stream)
+        if ends is not None:
+            missing = [end for end in ends if not emitted[end]]
+            if missing:
+                stream, ends = missing[0], None
+        if ends is None:
+            key = data["id"] = sample()
+            if key not in seen[stream]:
+                seen[stream].add(key)
+                emitted[stream].append(key)
+            if expected is not None:
+                expected.nodes.add((stream, key))
+        else:
+            data["src"] = pick(ends[0])
+            data["dst"] = pick(ends[1])
+            if expected is not None:
+                expected.edges.add((stream, data["src"], data["dst"]))
+        return json.dumps({"type": "RECORD", "record": {"stream": stream, "data": data}})
+
+    n = len(names)
+    if interleave == "blocks":
+        order: Iterator[str] = (
+            name for i, name in enumerate(names) for _ in range(records // n + (i < records % n))
+        )
+    elif interleave == "random":
+        order = (rng.choice(names) for _ in range(records))
+    else:
+        order = (names[i % n] for i in range(records))
+
+    for i, stream in enumerate(order, 1):
+        yield record(stream)
+        if state_every and i % state_every == 0:
+            yield json.dumps({"type": "STATE", "state": {"data": {"offset": i}}})
+
+
+# ============================================================================
+# 运行
+# ============================================================================
+
+class _BatchTimer:
+    """记录 destination 写入缓冲每次 execute_many 的耗时"""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self._original = NebulaClient.execute_many
+
+    def __enter__(self) -> "_BatchTimer":
+        original = self._original
+        latencies = self.latencies
+
+        def execute_many(client: NebulaClient, queries: Any, *args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return original(client, queries, *args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+        NebulaClient.execute_many = execute_many  # type: ignore[assignment]
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        NebulaClient.execute_many = self._original  # type: ignore[assignment]
+
+
+def _register_catalog(backend: MemoryBackend, catalog: Dict[str, Any], properties: int) -> None:
+    """在内存后端上按 catalog 定义点/边类型（点以 id 为主键）"""
+    props = [f"p{k}" for k in range(properties)]
+    for s in catalog["streams"]:
+        cfg = s["config"]
+        if cfg["mapping_type"] == "vertex":
+            backend.add_node_type(cfg["label"], ["id"] + props, primary_key=["id"])
+        else:
+            backend.add_edge_type(cfg["label"], props)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    catalog = build_catalog(args.vertex_streams, args.edge_streams, args.properties)
+    os.environ["AIRBYTE_CATALOG"] = json.dumps(catalog)
+    config: Dict[str, Any] = {"hosts": ["bench:9669"], "username": "root", "password": "root"}
+    client_factory = None
+    backend: Optional[MemoryBackend] = None
+    if args.backend == "cluster":
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    else:
+        backend = MemoryBackend("bench", latency=args.latency)
+        _register_catalog(backend, catalog, args.properties)
+        client_factory = backend.factory
+    config.update(
+        batch_size=args.batch_size,
+        max_sessions=args.max_sessions,
+        execution_mode=args.execution_mode,
+        insert_mode=args.insert_mode,
+    )
+
+    expected = Expected()
+    lines = generate_messages(
+        catalog, args.records, args.cardinality, args.skew,
+        args.interleave, args.state_every, args.properties, args.seed, expected,
+    )
+    sink = CountingSink()
+    common.install_emitter(common.BufferedEmitter(stream=sink), handle_signals=False)
+    start = time.perf_counter()
+    try:
+        with _BatchTimer() as timer:
+            destination.write(config, lines, client_factory=client_factory)
+    finally:
+        common.uninstall_emitter()
+    elapsed = time.perf_counter() - start
+    summary = get_registry().summary()
+    result = {
+        "name": args.name or f"{args.backend}/{args.execution_mode}/batch{args.batch_size}",
+        "records": summary["records"],
+        "bytes": summary["bytes"],
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(summary["records"] / elapsed, 1),
+        "bytes_per_second": round(summary["bytes"] / elapsed, 1),
+        "batches": len(timer.latencies),
+        "batch_p50_seconds": round(percentile(timer.latencies, 0.5), 6),
+        "batch_p99_seconds": round(percentile(timer.latencies, 0.99), 6),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "output_chars": sink.chars,
+        "stages": summary["stages"],
+        "events": summary["events"],
+        "parameters": {
+            k: getattr(args, k)
+            for k in (
+                "vertex_streams", "edge_streams", "properties", "cardinality", "skew",
+                "interleave", "state_every", "batch_size", "max_sessions",
+                "execution_mode", "insert_mode", "latency", "seed",
+            )
+        },
+    }
+    if backend is not None:
+        result["nodes"] = backend.node_count()
+        result["edges"] = backend.edge_count()
+        result["expected_nodes"] = len(expected.nodes)
+        result["expected_edges"] = len(expected.edges)
+    if args.execution_mode == "asyncio":
+        # asyncio 模式逐条执行，不经过 execute_many
+        result["batches"] = 0
+    return result
+
+
+def check_counts(results: List[Dict[str, Any]]) -> List[str]:
+    """返回后端点/边数与生成数据不一致的结果名称（cluster 后端不检查）"""
+    mismatched = []
+    for result in results:
+        if "expected_nodes" not in result:
+            continue
+        if (result["nodes"], result["edges"]) != (result["expected_nodes"], result["expected_edges"]):
+            print(
+                f"警告: {result['name']} 写入 {result['nodes']} 个点、{result['edges']} 条边，"
+                f"期望 {result['expected_nodes']} 个点、{result['expected_edges']} 条边",
+                file=sys.stderr,
+            )
+            mismatched.append(result["name"])
+    return mismatched
+
+
+def _add_data_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--records", type=int, default=20000, help="RECORD 总数")
+    parser.add_argument("--vertex-streams", type=int, default=2)
+    parser.add_argument("--edge-streams", type=int, default=1)
+    parser.add_argument("--properties", type=int, default=4, help="每条记录的属性数")
+    parser.add_argument("--cardinality", type=int, default=100000, help="主键基数")
+    parser.add_argument("--skew", type=float, default=0.0, help="主键 Zipf 指数，0 为均匀分布")
+    parser.add_argument("--interleave", choices=INTERLEAVE_MODES, default="round_robin")
+    parser.add_argument("--state-every", type=int, default=1000, help="每 N 条 RECORD 插入一条 STATE，0 表示不插入")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="输出合成 JSONL 与对应的 catalog")
+    _add_data_arguments(gen)
+    gen.add_argument("--catalog-out", help="catalog JSON 输出路径（供 AIRBYTE_CATALOG 使用）")
+
+    bench = sub.add_parser("run", help="经 destination.write 写入并报告吞吐")
+    _add_data_arguments(bench)
+    bench.add_argument("--backend", choices=("memory", "cluster"), default="memory")
+    bench.add_argument("--config", help="cluster 后端的连接配置 JSON")
+    bench.add_argument("--latency", type=float, default=0.0, help="内存后端每条语句的延迟（秒）")
+    bench.add_argument("--batch-size", type=int, default=1)
+    bench.add_argument("--max-sessions", type=int, default=8)
+    bench.add_argument("--execution-mode", choices=("sync", "asyncio"), default="sync")
+    bench.add_argument("--insert-mode", default="append")
+    bench.add_argument("--name", help="结果名称（默认由后端与配置生成）")
+    bench.add_argument("--output", help="结果 JSON 路径（默认输出到 stdout）")
+    bench.add_argument("--baseline", help="对比的基线结果 JSON")
+    args = parser.parse_args(argv)
+
+    catalog = build_catalog(args.vertex_streams, args.edge_streams, args.properties)
+    if args.command == "generate":
+        if args.catalog_out:
+            with open(args.catalog_out, "w", encoding="utf-8") as f:
+                json.dump(catalog, f, ensure_ascii=False)
+        out = sys.stdout
+        for line in generate_messages(
+            catalog, args.records, args.cardinality, args.skew,
+            args.interleave, args.state_every, args.properties, args.seed,
+        ):
+            out.write(line + "\n")
+        return
+
+    if args.backend == "cluster" and not args.config:
+        parser.error("--backend cluster 需要 --config")
+    results = [run(args)]
+    write_results(args.output, "destination", results)
+    if args.baseline:
+        compare(args.baseline, results, "name", "rows_per_second")
+    mismatched = check_counts(results)
+    if mismatched:
+        sys.exit(f"后端写入数量与生成数据不一致: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
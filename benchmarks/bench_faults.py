@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+故障注入下的写入吞吐与弹性基准
+
+在 MemoryBackend 上用 FaultInjector 注入故障，通过 NebulaClient.execute_many
+分批写入点，对比各场景的吞吐、批次延迟、重试 / 故障转移次数与最终落库的
+记录数：
+
+    python benchmarks/bench_faults.py --records 5000 --output faults.json
+    python benchmarks/bench_faults.py --scenario drop_1pct --scenario slow_host
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from _harness import compare, percentile, write_results
+
+from yueshu_airbyte_connector.faults import FaultInjector, FaultRule, fixed, lognormal
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+from yueshu_airbyte_connector.metrics import reset_registry
+from yueshu_airbyte_connector.nebula_client import NebulaClient
+
+HOSTS = ["h1:9669", "h2:9669", "h3:9669"]
+
+
+def _scenarios(base_latency: float) -> Dict[str, List[FaultRule]]:
+    base = FaultRule(latency=fixed(base_latency))
+    return {
+        "baseline": [base],
+        "reject_1pct": [base, FaultRule(statements=("vertex",), reject_rate=0.01)],
+        "drop_1pct": [base, FaultRule(statements=("vertex",), drop_rate=0.01)],
+        "slow_host": [base, FaultRule(host="h2:*", latency=lognormal(base_latency * 20, 0.8))],
+        "host_down": [base, FaultRule(host="h3:*", drop_rate=1.0, connect_error_rate=1.0)],
+    }
+
+
+def run_scenario(
+    name: str,
+    rules: List[FaultRule],
+    records: int,
+    batch_size: int,
+    max_sessions: int,
+    seed: int,
+    keepalive: float,
+) -> Dict[str, Any]:
+    backend = MemoryBackend("bench")
+    backend.add_node_type("Item", ["id", "name"], primary_key=["id"])
+    injector = FaultInjector(backend.factory, rules, seed=seed)
+    metrics = reset_registry("benchmark")
+    client = NebulaClient(
+        HOSTS, "root", "root",
+        max_sessions=max_sessions,
+        keepalive_interval=keepalive,
+        slow_statement_threshold=0,
+        client_factory=injector.factory,
+    )
+    client.connect()
+    batch_latency: List[float] = []
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for offset in range(0, records, batch_size):
+            queries = [
+                f'INSERT OR IGNORE (@Item{{id: {i}, name: "item-{i}"}})'
+                for i in range(offset, min(offset + batch_size, records))
+            ]
+            batch_start = time.perf_counter()
+            results = client.execute_many(queries, rows=1)
+            batch_latency.append(time.perf_counter() - batch_start)
+            failed += sum(1 for r in results if not r.ok)
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - start
+    summary = metrics.summary()
+    events = summary["events"]
+    stats = injector.stats
+    return {
+        "scenario": name,
+        "records": records,
+        "written": backend.node_count("Item"),
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 4),
+        "statements_per_second": round(records / elapsed, 1),
+        "batch_p50_seconds": round(percentile(batch_latency, 0.5), 6),
+        "batch_p99_seconds": round(percentile(batch_latency, 0.99), 6),
+        "retries": sum(summary["retries"].values()),
+        "host_down": events.get("host_down", 0),
+        "host_ejected": events.get("host_ejected", 0),
+        "injected": {
+            "rejected": stats.rejected,
+            "dropped": stats.dropped,
+            "connect_errors": stats.connect_errors,
+            "latency_seconds": round(stats.injected_latency, 4),
+        },
+        "by_host": stats.by_host,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-sessions", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0005, help="每条语句的基础延迟（秒）")
+    parser.add_argument("--keepalive", type=float, default=1.0, help="会话 keepalive / host 探测间隔（秒）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", help="只运行指定场景（可重复）")
+    parser.add_argument("--output", help="结果 JSON 路径（默认输出到 stdout）")
+    parser.add_argument("--baseline", help="对比的基线结果 JSON")
+    args = parser.parse_args(argv)
+
+    scenarios = _scenarios(args.latency)
+    names = args.scenario or list(scenarios)
+    results = [
+        run_scenario(
+            name, scenarios[name], args.records, args.batch_size,
+            args.max_sessions, args.seed, args.keepalive,
+        )
+        for name in names
+    ]
+    write_results(args.output, "faults", results)
+    if args.baseline:
+        compare(args.baseline, results, "scenario", "statements_per_second")
+
+
+if __name__ == "__main__":
+    main()
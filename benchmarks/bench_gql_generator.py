@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+gql_generator 热点函数的微基准
+
+覆盖 generate_vertex_gql_with_schema、generate_edge_gql_with_schema、
+generate_gql_from_mapping、_format_value_by_type、destination._apply_table_insert
+以及写入路径实际使用的编译模板 render，在四种记录形状上测量每条记录的耗时：
+- narrow：3 个字段
+- wide：48 个混合类型字段
+- unicode：中文 / emoji / 引号较多的字符串字段
+- dates：date / datetime / timestamp 字段为主
+
+    python benchmarks/bench_gql_generator.py --output gql.json
+    python benchmarks/bench_gql_generator.py --baseline gql.json --max-regression 10
+"""
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from _harness import compare, write_results
+
+from yueshu_airbyte_connector.destination import _apply_table_insert
+from yueshu_airbyte_connector.gql_generator import (
+    _format_value_by_type,
+    compile_vertex_template,
+    generate_edge_gql_with_schema,
+    generate_gql_from_mapping,
+    generate_vertex_gql_with_schema,
+)
+from yueshu_airbyte_connector.schema_reader import EdgeSchema, PropertySchema, VertexSchema
+
+_UNICODE_WORDS = ["图数据库", "悦数", "连接器", "吞吐", "日志", "🚀", "数据😀", 'say "hi"', "naïve", "Ωmega"]
+_WIDE_TYPES = ["int64", "double", "string", "bool"]
+
+# 形状 -> [(字段名, 类型)]
+Shape = List[Tuple[str, str]]
+
+
+def _shapes() -> Dict[str, Shape]:
+    return {
+        "narrow": [("id", "int64"), ("name", "string"), ("score", "double")],
+        "wide": [("id", "int64")] + [(f"f{i}", _WIDE_TYPES[i % 4]) for i in range(47)],
+        "unicode": [("id", "int64")] + [(f"text{i}", "string") for i in range(8)],
+        "dates": [("id", "int64")]
+        + [(f"d{i}", "date") for i in range(2)]
+        + [(f"dt{i}", "datetime") for i in range(2)]
+        + [(f"ts{i}", "timestamp") for i in range(2)],
+    }
+
+
+def _value(rng: random.Random, name: str, nebula_type: str, i: int) -> Any:
+    if name == "id":
+        return i
+    if nebula_type == "int64":
+        return rng.randint(-10**9, 10**9)
+    if nebula_type == "double":
+        return rng.random() * 1000
+    if nebula_type == "bool":
+        return rng.random() < 0.5
+    if nebula_type == "date":
+        return f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if nebula_type == "datetime":
+        return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:30:00"
+    if nebula_type == "timestamp":
+        return rng.randint(1_600_000_000, 1_800_000_000)
+    if name.startswith("text"):
+        return " ".join(rng.choice(_UNICODE_WORDS) for _ in range(rng.randint(2, 8)))
+    return f"value-{rng.randint(0, 10**6)}"
+
+
+def _records(shape: Shape, count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        record = {name: _value(rng, name, t, i) for name, t in shape}
+        record["src_id"] = i
+        record["dst_id"] = i + 1
+        record["rank"] = i % 7
+        records.append(record)
+    return records
+
+
+def _cases(shape: Shape) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    props = [PropertySchema(name, t) for name, t in shape]
+    field_mapping = {name: name for name, _ in shape}
+    vertex = VertexSchema("Bench", props)
+    edge = EdgeSchema("BenchEdge", [p for p in props if p.name != "id"])
+    edge_mapping = {"src_id": "_src.id", "dst_id": "_dst.id", "rank": "_ranking"}
+    edge_mapping.update({name: name for name, _ in shape if name != "id"})
+    transforms = {"date": "date", "datetime": "datetime", "timestamp": "timestamp"}
+    mapping_config = {
+        "mapping": {
+            "type": "vertex",
+            "label": "Bench",
+            "primary_key": {"source_field": "id", "dest_field": "id"},
+            "properties": [
+                {"source_field": name, "dest_field": name, "transform": transforms.get(t, "")}
+                for name, t in shape if name != "id"
+            ],
+        }
+    }
+    template = compile_vertex_template(vertex, field_mapping, "INSERT OR IGNORE", table=True)
+    typed = [(name, t) for name, t in shape]
+    statement = generate_vertex_gql_with_schema(
+        vertex, field_mapping, _records(shape, 1, 0)[0]
+    )
+
+    def format_all(record: Dict[str, Any]) -> None:
+        for name, t in typed:
+            _format_value_by_type(record[name], t)
+
+    return {
+        "generate_vertex_gql_with_schema": lambda r: generate_vertex_gql_with_schema(vertex, field_mapping, r),
+        "generate_edge_gql_with_schema": lambda r: generate_edge_gql_with_schema(edge, "Bench", "Bench", edge_mapping, r),
+        "generate_gql_from_mapping": lambda r: generate_gql_from_mapping(mapping_config, r),
+        "compiled_vertex_template": template.render,
+        "_format_value_by_type": format_all,
+        "_apply_table_insert": lambda r: _apply_table_insert(statement, "append"),
+    }
+
+
+def measure(func: Callable[[Dict[str, Any]], Any], records: List[Dict[str, Any]], repeat: int) -> List[float]:
+    """每轮遍历全部记录，返回每轮的每条记录耗时（纳秒）；计时期间关闭 GC，与 timeit 一致"""
+    for record in records[:100]:  # 预热
+        func(record)
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for record in records:
+                func(record)
+            timings.append((time.perf_counter_ns() - start) / len(records))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return timings
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000, help="每种形状的记录数")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--shape", action="append", help="只运行指定形状（可重复）")
+    parser.add_argument("--function", action="append", help="只运行指定函数（可重复）")
+    parser.add_argument("--output", help="结果 JSON 路径（默认输出到 stdout）")
+    parser.add_argument("--baseline", help="对比的基线结果 JSON")
+    parser.add_argument(
+        "--max-regression", type=float,
+        help="与基线相比 ns_per_record_min 增加超过该百分比时以非零状态退出",
+    )
+    args = parser.parse_args(argv)
+
+    shapes = _shapes()
+    results = []
+    for shape_name in args.shape or list(shapes):
+        shape = shapes[shape_name]
+        records = _records(shape, args.records, args.seed)
+        for func_name, func in _cases(shape).items():
+            if args.function and func_name not in args.function:
+                continue
+            timings = measure(func, records, args.repeat)
+            sample = func(records[0])
+            results.append(
+                {
+                    "case": f"{func_name}/{shape_name}",
+                    "function": func_name,
+                    "shape": shape_name,
+                    "fields": len(shape),
+                    "records": len(records),
+                    "repeat": args.repeat,
+                    "ns_per_record_min": round(min(timings), 1),
+                    "ns_per_record_median": round(statistics.median(timings), 1),
+                    "statement_bytes": len(sample.encode("utf-8")) if isinstance(sample, str) else None,
+                }
+            )
+            print(f"{results[-1]['case']:<50} {min(timings):>12.0f} ns/record", file=sys.stderr)
+
+    write_results(args.output, "gql_generator", results)
+    if args.baseline:
+        changes = compare(args.baseline, results, "case", "ns_per_record_min")
+        regressions = {k: v for k, v in changes.items() if args.max_regression is not None and v > args.max_regression}
+        if regressions:
+            print(f"性能回退超过 {args.max_regression}%: {sorted(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
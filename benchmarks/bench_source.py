@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+source.read 基准：合成结果集的转换与输出
+
+用合成的 ResultSet（可配置行数与列类型：int / double / string / bool / node /
+edge / path）替代驱动返回值，运行 source.read，stdout 替换为只计数的输出流，报告
+rows/s、输出字节数、峰值 RSS 与（可选）tracemalloc 峰值：
+
+    python benchmarks/bench_source.py --queries 20 --rows 5000 --columns int,string,node
+    python benchmarks/bench_source.py --columns node,edge,path --tracemalloc --output source.json
+
+--page-size 为读查询配置 page_size，经 NebulaClient.execute_iter 以 SKIP/LIMIT 分页读取
+（查询按 element_id 排序，分页要求 ORDER BY），每页输出一条 RECORD；与不分页的结果对比转换开销与 tracemalloc 峰值。
+"""
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from _harness import CountingSink, compare, peak_rss_bytes, write_results
+
+from yueshu_airbyte_connector import common, source
+from yueshu_airbyte_connector.metrics import get_registry
+from yueshu_airbyte_connector.nebula_client import split_window
+
+COLUMN_TYPES = ("int", "double", "string", "bool", "node", "edge", "path")
+
+
+def _node(rng: random.Random) -> Dict[str, Any]:
+    vid = rng.randrange(10**9)
+    return {
+        "id": vid,
+        "labels": ["Account"],
+        "properties": {"address": f"0x{vid:040x}", "balance": rng.random() * 1e6, "active": True},
+    }
+
+
+def _edge(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "src": rng.randrange(10**9),
+        "dst": rng.randrange(10**9),
+        "label": "Transfer",
+        "rank": rng.randrange(100),
+        "properties": {"amount": rng.random() * 1000, "ts": "2024-06-01T12:00:00"},
+    }
+
+
+def _path(rng: random.Random, hops: int = 3) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = [_node(rng)]
+    for _ in range(hops):
+        items.append(_edge(rng))
+        items.append(_node(rng))
+    return items
+
+
+_GENERATORS: Dict[str, Callable[[random.Random], Any]] = {
+    "int": lambda rng: rng.randrange(-10**12, 10**12),
+    "double": lambda rng: rng.random() * 1e6,
+    "string": lambda rng: f"text-{rng.randrange(10**9)}-图数据库",
+    "bool": lambda rng: rng.random() < 0.5,
+    "node": _node,
+    "edge": _edge,
+    "path": _path,
+}
+
+
+class SyntheticResultSet:
+    """驱动 ResultSet 的替身：行在构造时生成，与驱动一次性返回完整结果的行为一致"""
+
+    is_succeeded = True
+    error_msg = None
+
+    def __init__(self, columns: List[str], rows: int, seed: int) -> None:
+        rng = random.Random(seed)
+        self._columns = {
+            f"{kind}{i}": [_GENERATORS[kind](rng) for _ in range(rows)]
+            for i, kind in enumerate(columns)
+        }
+        self._rows = rows
+
+    def size(self) -> int:
+        return self._rows
+
+    def as_primitive_by_column(self) -> Dict[str, List[Any]]:
+        return self._columns
+
+    def as_primitive_by_row(self) -> List[Dict[str, Any]]:
+        names = list(self._columns)
+        return [{name: self._columns[name][i] for name in names} for i in range(self._rows)]
+
+    def window(self, skip: int, limit: Optional[int]) -> "SyntheticResultSet":
+        """SKIP/LIMIT 分页查询的结果：共享已生成的值"""
+        end = self._rows if limit is None else min(self._rows, skip + limit)
+        view = SyntheticResultSet([], 0, 0)
+        view._columns = {name: values[skip:end] for name, values in self._columns.items()}
+        view._rows = max(end - skip, 0)
+        return view
+
+
+class SyntheticClient:
+    """
+    读查询返回预先生成的合成结果集
+
+    结果集在计时开始前生成并被所有查询复用，计时与内存只反映结果转换与输出，
+    不包含合成数据本身的生成。
+    """
+
+    def __init__(self, columns: List[str], rows: int, latency: float, seed: int = 1) -> None:
+        self._result = SyntheticResultSet(columns, rows, seed)
+        self._empty = SyntheticResultSet([], 0, 0)
+        self._latency = latency
+
+    def factory(self, hosts: List[str], username: str, password: str) -> "SyntheticClient":
+        return self
+
+    def execute(self, query: str) -> Any:
+        if self._latency:
+            time.sleep(self._latency)
+        if not query.lstrip().upper().startswith("MATCH"):
+            return self._empty
+        _, skip, limit = split_window(query)
+        if skip or (limit is not None and limit < self._result.size()):
+            return self._result.window(skip, limit)
+        return self._result
+
+    def close(self) -> None:
+        pass
+
+
+def run(args: argparse.Namespace, columns: List[str]) -> Dict[str, Any]:
+    catalog = {
+        "streams": [
+            {
+                "stream": {"name": f"q{i}"},
+                "config": {
+                    "read_query": f"MATCH (n) RETURN n ORDER BY element_id(n) LIMIT {args.rows}",
+                    "page_size": args.page_size,
+                },
+            }
+            for i in range(args.queries)
+        ]
+    }
+    os.environ["AIRBYTE_CATALOG"] = json.dumps(catalog)
+    client = SyntheticClient(columns, args.rows, args.latency)
+    sink = CountingSink()
+    config = {
+        "hosts": ["bench:9669"],
+        "username": "root",
+        "password": "root",
+        "execution_mode": args.execution_mode,
+    }
+    common.install_emitter(common.BufferedEmitter(stream=sink), handle_signals=False)
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        source.read(config, client_factory=client.factory)
+    finally:
+        elapsed = time.perf_counter() - start
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        if args.tracemalloc:
+            tracemalloc.stop()
+        common.uninstall_emitter()
+    summary = get_registry().summary()
+    rows = args.queries * args.rows
+    path = f"paged{args.page_size}" if args.page_size else "payload"
+    return {
+        "name": f"{path}/{args.execution_mode}/{'+'.join(columns)}",
+        "path": path,
+        "columns": columns,
+        "queries": args.queries,
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1),
+        "output_chars": sink.chars,
+        "output_chars_per_second": round(sink.chars / elapsed, 1),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "tracemalloc_peak_bytes": traced_peak,
+        "convert_seconds": summary["stages"].get("convert", {}).get("seconds", 0.0),
+        "emit_seconds": summary["stages"].get("emit", {}).get("seconds", 0.0),
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=10, help="读查询（stream）数量")
+    parser.add_argument("--rows", type=int, default=2000, help="每个结果集的行数")
+    parser.add_argument(
+        "--columns", action="append",
+        help=f"逗号分隔的列类型组合（{', '.join(COLUMN_TYPES)}），可重复以运行多组",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="每条语句的模拟延迟（秒）")
+    parser.add_argument("--execution-mode", choices=("sync", "asyncio"), default="sync")
+    parser.add_argument("--page-size", type=int, default=0, help="读查询分页的每页行数（0 表示不分页）")
+    parser.add_argument("--tracemalloc", action="store_true", help="记录 Python 分配峰值（会降低吞吐）")
+    parser.add_argument("--output", help="结果 JSON 路径（默认输出到 stdout）")
+    parser.add_argument("--baseline", help="对比的基线结果 JSON")
+    args = parser.parse_args(argv)
+
+    combos = args.columns or ["int,double,string", "node", "edge", "path"]
+    results = []
+    for combo in combos:
+        columns = [c.strip() for c in combo.split(",") if c.strip()]
+        unknown = [c for c in columns if c not in _GENERATORS]
+        if unknown:
+            parser.error(f"未知列类型: {unknown}")
+        results.append(run(args, columns))
+    write_results(args.output, "source", results)
+    if args.baseline:
+        compare(args.baseline, results, "name", "rows_per_second")
+
+
+if __name__ == "__main__":
+    main()
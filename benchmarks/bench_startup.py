@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CLI 启动时间基准
+
+Airbyte 会频繁以新进程调用 spec / check，启动开销（解释器 + 导入）直接计入
+每次调用。本脚本多次以子进程运行 `cli spec`，报告墙钟时间的中位数与 p90，
+以及 `-X importtime` 统计的连接器包累计导入耗时；超过 --budget-ms 时以非零
+状态退出，可在 CI 中守住启动预算：
+
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 150
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from _harness import ROOT, compare, percentile, write_results
+
+_IMPORT_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _command(connector: str, command: str) -> List[str]:
+    return [
+        sys.executable, "-c",
+        "import sys; from yueshu_airbyte_connector import cli; "
+        f"sys.argv = ['yueshu-airbyte', '--connector-type', '{connector}', '{command}']; cli.main()",
+    ]
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    for name in ("YUESHU_PROFILE", "YUESHU_TRACE_FILE"):
+        env.pop(name, None)
+    return env
+
+
+def wall_times(connector: str, command: str, runs: int) -> List[float]:
+    env = _env()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(_command(connector, command), env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def import_profile(connector: str, command: str) -> Dict[str, Any]:
+    """-X importtime 的顶层模块累计耗时（微秒），以及导入的包内模块"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + _command(connector, command)[1:],
+        env=_env(), check=True, capture_output=True, text=True,
+    )
+    total = 0
+    package = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(1)), match.group(2), match.group(3)
+        if len(indent) == 1:  # 顶层导入
+            total += cumulative
+        if name.startswith("yueshu_airbyte_connector"):
+            package.append(name)
+    return {"import_us": total, "package_modules": sorted(package)}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--command", default="spec", help="测量的 CLI 命令（默认 spec）")
+    parser.add_argument("--budget-ms", type=float, help="墙钟时间中位数预算（毫秒），超出时以非零状态退出")
+    parser.add_argument("--output", help="结果 JSON 路径（默认输出到 stdout）")
+    parser.add_argument("--baseline", help="对比的基线结果 JSON")
+    args = parser.parse_args(argv)
+
+    wall_times("source", "spec", 1)  # 预热文件系统缓存与 .pyc
+    results = []
+    for connector in ("source", "destination"):
+        timings = wall_times(connector, args.command, args.runs)
+        result = {
+            "name": f"{connector}/{args.command}",
+            "runs": args.runs,
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "p90_ms": round(percentile(timings, 0.9) * 1000, 2),
+            "min_ms": round(min(timings) * 1000, 2),
+        }
+        result.update(import_profile(connector, args.command))
+        results.append(result)
+        print(f"{result['name']:<24} median {result['median_ms']} ms", file=sys.stderr)
+
+    write_results(args.output, "startup", results)
+    if args.baseline:
+        compare(args.baseline, results, "name", "median_ms")
+    if args.budget_ms is not None:
+        over = [r["name"] for r in results if r["median_ms"] > args.budget_ms]
+        if over:
+            print(f"启动时间超出预算 {args.budget_ms} ms: {over}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+AsyncNebulaClient - NebulaClient 的 asyncio 版本
+
+优先使用 nebula5_python 的 NebulaAsyncClient（驱动自带会话池）；
+驱动不可用、指定了 client_factory 或配置了按 host 的限流时，退化为由线程池
+执行同步 NebulaClient 的 shim。两种实现都用信号量限制在途语句数，使数百条
+语句可以在单个事件循环上复用，而无需为每条语句占用一个线程。
+
+驱动的会话池自行选择 host，无法在选定 host 之前应用按 host 的限制
+（rate_limit_host_statements / max_in_flight_per_host），也没有 SessionPool 的
+host 选择、驱逐与故障转移；为使同一份配置在两种模式下行为一致，配置了按 host
+的限制时始终使用 shim 模式。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .common import ConnectionConfig, adopt_invocation, current_invocation, log
+from .metrics import get_registry
+from .nebula_client import (
+    DEFAULT_MAX_SESSIONS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SLOW_STATEMENT_THRESHOLD,
+    ClientFactory,
+    NebulaClient,
+    NebulaClientError,
+    NebulaTimeoutError,
+    QueryPager,
+    SlowStatementWatchdog,
+    _check_result,
+    is_timeout_error,
+    rate_limits_from_config,
+    result_pages,
+    session_statement_key,
+)
+from .ratelimit import RateLimiter, RateLimits, record_wait
+from .tracing import get_tracer
+
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# 驱动会话未记录所连接的 host 时，执行延迟记在该标签下
+_ASYNC_HOST_LABEL = "asyncio"
+
+
+def _session_host(session: Any) -> str:
+    """驱动会话实际连接的 host（"addr:port"），用作执行延迟的标签"""
+    connected = getattr(getattr(session, "_conn", None), "connected", None)
+    return str(connected) if connected is not None else _ASYNC_HOST_LABEL
+
+
+def _has_host_limits(rate_limits: Optional[RateLimits]) -> bool:
+    """是否配置了按 host 的限制；驱动模式无法应用，需要使用 shim 模式"""
+    return rate_limits is not None and bool(
+        rate_limits.host_statements_per_second or rate_limits.max_in_flight_per_host
+    )
+
+
+def _import_async_client() -> Optional[Any]:
+    """导入驱动的异步客户端，不可用时返回 None"""
+    try:
+        from nebulagraph_python import NebulaAsyncClient, SessionPoolConfig
+    except ImportError:
+        return None
+    return NebulaAsyncClient, SessionPoolConfig
+
+
+class AsyncNebulaClient:
+    """
+    asyncio 客户端
+
+    Args:
+        hosts / username / password: 连接信息
+        max_sessions: 会话池大小（shim 模式下同时也是执行线程数）
+        max_in_flight: 同时在途的语句上限
+        rate_limits: 限流配置；配置了按 host 的限制时使用 shim 模式（驱动模式只能应用全局限制）
+        client_factory: 自定义底层客户端工厂；指定后使用 shim 模式
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        username: str,
+        password: str,
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        sync_client: Optional[NebulaClient] = None,
+        rate_limits: Optional[RateLimits] = None,
+        statement_timeout: Optional[float] = None,
+        slow_statement_threshold: float = DEFAULT_SLOW_STATEMENT_THRESHOLD,
+        client_factory: Optional[ClientFactory] = None,
+    ) -> None:
+        self._hosts = hosts
+        self._username = username
+        self._password = password
+        self._max_sessions = max_sessions
+        self._max_in_flight = max(1, max_in_flight)
+        self._client_factory = client_factory
+        self._sync_client = sync_client
+        self._rate_limits = rate_limits
+        self._statement_timeout = statement_timeout or None
+        self._slow_statement_threshold = slow_statement_threshold
+        self._watchdog: Optional[SlowStatementWatchdog] = None
+        self._limiter = (
+            RateLimiter(rate_limits) if rate_limits is not None and rate_limits.enabled else None
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._driver: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 驱动模式下的会话语句重放（shim 模式由同步客户端负责）
+        self._session_statements: Dict[str, Tuple[int, str]] = {}
+        self._session_version = 0
+        self._session_versions: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: ConnectionConfig,
+        client_factory: Optional[ClientFactory] = None,
+    ) -> "AsyncNebulaClient":
+        """根据连接配置创建客户端；shim 模式下同步客户端沿用同一份会话池配置"""
+        rate_limits = rate_limits_from_config(cfg)
+        sync_client = None
+        if client_factory is not None or _has_host_limits(rate_limits) or _import_async_client() is None:
+            sync_client = NebulaClient.from_config(cfg, client_factory=client_factory)
+        return cls(
+            hosts=cfg.hosts,
+            username=cfg.username,
+            password=cfg.password,
+            max_sessions=cfg.max_sessions,
+            max_in_flight=cfg.max_in_flight,
+            sync_client=sync_client,
+            rate_limits=rate_limits,
+            statement_timeout=cfg.statement_timeout,
+            slow_statement_threshold=cfg.slow_statement_threshold,
+            client_factory=client_factory,
+        )
+
+    @property
+    def mode(self) -> str:
+        """当前实现：driver（驱动异步客户端）或 shim（线程池）"""
+        return "driver" if self._driver is not None else "shim"
+
+    async def connect(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self._max_in_flight)
+        driver = None
+        if _has_host_limits(self._rate_limits):
+            if _import_async_client() is not None:
+                log("配置了按 host 的限流（rate_limit_host_statements / max_in_flight_per_host），"
+                    "驱动的异步会话池无法应用，改用线程池模式")
+        elif self._sync_client is None and self._client_factory is None:
+            driver = _import_async_client()
+        if driver is None:
+            if self._sync_client is None:
+                self._sync_client = NebulaClient(
+                    self._hosts,
+                    self._username,
+                    self._password,
+                    max_sessions=self._max_sessions,
+                    rate_limits=self._rate_limits,
+                    statement_timeout=self._statement_timeout,
+                    slow_statement_threshold=self._slow_statement_threshold,
+                    client_factory=self._client_factory,
+                )
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(self._max_sessions, 1), thread_name_prefix="nebula-async",
+                initializer=adopt_invocation, initargs=(current_invocation(),),
+            )
+            await self._loop.run_in_executor(self._executor, self._sync_client.connect)
+            log(f"异步客户端使用线程池模式 ({self._max_sessions} 个执行线程)")
+            return
+
+        client_cls, pool_config_cls = driver
+        try:
+            self._driver = await client_cls.connect(
+                hosts=self._hosts,
+                username=self._username,
+                password=self._password,
+                session_pool_config=pool_config_cls(size=self._max_sessions),
+            )
+        except Exception as exc:  # noqa: BLE001
+            raise NebulaClientError(f"连接失败: {exc}") from exc
+        if self._slow_statement_threshold > 0:
+            self._watchdog = SlowStatementWatchdog(self._slow_statement_threshold)
+            self._watchdog.start()
+        log(f"异步客户端使用驱动 NebulaAsyncClient (会话池 {self._max_sessions})")
+
+    async def close(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+        if self._sync_client is not None and self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._sync_client.close
+            )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def execute(self, query: str, rows: int = 0, stream: Optional[str] = None) -> Any:
+        """
+        异步执行 GQL 查询，返回 ResultSet
+
+        在途语句数超过 max_in_flight 时在此等待；rows 用于按行数/秒限流，
+        stream 用于慢语句日志。
+        """
+        if self._semaphore is None:
+            raise NebulaClientError("客户端未初始化，请先调用 connect()")
+        async with self._semaphore:
+            if self._driver is None:
+                assert self._loop is not None
+                return await self._loop.run_in_executor(
+                    self._executor, self._sync_client.execute, query, rows, stream
+                )
+            if self._limiter is not None:
+                wait = self._limiter.reserve(rows)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    record_wait(wait)
+            return await self._execute_driver(query, stream)
+
+    async def execute_iter(
+        self, query: str, page_size: int = DEFAULT_PAGE_SIZE, stream: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐页返回查询结果的行，分页方式与 NebulaClient.execute_iter 相同"""
+        pager = QueryPager(query, page_size)
+        while True:
+            page_query = pager.next_query()
+            if page_query is None:
+                return
+            rows = 0
+            for page in result_pages(await self.execute(page_query, stream=stream), page_size):
+                rows += len(page)
+                yield page
+            pager.advance(rows)
+
+    async def _execute_driver(self, query: str, stream: Optional[str]) -> Any:
+        key = session_statement_key(query)
+        if key is not None:
+            self._session_version += 1
+            self._session_statements.pop(key, None)
+            self._session_statements[key] = (self._session_version, query)
+        start = time.perf_counter()
+        host = _ASYNC_HOST_LABEL
+        watchdog = self._watchdog
+        token = watchdog.begin(host, query, stream) if watchdog else None
+        try:
+            async with self._driver.borrow() as session:
+                host = _session_host(session)
+                version = self._session_version
+                applied = self._session_versions.get(session, 0)
+                if applied != version:
+                    for statement_version, statement in list(self._session_statements.values()):
+                        if statement_version > applied and statement is not query:
+                            _check_result(await session.execute(statement))
+                    self._session_versions[session] = version
+                result = await session.execute(query, timeout=self._statement_timeout)
+        except NebulaClientError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if self._statement_timeout and is_timeout_error(exc):
+                get_registry().inc("timeouts")
+                raise NebulaTimeoutError(f"查询超时 ({self._statement_timeout}s): {exc}") from exc
+            raise NebulaClientError(f"查询执行失败: {exc}") from exc
+        finally:
+            if token is not None:
+                watchdog.end(token)
+            end = time.perf_counter()
+            get_registry().observe_execute(host, end - start)
+            get_tracer().add_complete(
+                "execute", start, end, cat="client", args={"host": host, "size": len(query)},
+            )
+        _check_result(result)
+        return result
+
+    def blocking(self) -> "BlockingAdapter":
+        """返回可在其它线程中同步调用 execute 的适配器（如 read_graph_schema）"""
+        if self._loop is None:
+            raise NebulaClientError("客户端未初始化，请先调用 connect()")
+        return BlockingAdapter(self, self._loop)
+
+    result_to_payload = staticmethod(NebulaClient.result_to_payload)
+    rows_to_payload = staticmethod(NebulaClient.rows_to_payload)
+
+
+class BlockingAdapter:
+    """将 AsyncNebulaClient.execute 提交到事件循环并同步等待结果"""
+
+    def __init__(self, client: AsyncNebulaClient, loop: asyncio.AbstractEventLoop) -> None:
+        self._client = client
+        self._loop = loop
+
+    def execute(self, query: str) -> Any:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            # 在事件循环线程中同步等待会死锁
+            raise NebulaClientError("不能在事件循环线程中使用同步适配器")
+        return asyncio.run_coroutine_threadsafe(self._client.execute(query), self._loop).result()
@@ -0,0 +1,367 @@
+"""
+本地 JSONL 文件的批量导入（load 命令）
+
+初次回填时数据已经是 JSONL 文件，不必经过 Airbyte stdin 单进程写入：文件以 mmap
+打开并按字节切分为若干段（段边界对齐到行首），多个工作进程各自连接集群，以与
+destination.write 相同的写入计划解析、生成并执行各自的段；父进程汇总进度并输出
+最终报告。
+
+与 script_export 的回放相同，导入分两个阶段：先由全部工作进程写入点 stream，
+全部完成后再写入边 stream，边的 MATCH 才能找到其它工作进程写入的端点。
+
+    yueshu-airbyte load --config config.json --catalog catalog.json --workers 8 \\
+        --file records.jsonl --file actors=actors.jsonl
+
+文件格式：
+- "path"：每行一条 Airbyte 消息，与 destination.write 的 stdin 相同；文件中可能同时
+  有点与边 stream 的记录，两个阶段各读取一次，每次只写入该阶段的记录
+- "stream=path"：每行一条记录的 data 对象，属于该 stream
+- "stream=path.parquet"（.arrow / .feather / .csv 等）：列式文件，按 Parquet row group /
+  Arrow record batch 分给各工作进程，经 destination.write_columns 整列格式化写入（见 columnar）
+"""
+from __future__ import annotations
+
+import functools
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .common import BufferedEmitter, InvocationContext, get_logger, invocation_context, log
+from .nebula_client import PHASE_EDGE, PHASE_VERTEX, ClientFactory
+
+DEFAULT_WORKERS = 4
+DEFAULT_PROGRESS_INTERVAL = 10.0
+# 工作进程累计读取这么多字节后更新一次共享进度
+_PROGRESS_STEP = 1 << 20
+
+_LOG = get_logger("load")
+
+
+@dataclass(frozen=True)
+class FileSpec:
+    """待导入的文件；stream 不为空时每行是该 stream 的 data 对象"""
+    path: str
+    stream: Optional[str] = None
+
+    @classmethod
+    def parse(cls, value: str) -> "FileSpec":
+        """解析 "path" 或 "stream=path"（value 本身是已存在的文件时按路径处理）"""
+        if "=" in value and not os.path.exists(value):
+            stream, path = value.split("=", 1)
+            return cls(path, stream)
+        return cls(value)
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    文件中的一段 [start, end)，start 位于行首，end 位于行尾之后或文件末尾
+    phase 不为空时（消息文件）只写入属于该写入阶段的 stream 的 RECORD
+    """
+    path: str
+    start: int
+    end: int
+    stream: Optional[str] = None
+    phase: Optional[int] = None
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class ColumnarPart:
+    """列式文件中分给一个工作进程的分片（Parquet row group / Arrow record batch 编号）"""
+    path: str
+    stream: str
+    format: str
+    parts: Tuple[int, ...]
+    size: int  # 按分片数估算的字节数，用于进度
+
+Task = Union[Segment, ColumnarPart]
+
+
+def split_segments(files: Sequence[FileSpec], parts: int) -> List[List[Segment]]:
+    """
+    将全部文件按字节数大致均分为 parts 组，每组是若干连续的段
+    段边界向后对齐到下一个换行符，一行不会被拆到两组；空文件被跳过
+    """
+    sizes = [os.path.getsize(f.path) for f in files]
+    total = sum(sizes)
+    if total == 0:
+        return []
+    target = -(-total // max(parts, 1))
+    groups: List[List[Segment]] = [[]]
+    remaining = target
+    for spec, size in zip(files, sizes):
+        if size == 0:
+            continue
+        with open(spec.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < size:
+                if remaining <= 0:
+                    groups.append([])
+                    remaining = target
+                cut = min(pos + remaining, size)
+                if cut < size:
+                    newline = mm.find(b"\n", cut - 1)
+                    cut = size if newline == -1 else newline + 1
+                groups[-1].append(Segment(spec.path, pos, cut, spec.stream))
+                remaining -= cut - pos
+                pos = cut
+    return [g for g in groups if g]
+
+
+def iter_segment_lines(segment: Segment, progress: Optional[Any] = None) -> Iterator[bytes]:
+    """
+    逐行返回段中的内容（bytes，不解码，由 json.loads 直接解析）
+    stream 段的每行被包装为该 stream 的 RECORD 消息；progress 为共享计数器时按块累加已读字节
+    """
+    prefix = suffix = b""
+    if segment.stream is not None:
+        prefix = b'{"type":"RECORD","record":{"stream":' + json.dumps(segment.stream).encode() + b',"data":'
+        suffix = b"}}"
+    reported = segment.start
+    with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = segment.start
+        while pos < segment.end:
+            newline = mm.find(b"\n", pos, segment.end)
+            stop = segment.end if newline == -1 else newline
+            line = mm[pos:stop]
+            pos = stop + 1
+            if progress is not None and pos - reported >= _PROGRESS_STEP:
+                with progress.get_lock():
+                    progress.value += pos - reported
+                reported = pos
+            if not line.strip():
+                continue
+            yield prefix + line + suffix if prefix else line
+    if progress is not None:
+        with progress.get_lock():
+            progress.value += min(pos, segment.end) - reported
+
+
+def split_columnar(files: Sequence[FileSpec], parts: int) -> List[List[ColumnarPart]]:
+    """把列式文件的分片轮流分给 parts 组"""
+    from .columnar import detect_format, num_parts
+
+    groups: List[List[ColumnarPart]] = [[] for _ in range(max(parts, 1))]
+    for spec in files:
+        fmt = detect_format(spec.path)
+        if fmt is None:
+            continue
+        if spec.stream is None:
+            raise ValueError(f"列式文件需要指定 stream（stream=path）: {spec.path}")
+        total = num_parts(spec.path, fmt)
+        size = os.path.getsize(spec.path)
+        for i, group in enumerate(groups):
+            assigned = tuple(range(i, total, len(groups)))
+            if assigned:
+                group.append(
+                    ColumnarPart(spec.path, spec.stream, fmt, assigned, size * len(assigned) // total)
+                )
+    return [g for g in groups if g]
+
+
+# 工作进程状态，由 _init_worker 设置
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    config: Dict[str, Any],
+    catalog: Optional[Dict[str, Any]],
+    client_factory: Optional[ClientFactory],
+    progress: Any,
+    phases: Optional[Dict[str, int]] = None,
+) -> None:
+    _WORKER.update(
+        config=config, catalog=catalog, client_factory=client_factory, progress=progress,
+        phases=phases or {},
+    )
+
+
+def _phase_lines(lines: Iterator[bytes], phase: int) -> Iterator[bytes]:
+    """只保留属于 phase 的 stream 的 RECORD；未知 stream 归入点阶段，其它消息原样保留"""
+    phases = _WORKER["phases"]
+    for line in lines:
+        message = json.loads(line)
+        if message.get("type") == "RECORD":
+            stream = (message.get("record") or {}).get("stream")
+            if phases.get(stream, PHASE_VERTEX) != phase:
+                continue
+        yield line
+
+
+def _segment_lines(segment: Segment, progress: Any) -> Iterator[bytes]:
+    lines = iter_segment_lines(segment, progress)
+    return lines if segment.phase is None else _phase_lines(lines, segment.phase)
+
+
+def _load_group(tasks: List[Task]) -> List[Dict[str, Any]]:
+    """
+    在工作进程中写入一组任务：JSONL 段合并为一次 destination.write，
+    每个列式分片一次 destination.write_columns；返回每次写入的指标摘要
+    """
+    from . import columnar, destination
+    from .metrics import get_registry
+
+    config = _WORKER["config"]
+    client_factory = _WORKER["client_factory"]
+    progress = _WORKER["progress"]
+    segments = [t for t in tasks if isinstance(t, Segment)]
+    summaries = []
+    # 段内的 STATE 与进度报告只对本进程有意义，丢弃；错误日志仍写到 stderr
+    with open(os.devnull, "w") as sink:
+        context = InvocationContext(
+            emitter=BufferedEmitter(stream=sink), stderr=sys.stderr, catalog=_WORKER["catalog"]
+        )
+        with invocation_context(context):
+            if segments:
+                lines = (line for segment in segments for line in _segment_lines(segment, progress))
+                destination.write(config, lines, client_factory=client_factory)
+                summaries.append(get_registry().summary())
+            for part in tasks:
+                if not isinstance(part, ColumnarPart):
+                    continue
+                read_batches = functools.partial(
+                    columnar.iter_batches, part.path, part.format, parts=list(part.parts)
+                )
+                destination.write_columns(
+                    config, part.stream, read_batches,
+                    client_factory=client_factory, formatter=columnar.format_arrow_column,
+                )
+                summaries.append(get_registry().summary())
+                with progress.get_lock():
+                    progress.value += part.size
+    return summaries
+
+
+def _split_tasks(files: Sequence[FileSpec], workers: int, phase: Optional[int]) -> List[List[Task]]:
+    """把一个阶段的文件分为至多 workers 组；phase 不为空时消息文件的段只写入该阶段"""
+    from .columnar import detect_format
+
+    row_files = [f for f in files if detect_format(f.path) is None]
+    groups: List[List[Task]] = [
+        [s if s.stream is not None or phase is None else replace(s, phase=phase) for s in group]
+        for group in split_segments(row_files, workers)
+    ]
+    for i, parts in enumerate(split_columnar(files, workers)):
+        if i < len(groups):
+            groups[i].extend(parts)
+        else:
+            groups.append(list(parts))
+    return groups
+
+
+def plan_phases(
+    files: Sequence[FileSpec], workers: int, phases: Dict[str, int]
+) -> List[List[List[Task]]]:
+    """
+    按写入阶段划分任务，返回 [阶段][工作进程分组][任务]
+    catalog 中没有边 stream 时只有一个阶段；否则点 stream 的文件在前一阶段，
+    边 stream 的文件在后一阶段，消息文件在两个阶段中各出现一次
+    """
+    edge_streams = {stream for stream, phase in phases.items() if phase == PHASE_EDGE}
+    if not edge_streams:
+        return [_split_tasks(files, workers, None)]
+    vertex_files = [f for f in files if f.stream not in edge_streams]
+    edge_files = [f for f in files if f.stream is None or f.stream in edge_streams]
+    return [
+        _split_tasks(vertex_files, workers, PHASE_VERTEX),
+        _split_tasks(edge_files, workers, PHASE_EDGE),
+    ]
+
+
+def _merge(summaries: List[Dict[str, Any]], elapsed: float, total_bytes: int, workers: int) -> Dict[str, Any]:
+    records = sum(s["records"] for s in summaries)
+    streams: Dict[str, Dict[str, int]] = {}
+    events: Dict[str, int] = {}
+    for summary in summaries:
+        for name, stats in summary["streams"].items():
+            merged = streams.setdefault(name, {"records": 0, "bytes": 0})
+            merged["records"] += stats["records"]
+            merged["bytes"] += stats["bytes"]
+        for name, count in summary["events"].items():
+            events[name] = events.get(name, 0) + count
+    return {
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "records": records,
+        "file_bytes": total_bytes,
+        "records_per_second": round(records / max(elapsed, 1e-9), 1),
+        "file_bytes_per_second": round(total_bytes / max(elapsed, 1e-9), 1),
+        "streams": streams,
+        "events": events,
+    }
+
+
+def load(
+    config_data: Dict[str, Any],
+    catalog: Optional[Dict[str, Any]],
+    files: Sequence[FileSpec],
+    workers: int = DEFAULT_WORKERS,
+    client_factory: Optional[ClientFactory] = None,
+    progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    以 workers 个进程并行导入 files，返回汇总报告
+    workers=1 时在当前进程中执行；client_factory 在工作进程中使用，需可被继承或序列化。
+    点 stream 全部写入后才开始写入边 stream（见模块说明）
+    """
+    from .destination import stream_phases
+
+    workers = max(int(workers), 1)
+    phases = stream_phases(catalog or {})
+    plan = plan_phases(files, workers, phases)
+    file_bytes = sum(os.path.getsize(f.path) for f in files)
+    # 进度按读取的字节计算，消息文件在两个阶段各读取一次
+    total_bytes = sum(t.size for groups in plan for g in groups for t in g)
+    pool_size = max((len(groups) for groups in plan), default=0)
+    log(
+        f"导入 {len(files)} 个文件（{file_bytes} 字节），{pool_size} 个工作进程，"
+        f"{len(plan)} 个写入阶段"
+    )
+    progress = multiprocessing.Value("q", 0)
+    start = time.monotonic()
+
+    def report() -> None:
+        done = progress.value
+        elapsed = max(time.monotonic() - start, 1e-9)
+        _LOG.info(
+            "导入进度 %.1f%%（%d/%d 字节，%.1f MiB/s）",
+            100.0 * done / max(total_bytes, 1), done, total_bytes, done / elapsed / (1 << 20),
+        )
+
+    summaries: List[Dict[str, Any]] = []
+    if pool_size <= 1:
+        _init_worker(config_data, catalog, client_factory, progress, phases)
+        for groups in plan:
+            summaries.extend(s for g in groups for s in _load_group(g))
+    else:
+        ctx = multiprocessing.get_context()
+        with ctx.Pool(
+            pool_size,
+            initializer=_init_worker,
+            initargs=(config_data, catalog, client_factory, progress, phases),
+        ) as pool:
+            for groups in plan:
+                # 上一阶段的全部分组完成后才开始下一阶段
+                result = pool.map_async(_load_group, groups, chunksize=1)
+                while not result.ready():
+                    result.wait(progress_interval)
+                    if not result.ready():
+                        report()
+                summaries.extend(s for group in result.get() for s in group)
+
+    summary = _merge(summaries, time.monotonic() - start, file_bytes, pool_size)
+    _LOG.info(
+        "导入完成: 记录 %d（%.1f/s），文件 %d 字节（%.1f MiB/s），%d 个工作进程",
+        summary["records"], summary["records_per_second"], file_bytes,
+        summary["file_bytes_per_second"] / (1 << 20), summary["workers"],
+    )
+    return summary
@@ -1,26 +1,79 @@
 from __future__ import annotations
 
 import argparse
+import importlib
 import os
 import sys
-from typing import Any, Dict
-
-from . import destination, source
-from .common import emit_message, read_config_from_env_or_path
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+from .common import (
+    emit_message,
+    emitter_from_env,
+    install_emitter,
+    load_json,
+    log,
+    read_catalog_from_env,
+    read_config_from_env_or_path,
+    uninstall_emitter,
+)
+from .tracing import configure_tracing, finish_tracing
+
+COMMANDS = ["spec", "check", "discover", "read", "write", "daemon", "load", "apply", "export"]
+# 设置了守护进程 socket 时转发的命令
+FORWARDED_COMMANDS = {"check", "discover", "read", "write"}
 
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser("yueshu-airbyte")
     parser.add_argument("--connector-type", choices=["source", "destination"], default=None)
-    parser.add_argument("command", nargs="?", choices=["spec", "check", "discover", "read", "write"], default=None)
-    parser.add_argument("--command", dest="command_opt", choices=["spec", "check", "discover", "read", "write"], required=False)
+    parser.add_argument("command", nargs="?", choices=COMMANDS, default=None)
+    parser.add_argument("--command", dest="command_opt", choices=COMMANDS, required=False)
     parser.add_argument("--config", required=False)
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="守护进程的 UNIX socket：daemon 命令在此监听，其它命令转发到此（也可用 YUESHU_DAEMON_SOCKET）",
+    )
+    parser.add_argument("--schema-ttl", type=float, default=None, help="daemon: schema 缓存有效期（秒）")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="daemon: 空闲会话保留时间（秒）")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="daemon: 同时执行的调用数")
+    parser.add_argument("--catalog", default=None, help="load: catalog JSON 路径（默认读取 AIRBYTE_CATALOG）")
+    parser.add_argument(
+        "--file",
+        action="append",
+        default=[],
+        help="load: 待导入的 JSONL 文件，可重复；\"stream=path\" 表示每行是该 stream 的 data 对象",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="load: 工作进程数（默认 4）；apply / export: 并行执行的分片 / 分区数（默认 max_sessions）",
+    )
+    parser.add_argument("--dir", default=None, help="apply: 导出模式（export_dir）生成的目录；export: 输出目录")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "parquet"], help="export: 输出格式")
+    parser.add_argument("--page-size", type=int, default=None, help="export: 每页查询的行数")
+    parser.add_argument("--partition-rows", type=int, default=None, help="export: 每个分区文件的行数")
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="开启性能剖析，逗号分隔: cprofile,sample,tracemalloc（也可用 YUESHU_PROFILE）",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="剖析结果输出目录（也可用 YUESHU_PROFILE_DIR）",
+    )
     return parser.parse_args()
 
 
-def _get_connector(args: argparse.Namespace):
+def _get_connector_type(args: argparse.Namespace) -> str:
     connector_type = args.connector_type or os.environ.get("CONNECTOR_TYPE", "source")
-    return source if connector_type == "source" else destination
+    return "source" if connector_type == "source" else "destination"
+
+
+def _load_connector(connector_type: str) -> ModuleType:
+    """按需导入 source / destination 模块（连同客户端、GQL 生成等依赖）"""
+    return importlib.import_module(f".{connector_type}", __package__)
 
 
 def _get_command(args: argparse.Namespace) -> str:
@@ -31,17 +84,147 @@ def _read_config(args: argparse.Namespace) -> Dict[str, Any]:
     return read_config_from_env_or_path(args.config)
 
 
+def _socket_path(args: argparse.Namespace) -> Optional[str]:
+    return args.socket or os.environ.get("YUESHU_DAEMON_SOCKET")
+
+
+def _run_daemon(args: argparse.Namespace) -> None:
+    from . import daemon
+
+    socket_path = _socket_path(args)
+    if not socket_path:
+        raise SystemExit("daemon 命令需要 --socket 或 YUESHU_DAEMON_SOCKET")
+    options = {
+        "schema_ttl": args.schema_ttl,
+        "idle_timeout": args.idle_timeout,
+        "max_concurrent": args.max_concurrent,
+    }
+    daemon.serve(socket_path, **{k: v for k, v in options.items() if v is not None})
+
+
+def _run_load(config: Dict[str, Any], args: argparse.Namespace) -> None:
+    from .bulk_load import DEFAULT_WORKERS, FileSpec, load
+
+    if not args.file:
+        raise SystemExit("load 命令需要至少一个 --file")
+    catalog = load_json(args.catalog) if args.catalog else read_catalog_from_env()
+    files = [FileSpec.parse(value) for value in args.file]
+    load(config, catalog, files, workers=args.workers or DEFAULT_WORKERS)
+
+
+def _run_apply(config: Dict[str, Any], args: argparse.Namespace) -> None:
+    from .script_export import apply
+
+    if not args.dir:
+        raise SystemExit("apply 命令需要 --dir")
+    apply(config, args.dir, workers=args.workers)
+
+
+def _run_export(config: Dict[str, Any], args: argparse.Namespace) -> None:
+    from .graph_export import export
+
+    if not args.dir:
+        raise SystemExit("export 命令需要 --dir")
+    options = {"page_size": args.page_size, "partition_rows": args.partition_rows}
+    export(
+        config, args.dir, fmt=args.format, workers=args.workers,
+        **{k: v for k, v in options.items() if v is not None},
+    )
+
+
+def _forward(connector_type: str, command: str, args: argparse.Namespace) -> bool:
+    """
+    把调用转发给守护进程；守护进程不可用时返回 False，由调用方在本地执行
+    调用失败时以守护进程返回的退出码退出
+    """
+    from . import daemon
+
+    socket_path = _socket_path(args)
+    try:
+        exit_code = daemon.forward(
+            socket_path,
+            connector_type,
+            command,
+            _read_config(args),
+            read_catalog_from_env(),
+            getattr(sys.stdin, "buffer", None),
+            sys.stdout,
+            sys.stderr,
+        )
+    except daemon.DaemonUnavailableError as exc:
+        log(f"{exc}，改为本地执行")
+        return False
+    if exit_code:
+        raise SystemExit(exit_code)
+    return True
+
+
 def main() -> None:
     args = _parse_args()
-    connector = _get_connector(args)
+    connector_type = _get_connector_type(args)
     command = _get_command(args)
 
+    if command == "daemon":
+        configure_tracing()
+        try:
+            _run_daemon(args)
+        finally:
+            finish_tracing()
+        return
+    # 设置了守护进程 socket 时只做转发（剖析针对本进程，此时在本地执行）
+    profiling = bool(args.profile or os.environ.get("YUESHU_PROFILE"))
+    if command in FORWARDED_COMMANDS and _socket_path(args) and not profiling:
+        if _forward(connector_type, command, args):
+            return
+
+    # read/write 会输出大量消息，使用缓冲输出减少系统调用
+    if command in {"read", "write"}:
+        emitter = emitter_from_env()
+        if emitter is not None:
+            install_emitter(emitter)
+    configure_tracing()
+    profiler = None
+    if profiling:
+        from .profiling import profiler_from_env
+
+        label = f"{connector_type}-{command}"
+        profiler = profiler_from_env(label, modes=args.profile, output_dir=args.profile_dir)
+    try:
+        if profiler is None:
+            _run(connector_type, command, args)
+        else:
+            with profiler:
+                _run(connector_type, command, args)
+    finally:
+        uninstall_emitter()
+        finish_tracing()
+
+
+def _run(connector_type: str, command: str, args: argparse.Namespace) -> None:
     if command == "spec":
-        emit_message(connector.spec())
+        # spec 只需要静态定义，不导入连接器模块
+        from . import spec
+
+        emit_message(getattr(spec, f"{connector_type}_spec")())
         return
 
-    if command in {"check", "discover", "read", "write"}:
-        config = _read_config(args)
+    if command not in FORWARDED_COMMANDS | {"load", "apply", "export"}:
+        raise SystemExit(f"未知命令: {command}")
+    config = _read_config(args)
+
+    if command == "load":
+        _run_load(config, args)
+        return
+
+    if command == "apply":
+        _run_apply(config, args)
+        return
+
+    if command == "export":
+        _run_export(config, args)
+        return
+
+    connector = _load_connector(connector_type)
 
     if command == "check":
         connector.check(config)
@@ -55,11 +238,7 @@ def main() -> None:
         connector.read(config)
         return
 
-    if command == "write":
-        connector.write(config, sys.stdin)
-        return
-
-    raise SystemExit(f"未知命令: {command}")
+    connector.write(config, sys.stdin)
 
 
 if __name__ == "__main__":
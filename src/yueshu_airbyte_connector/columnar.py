@@ -0,0 +1,160 @@
+"""
+列式文件（Parquet / Arrow IPC / CSV）的读取与整列格式化
+
+湖仓导出多为 Parquet，转成 Airbyte JSON 再经 destination.write 写入要多付出序列化、
+解析与逐行 dict 的开销。本模块按 record batch 读取列式文件，只读取语句模板需要的列，
+并把每列交给 format_arrow_column 整列格式化为 GQL 字面量：常见类型（字符串、整数、
+布尔、日期时间函数）直接在 Arrow 列缓冲区上用 pyarrow.compute 完成，其余类型逐值
+回退到与逐行写入相同的格式化函数，两条路径生成的语句一致。
+
+pyarrow 是可选依赖（pip install 'airbyte-connector-yueshu[columnar]'），只在使用本模块
+时导入。写入见 destination.write_columns，命令行入口见 load 命令（bulk_load）。
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Iterator, List, Optional, Sequence
+
+from .gql_generator import _Field, _format_value, _to_bool, format_column
+
+# 文件后缀 -> 格式
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+    ".csv": "csv",
+}
+
+DEFAULT_BATCH_ROWS = 8192
+
+
+def detect_format(path: str) -> Optional[str]:
+    """按后缀判断列式文件格式，不是列式文件时返回 None"""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            f"读取列式文件需要 pyarrow: {exc}. 请安装: pip install 'airbyte-connector-yueshu[columnar]'"
+        ) from exc
+    return pyarrow
+
+
+def _open_ipc(pa: Any, path: str) -> Any:
+    """Arrow IPC 文件格式返回 RecordBatchFileReader，流格式返回 RecordBatchStreamReader"""
+    source = pa.memory_map(path)
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def num_parts(path: str, fmt: str) -> int:
+    """可独立读取的分片数：Parquet 的 row group 数、Arrow IPC 文件的 record batch 数；CSV 为 1"""
+    pa = _import_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).num_row_groups
+    if fmt == "ipc":
+        reader = _open_ipc(pa, path)
+        return getattr(reader, "num_record_batches", 1)
+    return 1
+
+
+def iter_batches(
+    path: str,
+    fmt: str,
+    columns: Sequence[str],
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    parts: Optional[Sequence[int]] = None,
+) -> Iterator[Any]:
+    """
+    按批读取 columns 中文件里存在的列，产出 (列名 -> Arrow 列, 行数, 字节数)
+    parts 为 num_parts 编号的子集时只读取这些分片
+    """
+    pa = _import_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        names = [c for c in dict.fromkeys(columns) if c in parquet.schema_arrow.names]
+        batches = parquet.iter_batches(batch_size=batch_rows, row_groups=parts, columns=names)
+    elif fmt == "ipc":
+        batches = _iter_ipc_batches(pa, path, batch_rows, parts)
+    elif fmt == "csv":
+        import pyarrow.csv as pacsv
+
+        batches = pacsv.open_csv(path)
+    else:
+        raise ValueError(f"不支持的列式文件格式: {fmt}")
+
+    wanted = set(columns)
+    for batch in batches:
+        names = [name for name in batch.schema.names if name in wanted]
+        yield {name: batch.column(name) for name in names}, batch.num_rows, batch.nbytes
+
+
+def _iter_ipc_batches(pa: Any, path: str, batch_rows: int, parts: Optional[Sequence[int]]) -> Iterator[Any]:
+    reader = _open_ipc(pa, path)
+    if hasattr(reader, "get_batch"):
+        indices = parts if parts is not None else range(reader.num_record_batches)
+        batches: Iterator[Any] = (reader.get_batch(i) for i in indices)
+    else:
+        batches = iter(reader)
+    for batch in batches:
+        # 切片不复制数据
+        for offset in range(0, batch.num_rows, batch_rows):
+            yield batch.slice(offset, batch_rows)
+
+
+def format_arrow_column(field: _Field, column: Any) -> List[str]:
+    """
+    ColumnFormatter：整列格式化 Arrow 列
+
+    字符串、整数、布尔列以及日期时间函数包裹在 Arrow 列缓冲区上向量化生成字面量，
+    其余类型（浮点、嵌套、时间类型等）转为 Python 值后逐个格式化，与逐行写入的输出一致。
+    """
+    if isinstance(column, list):
+        return format_column(field, column)
+    literals = _vectorized_literals(field, column)
+    if literals is None:
+        return format_column(field, column.to_pylist())
+    return literals.to_pylist()
+
+
+def _vectorized_literals(field: _Field, column: Any) -> Any:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if column.null_count and field.literal(None) != "NULL":
+        return None
+    types = pa.types
+    kind = column.type
+    is_string = types.is_string(kind) or types.is_large_string(kind)
+    if field.literal is _format_value:
+        if is_string:
+            escaped = pc.replace_substring(column, '"', '\\"')
+            literals = pc.binary_join_element_wise('"', escaped, '"', "")
+        elif types.is_integer(kind):
+            literals = pc.cast(column, pa.string())
+        elif types.is_boolean(kind):
+            literals = pc.if_else(column, "true", "false")
+        else:
+            return None
+    elif field.convert is int and types.is_integer(kind):
+        literals = pc.cast(column, pa.string())
+    elif field.convert is _to_bool and types.is_boolean(kind):
+        literals = pc.if_else(column, "true", "false")
+    elif field.wrap and is_string:
+        literals = pc.binary_join_element_wise(f'{field.wrap}("', column, '")', "")
+    else:
+        return None
+    return pc.fill_null(literals, "NULL")
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import itertools
 import json
 import os
+import queue
+import signal
 import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from .tracing import get_tracer
 
 
 @dataclass
@@ -12,22 +23,119 @@ class ConnectionConfig:
     hosts: List[str]
     username: str
     password: str
+    min_sessions: int = 1
+    max_sessions: int = 8
+    keepalive_interval: float = 30.0
+    host_selection: str = "p2c"
+    execution_mode: str = "sync"
+    max_in_flight: int = 64
+    rate_limit_statements: float = 0.0
+    rate_limit_rows: float = 0.0
+    rate_limit_host_statements: float = 0.0
+    max_in_flight_per_host: int = 0
+    statement_timeout: float = 0.0
+    slow_statement_threshold: float = 10.0
 
 
 @dataclass
 class SourceConfig(ConnectionConfig):
-    pass
+    hedge_reads: bool = False
+    hedge_quantile: float = 0.95
+    hedge_delay: float = 1.0
 
 
 @dataclass
 class DestinationConfig(ConnectionConfig):
     graph: Optional[str] = None
     insert_mode: Optional[str] = None
+    batch_size: int = 1
+    export_dir: Optional[str] = None
+    export_shards: int = 4
+    export_compress: bool = True
 
 
 
 DEFAULT_CHECK_QUERY = "SHOW CURRENT_USER"
 
+# source/destination 共用的连接调优配置项（spec 中的 properties）
+CONNECTION_SPEC_PROPERTIES: Dict[str, Any] = {
+    "min_sessions": {
+        "type": "integer",
+        "description": "会话池最小会话数",
+        "default": 1,
+        "minimum": 0,
+    },
+    "max_sessions": {
+        "type": "integer",
+        "description": "会话池最大会话数",
+        "default": 8,
+        "minimum": 1,
+    },
+    "keepalive_interval": {
+        "type": "number",
+        "description": "空闲会话 keepalive 与 host 健康探测间隔（秒），0 表示关闭",
+        "default": 30,
+        "minimum": 0,
+    },
+    "host_selection": {
+        "type": "string",
+        "description": "host 选择策略：p2c 按延迟 EWMA 与在途请求数二选一，round_robin 轮询",
+        "enum": ["p2c", "round_robin"],
+        "default": "p2c",
+    },
+    "execution_mode": {
+        "type": "string",
+        "description": "执行模式：sync 逐条同步执行，asyncio 在单个事件循环上并发执行多条语句",
+        "enum": ["sync", "asyncio"],
+        "default": "sync",
+    },
+    "max_in_flight": {
+        "type": "integer",
+        "description": "asyncio 模式下同时在途的语句上限",
+        "default": 64,
+        "minimum": 1,
+    },
+    "rate_limit_statements": {
+        "type": "number",
+        "description": "全局语句数/秒上限（令牌桶平滑限流），0 表示不限制",
+        "default": 0,
+        "minimum": 0,
+    },
+    "rate_limit_rows": {
+        "type": "number",
+        "description": "全局写入行数/秒上限，0 表示不限制",
+        "default": 0,
+        "minimum": 0,
+    },
+    "rate_limit_host_statements": {
+        "type": "number",
+        "description": "每个 host 的语句数/秒上限，0 表示不限制",
+        "default": 0,
+        "minimum": 0,
+    },
+    "max_in_flight_per_host": {
+        "type": "integer",
+        "description": "每个 host 同时在途的语句上限，0 表示不限制（仍受会话数约束）",
+        "default": 0,
+        "minimum": 0,
+    },
+    "statement_timeout": {
+        "type": "number",
+        "description": "单条语句超时（秒），超时后由驱动取消，0 表示不限制",
+        "default": 0,
+        "minimum": 0,
+    },
+    "slow_statement_threshold": {
+        "type": "number",
+        "description": "慢语句告警阈值（秒），超过后记录 stream、语句大小与耗时，0 表示关闭",
+        "default": 10,
+        "minimum": 0,
+    },
+}
+
+DEFAULT_EMIT_BUFFER_SIZE = 1 << 20  # 1 MiB
+DEFAULT_EMIT_FLUSH_INTERVAL = 1.0  # 秒
+
 
 def load_json(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
@@ -44,6 +152,9 @@ def read_config_from_env_or_path(config_path: Optional[str]) -> Dict[str, Any]:
 
 
 def read_catalog_from_env() -> Optional[Dict[str, Any]]:
+    context = current_invocation()
+    if context is not None:
+        return context.catalog
     raw = os.environ.get("AIRBYTE_CATALOG")
     if not raw:
         return None
@@ -54,14 +165,541 @@ def json_dumps(data: Dict[str, Any]) -> str:
     return json.dumps(data, ensure_ascii=False)
 
 
+class BufferedEmitter:
+    """
+    缓冲式 Airbyte 消息输出器
+
+    将消息编码后累积在内存缓冲区中，超过 buffer_size 或距上次刷新超过
+    flush_interval 秒时一次性写出，避免每条消息一次 write + flush 系统调用。
+    threaded=True 时序列化与写出在独立线程中完成，与查询/写入重叠执行；
+    否则由共用的定时线程按 flush_interval 写出，不依赖下一条消息的到来。
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        buffer_size: int = DEFAULT_EMIT_BUFFER_SIZE,
+        flush_interval: float = DEFAULT_EMIT_FLUSH_INTERVAL,
+        threaded: bool = False,
+        queue_size: int = 10000,
+    ) -> None:
+        self._stream = stream if stream is not None else sys.stdout
+        self._buffer_size = max(int(buffer_size), 0)
+        self._flush_interval = flush_interval
+        self._parts: List[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._closed = False
+        # 当前线程正持有（或正在获取）_lock；信号处理函数据此推迟写出，见 run_when_unlocked
+        self._local = threading.local()
+        self._queue: Optional["queue.Queue[Any]"] = None
+        self._thread: Optional[threading.Thread] = None
+        if threaded:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name="airbyte-emitter", daemon=True
+            )
+            self._thread.start()
+        elif self._buffer_size > 0 and self._flush_interval > 0:
+            _INTERVAL_FLUSHER.add(self)
+
+    def emit(self, message: Dict[str, Any]) -> None:
+        if self._closed:
+            # 关闭后的消息直接写出，保证不丢失
+            self._stream.write(json_dumps(message) + "\n")
+            self._stream.flush()
+            return
+        if self._queue is not None:
+            self._queue.put(message)
+            return
+        self._append(json_dumps(message) + "\n")
+
+    def _append(self, line: str) -> None:
+        self._local.busy = True
+        try:
+            with self._lock:
+                self._parts.append(line)
+                self._size += len(line)
+                if (
+                    self._size >= self._buffer_size
+                    or time.monotonic() - self._last_flush >= self._flush_interval
+                ):
+                    self._flush_locked()
+        finally:
+            self._leave()
+
+    def _leave(self) -> None:
+        """离开持锁区域，执行其间被推迟的回调"""
+        local = self._local
+        local.busy = False
+        deferred = getattr(local, "deferred", None)
+        if deferred is not None:
+            local.deferred = None
+            deferred()
+
+    def run_when_unlocked(self, callback: Callable[[], None]) -> None:
+        """
+        当前线程不在持锁区域内时立即调用 callback，否则推迟到离开该区域后调用
+        供信号处理函数使用：信号可能打断正在 _append 的主线程，此时再获取锁会死锁
+        """
+        if getattr(self._local, "busy", False):
+            self._local.deferred = callback
+        else:
+            callback()
+
+    def flush_if_due(self, now: float) -> float:
+        """缓冲区中有消息且距上次写出已超过 flush_interval 时写出；返回下一次检查的时刻"""
+        if self._closed or not self._lock.acquire(blocking=False):
+            return now + self._flush_interval
+        try:
+            if self._parts and now - self._last_flush >= self._flush_interval:
+                self._flush_locked()
+            return self._last_flush + self._flush_interval if self._parts else now + self._flush_interval
+        finally:
+            self._lock.release()
+
+    def _flush_locked(self) -> None:
+        with get_tracer().span("flush", cat="emit", size=self._size):
+            if self._parts:
+                self._stream.write("".join(self._parts))
+                self._parts = []
+                self._size = 0
+            self._stream.flush()
+        self._last_flush = time.monotonic()
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                self.flush()
+                continue
+            if item is self._STOP:
+                self._queue.task_done()
+                break
+            try:
+                self._append(json_dumps(item) + "\n")
+            except Exception as exc:  # noqa: BLE001
+                log(f"输出消息失败: {exc}")
+            finally:
+                self._queue.task_done()
+        self.flush()
+
+    def flush(self) -> None:
+        """写出缓冲区；线程模式下会等待队列中已提交的消息全部写出"""
+        if (
+            self._queue is not None
+            and self._thread is not None
+            and self._thread.is_alive()
+            and threading.current_thread() is not self._thread
+        ):
+            self._queue.join()
+        self._local.busy = True
+        try:
+            with self._lock:
+                self._flush_locked()
+        finally:
+            self._leave()
+
+    def close(self) -> None:
+        """停止写线程并写出全部剩余消息，可重复调用"""
+        if self._closed:
+            return
+        if self._queue is not None and self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._closed = True
+        _INTERVAL_FLUSHER.discard(self)
+        self._local.busy = True
+        try:
+            with self._lock:
+                self._flush_locked()
+        finally:
+            self._leave()
+
+
+class _IntervalFlusher:
+    """
+    为未使用写线程的 BufferedEmitter 按 flush_interval 定时写出缓冲区
+    所有 emitter 共用一个守护线程（首次注册时启动），只持有 emitter 的弱引用
+    """
+
+    # 两次检查之间的最长间隔（秒），新注册的 emitter 最迟在此之后被检查
+    _MAX_SLEEP = 1.0
+
+    def __init__(self) -> None:
+        self._emitters: "weakref.WeakSet[BufferedEmitter]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, emitter: BufferedEmitter) -> None:
+        with self._lock:
+            self._emitters.add(emitter)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="airbyte-emitter-flush", daemon=True
+                )
+                self._thread.start()
+
+    def discard(self, emitter: BufferedEmitter) -> None:
+        with self._lock:
+            self._emitters.discard(emitter)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                emitters = list(self._emitters)
+            now = time.monotonic()
+            wake = now + self._MAX_SLEEP
+            for emitter in emitters:
+                try:
+                    wake = min(wake, emitter.flush_if_due(now))
+                except Exception as exc:  # noqa: BLE001
+                    log(f"定时写出消息失败: {exc}")
+            del emitters
+            time.sleep(max(wake - time.monotonic(), 0.01))
+
+
+_INTERVAL_FLUSHER = _IntervalFlusher()
+
+
+_EMITTER: Optional[BufferedEmitter] = None
+_SIGNALS_INSTALLED = False
+
+
+def install_emitter(emitter: BufferedEmitter, handle_signals: bool = True) -> BufferedEmitter:
+    """
+    将 emitter 设为 emit_message 的输出目标
+    进程退出（atexit）以及收到 SIGTERM/SIGINT 时都会先写出缓冲区
+    """
+    global _EMITTER, _SIGNALS_INSTALLED
+    previous = _EMITTER
+    _EMITTER = emitter
+    if previous is not None and previous is not emitter:
+        previous.close()
+    atexit.register(emitter.close)
+    if (
+        handle_signals
+        and not _SIGNALS_INSTALLED
+        and threading.current_thread() is threading.main_thread()
+    ):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            _install_flush_handler(signum)
+        _SIGNALS_INSTALLED = True
+    return emitter
+
+
+def uninstall_emitter() -> None:
+    """写出并移除当前 emitter，之后 emit_message 恢复为逐条写出"""
+    global _EMITTER
+    emitter = _EMITTER
+    _EMITTER = None
+    if emitter is not None:
+        emitter.close()
+
+
+def flush_messages() -> None:
+    context = current_invocation()
+    emitter = context.emitter if context is not None else _EMITTER
+    if emitter is not None:
+        emitter.flush()
+    else:
+        sys.stdout.flush()
+
+
+@dataclass
+class InvocationContext:
+    """
+    单次命令调用的输出目标与 catalog
+
+    守护进程在同一进程内处理多个调用，每个连接线程通过 invocation_context 设置
+    各自的 context；emit_message / log / read_catalog_from_env 优先使用当前线程的
+    context。调用内部另起的工作线程（keepalive、慢语句 watchdog、执行线程池）通过
+    bind_invocation / adopt_invocation 沿用创建它们的调用的 context，日志写回该调用。
+    """
+    emitter: BufferedEmitter
+    stderr: TextIO
+    catalog: Optional[Dict[str, Any]] = None
+
+
+_INVOCATION = threading.local()
+
+
+def current_invocation() -> Optional[InvocationContext]:
+    return getattr(_INVOCATION, "context", None)
+
+
+@contextmanager
+def invocation_context(context: InvocationContext) -> Iterator[InvocationContext]:
+    """在当前线程内使用 context，退出时写出其 emitter 并恢复之前的 context"""
+    previous = current_invocation()
+    _INVOCATION.context = context
+    try:
+        yield context
+    finally:
+        _INVOCATION.context = previous
+        context.emitter.close()
+
+
+def bind_invocation(target: Callable[..., Any]) -> Callable[..., Any]:
+    """返回在当前线程的 context 中运行 target 的函数，用作工作线程的 target"""
+    context = current_invocation()
+    if context is None:
+        return target
+
+    @functools.wraps(target)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        previous = current_invocation()
+        _INVOCATION.context = context
+        try:
+            return target(*args, **kwargs)
+        finally:
+            _INVOCATION.context = previous
+
+    return run
+
+
+def adopt_invocation(context: Optional[InvocationContext]) -> None:
+    """在当前（工作）线程中使用 context；用作 ThreadPoolExecutor 的 initializer"""
+    _INVOCATION.context = context
+
+
+def _install_flush_handler(signum: int) -> None:
+    previous = signal.getsignal(signum)
+
+    def _handler(received: int, frame: Any) -> None:
+        def finish() -> None:
+            try:
+                uninstall_emitter()
+            finally:
+                if callable(previous):
+                    previous(received, frame)
+                else:
+                    signal.signal(received, signal.SIG_DFL)
+                    os.kill(os.getpid(), received)
+
+        # 信号打断了主线程中持有 emitter 锁的代码时，推迟到释放锁之后再写出
+        emitter = _EMITTER
+        if emitter is not None:
+            emitter.run_when_unlocked(finish)
+        else:
+            finish()
+
+    signal.signal(signum, _handler)
+
+
+def emitter_from_env() -> Optional[BufferedEmitter]:
+    """
+    根据环境变量创建 emitter：
+    - YUESHU_EMIT_BUFFER_SIZE: 缓冲区大小（字符数），0 表示关闭缓冲
+    - YUESHU_EMIT_FLUSH_INTERVAL: 最长刷新间隔（秒）
+    - YUESHU_EMIT_THREADED: 为 1/true 时使用独立写线程
+    """
+    buffer_size = int(os.environ.get("YUESHU_EMIT_BUFFER_SIZE", DEFAULT_EMIT_BUFFER_SIZE))
+    if buffer_size <= 0:
+        return None
+    flush_interval = float(
+        os.environ.get("YUESHU_EMIT_FLUSH_INTERVAL", DEFAULT_EMIT_FLUSH_INTERVAL)
+    )
+    threaded = os.environ.get("YUESHU_EMIT_THREADED", "").strip().lower() in {"1", "true", "yes"}
+    return BufferedEmitter(
+        buffer_size=buffer_size,
+        flush_interval=flush_interval,
+        threaded=threaded,
+    )
+
+
 def emit_message(message: Dict[str, Any]) -> None:
+    context = getattr(_INVOCATION, "context", None)
+    emitter = context.emitter if context is not None else _EMITTER
+    if emitter is not None:
+        emitter.emit(message)
+        return
     sys.stdout.write(json_dumps(message) + "\n")
     sys.stdout.flush()
 
 
 def log(message: str) -> None:
-    sys.stderr.write(message + "\n")
-    sys.stderr.flush()
+    context = getattr(_INVOCATION, "context", None)
+    stream = context.stderr if context is not None else sys.stderr
+    stream.write(message + "\n")
+    stream.flush()
+
+
+# Airbyte LOG 消息级别
+LOG_LEVELS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "WARN": 30,
+    "ERROR": 40,
+    "FATAL": 50,
+}
+
+# 默认采样：逐条语句日志每 10000 条输出 1 条
+DEFAULT_LOG_SAMPLING = {"statement": 10000}
+
+LogMessage = Union[str, Callable[[], str]]
+
+
+def _parse_level(level: Union[str, int, None], default: int = LOG_LEVELS["INFO"]) -> int:
+    if level is None or level == "":
+        return default
+    if isinstance(level, int):
+        return level
+    name = str(level).strip().upper()
+    if name == "WARNING":
+        name = "WARN"
+    if name not in LOG_LEVELS:
+        raise ValueError(f"未知日志级别: {level}")
+    return LOG_LEVELS[name]
+
+
+def _parse_category_map(raw: Optional[str]) -> Dict[str, float]:
+    """解析 "statement=10000,record=100" 形式的配置"""
+    result: Dict[str, float] = {}
+    if not raw:
+        return result
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        key, value = item.split("=", 1)
+        result[key.strip()] = float(value)
+    return result
+
+
+class Logger:
+    """
+    分级、可采样、可限流的日志器，输出 Airbyte LOG 消息
+
+    - 低于阈值的级别直接返回，不做任何格式化
+    - sample_every=N 时每 N 条只输出 1 条
+    - rate_limit=R 时每秒最多输出 R 条，被抑制的条数附加在下一条输出中
+    - message 支持 "%s" 占位符参数或无参可调用对象，均在确定输出后才格式化
+    """
+
+    def __init__(
+        self,
+        category: str,
+        level: int = LOG_LEVELS["INFO"],
+        sample_every: int = 1,
+        rate_limit: Optional[float] = None,
+    ) -> None:
+        self.category = category
+        self.level = level
+        self.sample_every = max(int(sample_every), 1)
+        self.rate_limit = rate_limit
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+        self._suppressed = 0
+
+    def is_enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def trace(self, message: LogMessage, *args: Any) -> None:
+        self.log(LOG_LEVELS["TRACE"], message, *args)
+
+    def debug(self, message: LogMessage, *args: Any) -> None:
+        self.log(LOG_LEVELS["DEBUG"], message, *args)
+
+    def info(self, message: LogMessage, *args: Any) -> None:
+        self.log(LOG_LEVELS["INFO"], message, *args)
+
+    def warn(self, message: LogMessage, *args: Any) -> None:
+        self.log(LOG_LEVELS["WARN"], message, *args)
+
+    def error(self, message: LogMessage, *args: Any) -> None:
+        self.log(LOG_LEVELS["ERROR"], message, *args)
+
+    def log(self, level: int, message: LogMessage, *args: Any) -> None:
+        if level < self.level:
+            return
+        if self.sample_every > 1 and next(self._counter) % self.sample_every:
+            return
+        suppressed = 0
+        if self.rate_limit is not None:
+            with self._lock:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                if self._window_count >= self.rate_limit:
+                    self._suppressed += 1
+                    return
+                self._window_count += 1
+                suppressed, self._suppressed = self._suppressed, 0
+
+        if callable(message):
+            text = message()
+        elif args:
+            text = message % args
+        else:
+            text = message
+        if self.sample_every > 1:
+            text = f"{text} (采样 1/{self.sample_every})"
+        if suppressed:
+            text = f"{text} (限流抑制 {suppressed} 条)"
+        emit_message(
+            {
+                "type": "LOG",
+                "log": {"level": _LEVEL_NAMES[level], "message": f"[{self.category}] {text}"},
+            }
+        )
+
+
+_LEVEL_NAMES = {value: name for name, value in LOG_LEVELS.items()}
+_LOGGERS: Dict[str, Logger] = {}
+_LOG_SETTINGS: Dict[str, Any] = {}
+
+
+def configure_logging(
+    level: Union[str, int, None] = None,
+    sampling: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    配置日志子系统；未指定的参数从环境变量读取：
+    - YUESHU_LOG_LEVEL: 全局级别（TRACE/DEBUG/INFO/WARN/ERROR/FATAL，默认 INFO）
+    - YUESHU_LOG_SAMPLE: 按类别采样，如 "statement=10000"
+    - YUESHU_LOG_RATE: 按类别限流（条/秒），如 "statement=5"
+    已创建的 Logger 会同步更新
+    """
+    if sampling is None:
+        sampling = dict(DEFAULT_LOG_SAMPLING)
+        sampling.update(_parse_category_map(os.environ.get("YUESHU_LOG_SAMPLE")))
+    if rate_limits is None:
+        rate_limits = _parse_category_map(os.environ.get("YUESHU_LOG_RATE"))
+    _LOG_SETTINGS["level"] = _parse_level(
+        level if level is not None else os.environ.get("YUESHU_LOG_LEVEL")
+    )
+    _LOG_SETTINGS["sampling"] = sampling
+    _LOG_SETTINGS["rate_limits"] = rate_limits
+    for logger in _LOGGERS.values():
+        _apply_log_settings(logger)
+
+
+def _apply_log_settings(logger: Logger) -> None:
+    logger.level = _LOG_SETTINGS["level"]
+    logger.sample_every = max(int(_LOG_SETTINGS["sampling"].get(logger.category, 1)), 1)
+    logger.rate_limit = _LOG_SETTINGS["rate_limits"].get(logger.category)
+
+
+def get_logger(category: str) -> Logger:
+    """获取（或创建）指定类别的 Logger"""
+    logger = _LOGGERS.get(category)
+    if logger is None:
+        if not _LOG_SETTINGS:
+            configure_logging()
+        logger = Logger(category)
+        _apply_log_settings(logger)
+        _LOGGERS[category] = logger
+    return logger
 
 
 def to_source_config(data: Dict[str, Any]) -> SourceConfig:
@@ -70,6 +708,10 @@ def to_source_config(data: Dict[str, Any]) -> SourceConfig:
         hosts=hosts,
         username=data["username"],
         password=data["password"],
+        hedge_reads=bool(data.get("hedge_reads", False)),
+        hedge_quantile=float(data.get("hedge_quantile", 0.95)),
+        hedge_delay=float(data.get("hedge_delay", 1.0)),
+        **_pool_options(data),
     )
 
 
@@ -81,9 +723,46 @@ def to_destination_config(data: Dict[str, Any]) -> DestinationConfig:
         password=data.get("password", "root"),
         graph=data.get("graph"),
         insert_mode=data.get("insert_mode"),
+        batch_size=int(data.get("batch_size") or 1),
+        export_dir=data.get("export_dir") or None,
+        export_shards=int(data.get("export_shards") or 4),
+        export_compress=bool(data.get("export_compress", True)),
+        **_pool_options(data),
     )
 
 
+def _pool_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """读取会话池配置，未配置的项使用 ConnectionConfig 默认值"""
+    options: Dict[str, Any] = {}
+    if data.get("min_sessions") is not None:
+        options["min_sessions"] = int(data["min_sessions"])
+    if data.get("max_sessions") is not None:
+        options["max_sessions"] = int(data["max_sessions"])
+    if data.get("keepalive_interval") is not None:
+        options["keepalive_interval"] = float(data["keepalive_interval"])
+    if data.get("host_selection"):
+        options["host_selection"] = str(data["host_selection"]).strip().lower()
+    if data.get("execution_mode"):
+        mode = str(data["execution_mode"]).strip().lower()
+        if mode not in ("sync", "asyncio"):
+            raise ValueError(f"未知的 execution_mode: {data['execution_mode']}")
+        options["execution_mode"] = mode
+    if data.get("max_in_flight") is not None:
+        options["max_in_flight"] = int(data["max_in_flight"])
+    for key in (
+        "rate_limit_statements",
+        "rate_limit_rows",
+        "rate_limit_host_statements",
+        "statement_timeout",
+        "slow_statement_threshold",
+    ):
+        if data.get(key) is not None:
+            options[key] = float(data[key])
+    if data.get("max_in_flight_per_host") is not None:
+        options["max_in_flight_per_host"] = int(data["max_in_flight_per_host"])
+    return options
+
+
 def _normalize_hosts(data: Dict[str, Any]) -> List[str]:
     hosts = data.get("hosts")
     if isinstance(hosts, list) and hosts:
@@ -0,0 +1,484 @@
+"""
+守护进程模式：在本地 UNIX socket 后常驻，跨调用复用会话与已解析的 schema
+
+Airbyte 每次同步都以新进程调用连接器，解释器启动、驱动导入、建立会话与读取
+schema 都计入每次调用的固定开销。守护进程常驻并保留：
+- 底层驱动会话（按 host / 用户缓存，见 WarmSessions）
+- 已解析的 GraphSchema（见 schema_reader.SchemaCache）
+
+    yueshu-airbyte daemon --socket /run/yueshu/daemon.sock
+    YUESHU_DAEMON_SOCKET=/run/yueshu/daemon.sock yueshu-airbyte --connector-type destination write --config config.json
+
+设置了 socket 的 check / discover / read / write 调用只做转发：把命令、配置、catalog
+与 stdin 发给守护进程，再把输出写回 stdout / stderr；守护进程不可用时回退为本地执行。
+
+协议（UTF-8 文本，按行分帧）：
+- 请求：首行为 JSON 请求头 {"connector_type", "command", "config", "catalog"}，
+  其后为 stdin 内容，客户端写完后关闭写端
+- 响应：普通行为 Airbyte 消息，原样写到 stdout；以 CONTROL_PREFIX 开头的行为控制帧，
+  {"stderr": 文本} 或结束帧 {"exit": 退出码, "error": 错误信息}
+
+本模块顶层只导入标准库中的轻量模块，转发调用不加载客户端与驱动。
+"""
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+CONTROL_PREFIX = "\x1e"
+SOCKET_ENV = "YUESHU_DAEMON_SOCKET"
+FORWARDED_COMMANDS = ("check", "discover", "read", "write")
+
+DEFAULT_SCHEMA_TTL = 300.0
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_MAX_IDLE_SESSIONS = 16  # 每个 host / 用户
+DEFAULT_MAX_CONCURRENT = 1
+
+_STDIN_CHUNK = 64 * 1024
+
+
+class DaemonError(RuntimeError):
+    """守护进程启动或运行错误"""
+
+
+class DaemonUnavailableError(ConnectionError):
+    """无法连接守护进程（未启动或 socket 失效），调用方应回退为本地执行"""
+
+
+# ============================================================================
+# 客户端：转发一次调用
+# ============================================================================
+
+def forward(
+    socket_path: str,
+    connector_type: str,
+    command: str,
+    config: Dict[str, Any],
+    catalog: Optional[Dict[str, Any]],
+    stdin: Optional[BinaryIO],
+    stdout: TextIO,
+    stderr: TextIO,
+) -> int:
+    """
+    把一次调用转发给守护进程并回写输出，返回调用的退出码
+
+    连接失败时抛出 DaemonUnavailableError；连接建立之后的错误通过退出码返回。
+    write 命令的 stdin 在独立线程中发送，与读取输出同时进行（目标端边读边回传 STATE）。
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError as exc:
+        sock.close()
+        raise DaemonUnavailableError(f"无法连接守护进程 {socket_path}: {exc}") from exc
+
+    exit_code: Optional[int] = None
+    with sock:
+        header = {
+            "connector_type": connector_type,
+            "command": command,
+            "config": config,
+            "catalog": catalog,
+        }
+        sock.sendall((json.dumps(header, ensure_ascii=False) + "\n").encode("utf-8"))
+        if command == "write" and stdin is not None:
+            threading.Thread(
+                target=_send_stdin, args=(sock, stdin), name="daemon-stdin", daemon=True
+            ).start()
+        else:
+            sock.shutdown(socket.SHUT_WR)
+
+        with sock.makefile("r", encoding="utf-8", newline="\n") as reader:
+            for line in reader:
+                if not line.startswith(CONTROL_PREFIX):
+                    stdout.write(line)
+                    continue
+                frame = json.loads(line[len(CONTROL_PREFIX):])
+                if "stderr" in frame:
+                    stderr.write(frame["stderr"])
+                    stderr.flush()
+                elif "exit" in frame:
+                    exit_code = int(frame["exit"])
+                    if frame.get("error"):
+                        stderr.write(f"守护进程执行失败: {frame['error']}\n")
+        stdout.flush()
+
+    if exit_code is None:
+        stderr.write("与守护进程的连接意外中断\n")
+        return 1
+    return exit_code
+
+
+def _send_stdin(sock: socket.socket, stdin: BinaryIO) -> None:
+    try:
+        while True:
+            chunk = stdin.read(_STDIN_CHUNK)
+            if not chunk:
+                break
+            sock.sendall(chunk)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        # 守护进程提前结束调用（如配置错误），错误由结束帧返回
+        pass
+
+
+# ============================================================================
+# 服务端：常驻状态
+# ============================================================================
+
+class WarmSessions:
+    """
+    跨调用复用的底层驱动会话
+
+    factory 作为 client_factory 传给 NebulaClient：会话池关闭会话时，干净的会话回到
+    空闲队列，下一次调用直接取用，省去建连与认证。执行过会话语句（USE / SESSION SET）
+    或出现连接错误的会话会真正关闭，避免把会话状态或失效连接带给后续调用。
+    空闲超过 idle_timeout 秒的会话在下次取用或 prune() 时关闭。
+    """
+
+    def __init__(
+        self,
+        client_factory: Optional[Callable[[List[str], str, str], Any]] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_idle: int = DEFAULT_MAX_IDLE_SESSIONS,
+    ) -> None:
+        from .nebula_client import _default_client_factory
+
+        self._factory = client_factory or _default_client_factory
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self._idle: Dict[Tuple[str, str, str], Deque[Tuple[float, Any]]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def factory(self, hosts: List[str], username: str, password: str) -> "_LeasedClient":
+        key = (",".join(hosts), username, password)
+        stale: List[Any] = []
+        client = None
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                released_at, candidate = idle.pop()  # 取最近归还的会话
+                if time.monotonic() - released_at < self.idle_timeout:
+                    client = candidate
+                    self.reused += 1
+                else:
+                    # 更早归还的会话同样已超时
+                    stale = [candidate] + [c for _, c in idle]
+                    idle.clear()
+        for old in stale:
+            _close_quietly(old)
+        if client is None:
+            client = self._factory(list(hosts), username, password)
+            with self._lock:
+                self.created += 1
+        return _LeasedClient(self, key, client)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def prune(self) -> None:
+        """关闭空闲超时的会话"""
+        deadline = time.monotonic() - self.idle_timeout
+        stale: List[Any] = []
+        with self._lock:
+            for idle in self._idle.values():
+                while idle and idle[0][0] <= deadline:
+                    stale.append(idle.popleft()[1])
+        for client in stale:
+            _close_quietly(client)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            stale = [c for idle in self._idle.values() for _, c in idle]
+            self._idle.clear()
+        for client in stale:
+            _close_quietly(client)
+
+    def _release(self, key: Tuple[str, str, str], client: Any, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, deque())
+                if not self._closed and len(idle) < self.max_idle:
+                    idle.append((time.monotonic(), client))
+                    return
+        _close_quietly(client)
+
+
+class _LeasedClient:
+    """WarmSessions 借出的会话：close() 时归还而不是关闭，其余属性转发给底层客户端"""
+
+    def __init__(self, owner: WarmSessions, key: Tuple[str, str, str], client: Any) -> None:
+        from .nebula_client import is_connection_error, session_statement_key
+
+        self._owner = owner
+        self._key = key
+        self._client = client
+        self._reusable = True
+        self._released = False
+        inner = client.execute
+
+        # 保留底层 execute 的签名，会话池据此判断是否支持 timeout / 查询参数
+        @functools.wraps(inner)
+        def execute(query: str, *args: Any, **kwargs: Any) -> Any:
+            if session_statement_key(query) is not None:
+                self._reusable = False
+            try:
+                return inner(query, *args, **kwargs)
+            except Exception as exc:
+                if is_connection_error(exc):
+                    self._reusable = False
+                raise
+
+        self.execute = execute
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._owner._release(self._key, self._client, self._reusable)
+
+
+def _close_quietly(client: Any) -> None:
+    try:
+        client.close()
+    except Exception:  # noqa: BLE001
+        pass
+
+
+class _FrameWriter:
+    """把一次调用的 stdout / stderr 复用到同一连接：stdout 原样写出，stderr 包装为控制帧"""
+
+    def __init__(self, wfile: TextIO) -> None:
+        self._wfile = wfile
+        self._lock = threading.Lock()
+        self.stdout = _Channel(self, None)
+        self.stderr = _Channel(self, "stderr")
+
+    def write(self, text: str, control: Optional[str]) -> None:
+        with self._lock:
+            if control is None:
+                self._wfile.write(text)
+            else:
+                self._wfile.write(
+                    CONTROL_PREFIX + json.dumps({control: text}, ensure_ascii=False) + "\n"
+                )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._wfile.flush()
+
+    def finish(self, exit_code: int, error: Optional[str]) -> None:
+        frame = {"exit": exit_code, "error": error}
+        with self._lock:
+            self._wfile.write(CONTROL_PREFIX + json.dumps(frame, ensure_ascii=False) + "\n")
+            self._wfile.flush()
+
+
+class _Channel:
+    """_FrameWriter 的一路输出，提供 emitter / log 需要的 write 与 flush"""
+
+    def __init__(self, frames: _FrameWriter, control: Optional[str]) -> None:
+        self._frames = frames
+        self._control = control
+
+    def write(self, text: str) -> int:
+        self._frames.write(text, self._control)
+        return len(text)
+
+    def flush(self) -> None:
+        self._frames.flush()
+
+
+class Daemon:
+    """
+    在 UNIX socket 上接受转发的调用，在连接线程中执行
+
+    每个调用的输出通过 common.invocation_context 写回各自的连接。指标注册表与
+    tracing 是进程级的，max_concurrent > 1 时并发调用的指标报告会相互混合，
+    因此默认逐个执行调用（会话与 schema 的复用不受影响）。
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        client_factory: Optional[Callable[[List[str], str, str], Any]] = None,
+        schema_ttl: float = DEFAULT_SCHEMA_TTL,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ) -> None:
+        from .schema_reader import SchemaCache
+
+        self.socket_path = socket_path
+        self.sessions = WarmSessions(client_factory, idle_timeout=idle_timeout)
+        self.schemas = SchemaCache(schema_ttl)
+        self.requests = 0
+        self._slots = threading.BoundedSemaphore(max(int(max_concurrent), 1))
+        self._server: Any = None
+
+    def bind(self) -> None:
+        """创建并监听 socket（仅当前用户可访问，请求中包含连接密码）"""
+        import socketserver
+
+        _remove_stale_socket(self.socket_path)
+        daemon = self
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                daemon._handle_connection(self.request)
+
+        class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        previous_umask = os.umask(0o077)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(previous_umask)
+
+    def serve_forever(self) -> None:
+        from .common import log
+
+        if self._server is None:
+            self.bind()
+        log(f"守护进程监听 {self.socket_path}")
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """停止 serve_forever；须在其它线程中调用"""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self.sessions.close()
+
+    def _handle_connection(self, conn: socket.socket) -> None:
+        import traceback
+
+        from .common import BufferedEmitter, InvocationContext, invocation_context, log
+
+        reader = conn.makefile("r", encoding="utf-8", newline="\n")
+        writer = conn.makefile("w", encoding="utf-8", newline="\n")
+        frames = _FrameWriter(writer)
+        exit_code, error = 0, None
+        try:
+            request = json.loads(reader.readline() or "{}")
+            with self._slots:
+                self.requests += 1
+                context = InvocationContext(
+                    emitter=BufferedEmitter(stream=frames.stdout),
+                    stderr=frames.stderr,
+                    catalog=request.get("catalog"),
+                )
+                try:
+                    with invocation_context(context):
+                        self._dispatch(request, reader)
+                finally:
+                    self.sessions.prune()
+        except (Exception, SystemExit) as exc:
+            exit_code, error = 1, f"{type(exc).__name__}: {exc}"
+            try:
+                frames.stderr.write(traceback.format_exc())
+            except OSError:
+                pass
+        try:
+            frames.finish(exit_code, error)
+        except OSError as exc:
+            log(f"回写调用结果失败: {exc}")
+        finally:
+            for stream in (reader, writer):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+    def _dispatch(self, request: Dict[str, Any], stdin: TextIO) -> None:
+        from .common import emit_message
+
+        connector_type = "source" if request.get("connector_type") == "source" else "destination"
+        command = request.get("command")
+        if command == "spec":
+            from . import spec
+
+            emit_message(getattr(spec, f"{connector_type}_spec")())
+            return
+        if command not in FORWARDED_COMMANDS:
+            raise SystemExit(f"未知命令: {command}")
+        connector = importlib.import_module(f".{connector_type}", __package__)
+        config = request.get("config") or {}
+        # 所有命令共用常驻的会话；destination 的命令还共用 schema 缓存
+        options: Dict[str, Any] = {"client_factory": self.sessions.factory}
+        if connector_type == "destination":
+            options["schema_cache"] = self.schemas
+        if command == "check":
+            connector.check(config, **options)
+        elif command == "discover":
+            connector.discover(config, **options)
+        elif command == "read":
+            connector.read(config, **options)
+        else:
+            connector.write(config, stdin, **options)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """删除上次异常退出留下的 socket 文件；已有守护进程在监听时报错"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise DaemonError(f"已有守护进程在 {path} 监听")
+
+
+def serve(
+    socket_path: str,
+    schema_ttl: float = DEFAULT_SCHEMA_TTL,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+) -> None:
+    """前台运行守护进程，直到收到 SIGTERM / SIGINT"""
+    daemon = Daemon(
+        socket_path,
+        schema_ttl=schema_ttl,
+        idle_timeout=idle_timeout,
+        max_concurrent=max_concurrent,
+    )
+    daemon.bind()
+
+    def _stop(signum: int, frame: Any) -> None:
+        # shutdown() 会等待 serve_forever 退出，不能在其所在线程中调用
+        threading.Thread(target=daemon.shutdown, name="daemon-stop", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    daemon.serve_forever()
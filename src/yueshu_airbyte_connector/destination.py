@@ -1,55 +1,61 @@
 from __future__ import annotations
 
+import itertools
+import json
 import re
-from typing import Any, Dict, Iterable, Optional
+import time
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Set, Tuple,
+)
 
 from .common import (
     DEFAULT_CHECK_QUERY,
+    DestinationConfig,
     emit_message,
-    iter_airbyte_messages,
+    get_logger,
     log,
     read_catalog_from_env,
     to_destination_config,
 )
 from .gql_generator import (
-    generate_gql_from_mapping,
-    generate_vertex_gql_with_schema,
-    generate_edge_gql_with_schema,
+    ColumnFormatter,
+    StatementTemplate,
+    compile_edge_template,
+    compile_mapping_template,
+    compile_vertex_template,
+    format_column,
     transform_flat_config_to_mapping,
 )
-from .nebula_client import NebulaClient, NebulaClientError
-from .schema_reader import GraphSchema, read_graph_schema
-
-
-def spec() -> Dict[str, Any]:
-    return {
-        "type": "SPEC",
-        "spec": {
-            "documentationUrl": "",
-            "connectionSpecification": {
-                "type": "object",
-                "required": ["hosts", "username", "password"],
-                "properties": {
-                    "hosts": {"type": "array", "items": {"type": "string"}},
-                    "username": {"type": "string", "default": "root"},
-                    "password": {"type": "string", "airbyte_secret": True, "default": "root"},
-                    "graph": {"type": "string", "description": "The graph space to connect to.", "default": ""},
-                },
-            },
-            "supportsNormalization": False,
-            "supportsDBT": False,
-            "supported_destination_sync_modes": ["append", "overwrite"],
-        },
-    }
+from .metrics import MetricsRegistry, encoded_size, reset_registry
+from .nebula_client import (
+    PHASE_EDGE,
+    PHASE_VERTEX,
+    ClientFactory,
+    NebulaClient,
+    NebulaClientError,
+    statement_phase,
+)
+from .schema_reader import GraphSchema, SchemaCache, read_graph_schema
+from .spec import destination_spec as spec  # noqa: F401  保持 destination.spec() 可用
+from .tracing import get_tracer
+
+_STATEMENT_LOG = get_logger("statement")
+
+# asyncio 模式下每次从 stdin 读取并解析的消息数
+_ASYNC_READ_CHUNK = 1000
 
 
-def check(config_data: Dict[str, Any]) -> None:
+def check(
+    config_data: Dict[str, Any],
+    client_factory: Optional[ClientFactory] = None,
+    schema_cache: Optional[SchemaCache] = None,
+) -> None:
+    """
+    执行检查查询并输出 CONNECTION_STATUS，配置了 graph 时验证能读取其 schema；
+    client_factory 与 schema_cache 的含义与 write 相同
+    """
     cfg = to_destination_config(config_data)
-    client = NebulaClient(
-        hosts=cfg.hosts,
-        username=cfg.username,
-        password=cfg.password,
-    )
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
     try:
         client.connect()
         client.execute(DEFAULT_CHECK_QUERY)
@@ -58,7 +64,7 @@ def check(config_data: Dict[str, Any]) -> None:
         if cfg.graph:
             log(f"正在验证图空间 {cfg.graph}...")
             try:
-                schema = read_graph_schema(client, cfg.graph)
+                schema = _load_schema(client, cfg, schema_cache)
                 log(f"成功读取 schema: {len(schema.vertices)} 个点类型, {len(schema.edges)} 个边类型")
             except Exception as e:
                 emit_message(
@@ -89,13 +95,19 @@ def check(config_data: Dict[str, Any]) -> None:
         client.close()
 
 
-def discover(config_data: Dict[str, Any]) -> None:
+def discover(
+    config_data: Dict[str, Any],
+    client_factory: Optional[ClientFactory] = None,
+    schema_cache: Optional[SchemaCache] = None,
+) -> None:
     """
     Discover the graph schema and return catalog with streams for each vertex and edge type.
     
     For Yueshu, this generates streams for:
     - Each vertex type (e.g., Account, User, etc.)
     - Each edge type (e.g., Transfer, follows, etc.)
+
+    client_factory and schema_cache are the same as for write (see daemon).
     """
     cfg = to_destination_config(config_data)
     
@@ -108,17 +120,13 @@ def discover(config_data: Dict[str, Any]) -> None:
         )
         return
     
-    client = NebulaClient(
-        hosts=cfg.hosts,
-        username=cfg.username,
-        password=cfg.password,
-    )
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
     
     try:
         client.connect()
         
         # 读取 graph schema
-        schema = read_graph_schema(client, cfg.graph)
+        schema = _load_schema(client, cfg, schema_cache)
         
         streams = []
         
@@ -266,15 +274,18 @@ def _apply_table_insert(query: str, write_mode: str | None) -> str:
     return query
 
 
-def _load_write_map(config_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+def _load_write_map(
+    config_data: Dict[str, Any], catalog: Optional[Dict[str, Any]] = None
+) -> Dict[str, Dict[str, Any]]:
     """
-    Load write configuration from catalog.
+    Load write configuration from catalog (defaults to AIRBYTE_CATALOG).
     Supports three mapping formats (in priority order):
     1. Schema-based (new) - tag/edge + field_mapping
     2. Mapping-based (hierarchical) - full mapping config
     3. Mapping-based (flat) - auto-converted to hierarchical
     """
-    catalog = read_catalog_from_env() or {}
+    if catalog is None:
+        catalog = read_catalog_from_env() or {}
     write_map: Dict[str, Dict[str, Any]] = {}
 
     for stream_entry in catalog.get("streams", []):
@@ -328,26 +339,250 @@ def _load_write_map(config_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     return write_map
 
 
-def write(config_data: Dict[str, Any], stdin: Iterable[str]) -> None:
-    cfg = to_destination_config(config_data)
-    write_map = _load_write_map(config_data)
-    if not write_map:
-        raise ValueError(
-            "配置不能为空，请在 AIRBYTE_CATALOG 的 stream config 中提供配置"
+def stream_phases(catalog: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    返回 catalog 中各 stream 的写入阶段：点 stream 为 PHASE_VERTEX，边 stream 为
+    PHASE_EDGE（与 statement_phase 对生成语句的判断一致），不必读取 schema
+    """
+    phases: Dict[str, int] = {}
+    for stream, write_item in _load_write_map({}, catalog).items():
+        if write_item.get("mode") == "schema_based":
+            edge = bool(write_item.get("edge")) and not write_item.get("tag")
+        else:
+            mapping = write_item.get("mapping_config", {}).get("mapping", {})
+            edge = mapping.get("type", "vertex") == "edge"
+        phases[stream] = PHASE_EDGE if edge else PHASE_VERTEX
+    return phases
+
+
+def _iter_messages(
+    stdin: Iterable[str], metrics: MetricsRegistry
+) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """逐行解析 Airbyte 消息，返回 (message, 行字节数) 并统计 decode 耗时"""
+    tracer = get_tracer()
+    lines = iter(stdin)
+    while True:
+        read_start = time.perf_counter()
+        line = next(lines, None)
+        if line is None:
+            break
+        start = time.perf_counter()
+        tracer.add_complete("stdin.read", read_start, start, cat="stdin")
+        line = line.strip()
+        if not line:
+            continue
+        message = json.loads(line)
+        end = time.perf_counter()
+        metrics.add_stage_time("decode", end - start)
+        tracer.add_complete("decode", start, end, cat="stdin")
+        yield message, encoded_size(line)
+
+
+def _stream_statements(
+    write_item: Dict[str, Any],
+    stream: str,
+    current_graph: Optional[str],
+    initialized_streams: Set[str],
+) -> Tuple[List[str], Optional[str]]:
+    """
+    返回写入该 stream 的记录前需要执行的语句（切换 graph、每个 stream 一次的
+    setup_queries），以及执行后的当前 graph
+    """
+    statements: List[str] = []
+    # Handle graph switching (for backward compatibility with old config)
+    graph = write_item.get("graph") or current_graph
+    if graph and graph != current_graph:
+        statements.append(f"USE {graph}")
+        current_graph = graph
+
+    # Execute setup queries once per stream
+    if stream not in initialized_streams:
+        statements.extend(query for query in write_item.get("setup_queries") or [] if query)
+        initialized_streams.add(stream)
+    return statements, current_graph
+
+
+def _compile_template(
+    write_item: Dict[str, Any],
+    stream: str,
+    schema: Optional[GraphSchema],
+    global_insert_mode: Optional[str],
+) -> StatementTemplate:
+    """
+    为 stream 编译语句模板；写入模式（INSERT OR IGNORE 等）与 TABLE 前缀
+    直接编译进模板，不再逐条语句做正则替换
+    """
+    mode = write_item.get("mode", "mapping_based")
+
+    if mode == "schema_based":
+        # 新的基于 schema 的配置
+        tag = write_item.get("tag")
+        edge = write_item.get("edge")
+        field_mapping = write_item.get("field_mapping", {})
+        insert_keyword = _normalize_write_mode(global_insert_mode)
+
+        if tag:
+            # 点表插入
+            tag_schema = schema.get_vertex_schema(tag)
+            if not tag_schema:
+                raise ValueError(f"TAG {tag} 在 schema 中不存在")
+            return compile_vertex_template(tag_schema, field_mapping, insert_keyword, table=True)
+        if edge:
+            # 边表插入
+            edge_schema = schema.get_edge_schema(edge)
+            if not edge_schema:
+                raise ValueError(f"EDGE {edge} 在 schema 中不存在")
+
+            src_tag = write_item.get("src_tag")
+            dst_tag = write_item.get("dst_tag")
+            if not src_tag or not dst_tag:
+                raise ValueError(f"Edge 配置缺少 src_tag 或 dst_tag (stream: {stream})")
+
+            return compile_edge_template(
+                edge_schema, src_tag, dst_tag, field_mapping, insert_keyword, table=True
+            )
+        raise ValueError(f"schema-based 配置必须指定 tag 或 edge (stream: {stream})")
+
+    # 旧的 mapping-based 配置（向后兼容）
+    mapping_config = write_item.get("mapping_config", {})
+    write_mode = mapping_config.get("write_mode") or global_insert_mode
+    return compile_mapping_template(mapping_config, _normalize_write_mode(write_mode), table=True)
+
+
+class _StatementBuilder:
+    """按 stream 缓存语句模板，为每条记录生成语句"""
+
+    def __init__(
+        self,
+        write_map: Dict[str, Dict[str, Any]],
+        schema: Optional[GraphSchema],
+        global_insert_mode: Optional[str],
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._write_map = write_map
+        self._schema = schema
+        self._global_insert_mode = global_insert_mode
+        self._metrics = metrics
+        self._templates: Dict[str, StatementTemplate] = {}
+
+    def template(self, stream: str, data: Optional[Dict[str, Any]] = None) -> StatementTemplate:
+        template = self._templates.get(stream)
+        if template is not None:
+            return template
+        write_item = self._write_map[stream]
+        if write_item.get("mode") == "schema_based" and not self._schema:
+            raise ValueError(f"未配置 graph，无法使用 schema-based 模式 (stream: {stream})")
+        try:
+            template = _compile_template(write_item, stream, self._schema, self._global_insert_mode)
+        except Exception as e:
+            raise self.reject(stream, data, e)
+        self._templates[stream] = template
+        return template
+
+    def reject(self, stream: str, data: Optional[Dict[str, Any]], exc: Exception) -> ValueError:
+        self._metrics.inc("rejects")
+        log(f"生成 GQL 失败: {exc}, stream={stream}, data={data}")
+        return ValueError(f"GQL 生成失败 (stream: {stream}): {exc}")
+
+    def render(self, stream: str, data: Dict[str, Any]) -> str:
+        """生成内联字面量的语句"""
+        template = self.template(stream, data)
+        try:
+            return template.render(data)
+        except Exception as e:
+            raise self.reject(stream, data, e)
+
+    def bind(self, stream: str, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """生成参数化语句与参数"""
+        template = self.template(stream, data)
+        try:
+            return template.bind(data)
+        except Exception as e:
+            raise self.reject(stream, data, e)
+
+    def key(self, stream: str, data: Dict[str, Any]) -> Hashable:
+        """记录写入的点或边的标识，见 StatementTemplate.key"""
+        return self.template(stream, data).key(data)
+
+
+class _WriteBuffer:
+    """
+    缓冲待执行的写入语句，达到 batch_size 或调用 flush 时通过
+    NebulaClient.execute_many 批量执行，多条语句共享网络往返
+
+    批次内的点写入语句先于边写入语句执行（同类语句保持输入顺序），边写入时
+    同一批次中的端点已经写入；key 标识语句写入的点或边，同一元素的多次写入
+    按输入顺序执行。
+    """
+
+    def __init__(self, client: NebulaClient, metrics: MetricsRegistry, batch_size: int) -> None:
+        self._client = client
+        self._metrics = metrics
+        self._batch_size = max(batch_size, 1)
+        self._pending: List[Tuple[int, str, str, Optional[Dict[str, Any]], int, Optional[Hashable]]] = []
+
+    def add(
+        self,
+        stream: str,
+        gql: str,
+        params: Optional[Dict[str, Any]],
+        nbytes: int,
+        key: Optional[Hashable] = None,
+    ) -> None:
+        self._pending.append((statement_phase(gql), stream, gql, params, nbytes, key))
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """执行所有缓冲的语句；有语句失败时在全部执行完后抛出第一个错误"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        pending.sort(key=lambda item: item[0])
+        streams = {item[1] for item in pending}
+        start = time.perf_counter()
+        results = self._client.execute_many(
+            [item[2] for item in pending],
+            rows=1,
+            stream=next(iter(streams)) if len(streams) == 1 else None,
+            params=[item[3] for item in pending],
+            keys=[item[5] for item in pending],
         )
-    
-    client = NebulaClient(
-        hosts=cfg.hosts,
-        username=cfg.username,
-        password=cfg.password,
+        self._metrics.add_stage_time("execute", time.perf_counter() - start)
+        errors = []
+        for (_, stream, _, _, nbytes, _), result in zip(pending, results):
+            if result.ok:
+                self._metrics.add_records(stream, 1, nbytes)
+            else:
+                errors.append(result.error)
+        self._metrics.maybe_report()
+        if errors:
+            log(f"批量写入中 {len(errors)}/{len(pending)} 条语句失败")
+            raise errors[0]
+
+
+def _load_schema(
+    client: Any, cfg: DestinationConfig, schema_cache: Optional[SchemaCache]
+) -> GraphSchema:
+    if schema_cache is None:
+        return read_graph_schema(client, cfg.graph)
+    return schema_cache.get(
+        cfg.hosts, cfg.username, cfg.graph, lambda: read_graph_schema(client, cfg.graph)
     )
-    
-    # 读取 schema（如果需要）
+
+
+def _connect(
+    cfg: DestinationConfig,
+    client_factory: Optional[ClientFactory],
+    schema_cache: Optional[SchemaCache],
+) -> Tuple[NebulaClient, Optional[GraphSchema]]:
+    """建立连接，配置了 graph 时读取其 schema"""
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
     schema: Optional[GraphSchema] = None
     if cfg.graph:
         try:
             client.connect()
-            schema = read_graph_schema(client, cfg.graph)
+            schema = _load_schema(client, cfg, schema_cache)
             log(f"成功读取 graph {cfg.graph} schema: {len(schema.vertices)} 点类型, {len(schema.edges)} 边类型")
         except Exception as e:
             log(f"读取 schema 失败: {e}")
@@ -355,15 +590,74 @@ def write(config_data: Dict[str, Any], stdin: Iterable[str]) -> None:
             raise ValueError(f"无法读取图空间 {cfg.graph} 的 schema: {e}")
     else:
         client.connect()
+    return client, schema
+
+
+def write(
+    config_data: Dict[str, Any],
+    stdin: Iterable[str],
+    client_factory: Optional[ClientFactory] = None,
+    schema_cache: Optional[SchemaCache] = None,
+) -> None:
+    """
+    写入 stdin 中的 RECORD；client_factory 可替换底层客户端
+    （如 MemoryBackend.factory，用于无网络的测试与压测），
+    schema_cache 用于在多次写入之间复用已读取的 schema（见 daemon）。
+    配置了 export_dir 时只生成语句并写入分片脚本文件，不执行（见 script_export）
+    """
+    cfg = to_destination_config(config_data)
+    if cfg.execution_mode == "asyncio" and not cfg.export_dir:
+        import asyncio
+
+        asyncio.run(write_async(config_data, stdin, client_factory, schema_cache))
+        return
+    metrics = reset_registry("destination")
+    tracer = get_tracer()
+    write_map = _load_write_map(config_data)
+    if not write_map:
+        raise ValueError(
+            "配置不能为空，请在 AIRBYTE_CATALOG 的 stream config 中提供配置"
+        )
+    
+    exporter = None
+    client: Optional[NebulaClient] = None
+    schema: Optional[GraphSchema] = None
+    if cfg.export_dir:
+        from .script_export import ScriptExporter
+
+        # 导出模式只在需要读取 schema 时连接集群
+        if cfg.graph:
+            client, schema = _connect(cfg, client_factory, schema_cache)
+        exporter = ScriptExporter(cfg.export_dir, metrics, cfg.export_shards, cfg.export_compress)
+    else:
+        client, schema = _connect(cfg, client_factory, schema_cache)
     
     # 获取全局 insert_mode
-    global_insert_mode = cfg.insert_mode
+    builder = _StatementBuilder(write_map, schema, cfg.insert_mode, metrics)
     
     try:
+        if exporter is not None:
+            # 导出的脚本需要独立于会话执行，始终使用字面量语句
+            use_params = False
+            buffer: Any = exporter
+            run_statement = exporter.add_setup
+        else:
+            # 驱动与服务端支持查询参数时，每个 stream 发送稳定的参数化语句
+            use_params = client.supports_parameters()
+            log("写入使用参数化语句" if use_params else "驱动不支持查询参数，写入使用字面量语句")
+            buffer = _WriteBuffer(client, metrics, cfg.batch_size)
+            run_statement = client.execute
+
         current_graph = cfg.graph if cfg.graph else None
-        initialized_streams = set()
+        initialized_streams: Set[str] = set()
         
-        for message in iter_airbyte_messages(stdin):
+        for message, nbytes in _iter_messages(stdin, metrics):
+            if message.get("type") == "STATE":
+                # STATE 之前的记录全部写入后才回传该 STATE
+                buffer.flush()
+                with tracer.span("state", cat="emit"):
+                    emit_message(message)
+                continue
             if message.get("type") != "RECORD":
                 continue
             
@@ -373,78 +667,240 @@ def write(config_data: Dict[str, Any], stdin: Iterable[str]) -> None:
             write_item = write_map.get(stream)
             
             if not write_item:
+                metrics.inc("skipped")
                 continue
             
-            # Handle graph switching (for backward compatibility with old config)
-            graph = write_item.get("graph") or current_graph
-            if graph and graph != current_graph:
-                client.execute(f"USE {graph}")
-                current_graph = graph
-            
-            # Execute setup queries once per stream
-            if stream not in initialized_streams:
-                for query in write_item.get("setup_queries") or []:
-                    if query:
-                        client.execute(query)
-                initialized_streams.add(stream)
+            statements, current_graph = _stream_statements(
+                write_item, stream, current_graph, initialized_streams
+            )
+            if statements:
+                buffer.flush()
+            for statement in statements:
+                run_statement(statement, stream=stream)
             
             # Generate GQL based on configuration mode
-            mode = write_item.get("mode", "mapping_based")
-            
-            if mode == "schema_based":
-                # 新的基于 schema 的配置
-                if not schema:
-                    raise ValueError(f"未配置 graph，无法使用 schema-based 模式 (stream: {stream})")
-                
-                tag = write_item.get("tag")
-                edge = write_item.get("edge")
-                field_mapping = write_item.get("field_mapping", {})
-                
-                try:
-                    if tag:
-                        # 点表插入
-                        tag_schema = schema.get_vertex_schema(tag)
-                        if not tag_schema:
-                            raise ValueError(f"TAG {tag} 在 schema 中不存在")
-                        gql = generate_vertex_gql_with_schema(tag_schema, field_mapping, data)
-                        write_mode = global_insert_mode
-                    elif edge:
-                        # 边表插入
-                        edge_schema = schema.get_edge_schema(edge)
-                        if not edge_schema:
-                            raise ValueError(f"EDGE {edge} 在 schema 中不存在")
-                        
-                        src_tag = write_item.get("src_tag")
-                        dst_tag = write_item.get("dst_tag")
-                        if not src_tag or not dst_tag:
-                            raise ValueError(f"Edge 配置缺少 src_tag 或 dst_tag (stream: {stream})")
-                        
-                        gql = generate_edge_gql_with_schema(
-                            edge_schema, src_tag, dst_tag, field_mapping, data
-                        )
-                        write_mode = global_insert_mode
-                    else:
-                        raise ValueError(f"schema-based 配置必须指定 tag 或 edge (stream: {stream})")
-                except Exception as e:
-                    log(f"生成 GQL 失败: {e}, stream={stream}, data={data}")
-                    raise ValueError(f"GQL 生成失败 (stream: {stream}): {e}")
-                    
+            generate_start = time.perf_counter()
+            params = None
+            if use_params:
+                gql, params = builder.bind(stream, data)
             else:
-                # 旧的 mapping-based 配置（向后兼容）
-                mapping_config = write_item.get("mapping_config", {})
-                try:
-                    gql = generate_gql_from_mapping(mapping_config, data)
-                    write_mode = mapping_config.get("write_mode") or global_insert_mode
-                except Exception as e:
-                    log(f"生成 GQL 失败: {e}, stream={stream}, data={data}")
-                    raise ValueError(f"GQL 生成失败 (stream: {stream}): {e}")
+                gql = builder.render(stream, data)
+            generate_end = time.perf_counter()
+            metrics.add_stage_time("generate", generate_end - generate_start)
+            tracer.add_complete("generate", generate_start, generate_end, args={"stream": stream})
             
-            # Apply write mode
-            gql = _apply_table_insert(gql, write_mode)
-            
-            log(f"写入流 {stream}: {gql}")
-            client.execute(gql)
+            _STATEMENT_LOG.info("写入流 %s: %s", stream, gql)
+            buffer.add(stream, gql, params, nbytes, builder.key(stream, data))
         
-        emit_message({"type": "STATE", "state": {"last_write": True}})
+        buffer.flush()
+        if exporter is not None:
+            exporter.finish()
+        with tracer.span("state", cat="emit"):
+            emit_message({"type": "STATE", "state": {"last_write": True}})
+    finally:
+        if exporter is not None:
+            exporter.close()
+        if client is not None:
+            client.close()
+        metrics.report_final()
+
+
+# 列批次：(列名 -> 列值, 行数, 字节数)
+ColumnBatch = Tuple[Mapping[str, Any], int, int]
+
+
+def write_columns(
+    config_data: Dict[str, Any],
+    stream: str,
+    read_batches: Callable[[List[str]], Iterable[ColumnBatch]],
+    client_factory: Optional[ClientFactory] = None,
+    schema_cache: Optional[SchemaCache] = None,
+    formatter: ColumnFormatter = format_column,
+) -> None:
+    """
+    写入一个 stream 的列式数据（见 columnar）：以模板需要的列名调用 read_batches，
+    每个批次按 stream 的语句模板整列格式化（StatementTemplate.render_columns），
+    不构造逐行的 dict；写入模式、批量执行与 write 相同，始终使用字面量语句
+    """
+    cfg = to_destination_config(config_data)
+    metrics = reset_registry("destination")
+    tracer = get_tracer()
+    write_map = _load_write_map(config_data)
+    write_item = write_map.get(stream)
+    if not write_item:
+        raise ValueError(f"catalog 中没有 stream {stream} 的写入配置")
+
+    client, schema = _connect(cfg, client_factory, schema_cache)
+    builder = _StatementBuilder(write_map, schema, cfg.insert_mode, metrics)
+    try:
+        template = builder.template(stream)
+        statements, _ = _stream_statements(write_item, stream, cfg.graph, set())
+        for statement in statements:
+            client.execute(statement, stream=stream)
+
+        buffer = _WriteBuffer(client, metrics, cfg.batch_size)
+        for columns, rows, nbytes in read_batches(template.source_fields()):
+            if not rows:
+                continue
+            generate_start = time.perf_counter()
+            try:
+                gqls = template.render_columns(columns, rows, formatter)
+            except Exception as e:
+                raise builder.reject(stream, {"columns": list(columns)}, e)
+            generate_end = time.perf_counter()
+            metrics.add_stage_time("generate", generate_end - generate_start)
+            tracer.add_complete("generate", generate_start, generate_end, args={"stream": stream, "rows": rows})
+            row_bytes = nbytes // rows
+            for gql, key in zip(gqls, template.column_keys(columns, rows)):
+                buffer.add(stream, gql, None, row_bytes, key)
+        buffer.flush()
     finally:
         client.close()
+        metrics.report_final()
+
+
+def _read_chunk(
+    messages: Iterator[Tuple[Dict[str, Any], int]], size: int
+) -> List[Tuple[Dict[str, Any], int]]:
+    return list(itertools.islice(messages, size))
+
+
+async def write_async(
+    config_data: Dict[str, Any],
+    stdin: Iterable[str],
+    client_factory: Optional[ClientFactory] = None,
+    schema_cache: Optional[SchemaCache] = None,
+) -> None:
+    """
+    asyncio 模式的 write：写入语句并发执行（在途上限 max_in_flight），
+    stdin 按块在线程中读取与解析，避免阻塞事件循环。
+
+    以下情况先等待所有在途语句完成再发出语句（与 NebulaClient.execute_many 的分轮一致）：
+    - 切换 stream 需要执行 USE / setup_queries，保证会话语句只作用于之后的记录
+    - 边写入语句发出时仍有点写入语句在途，保证端点先写入
+    - 同一个点或边（StatementTemplate.key）已有写入在途，保证后写入的值生效
+    """
+    import asyncio
+
+    from .aio_client import AsyncNebulaClient
+
+    cfg = to_destination_config(config_data)
+    metrics = reset_registry("destination")
+    tracer = get_tracer()
+    write_map = _load_write_map(config_data)
+    if not write_map:
+        raise ValueError(
+            "配置不能为空，请在 AIRBYTE_CATALOG 的 stream config 中提供配置"
+        )
+
+    loop = asyncio.get_running_loop()
+    client = AsyncNebulaClient.from_config(cfg, client_factory=client_factory)
+    await client.connect()
+
+    schema: Optional[GraphSchema] = None
+    if cfg.graph:
+        try:
+            schema = await loop.run_in_executor(
+                None, _load_schema, client.blocking(), cfg, schema_cache
+            )
+            log(f"成功读取 graph {cfg.graph} schema: {len(schema.vertices)} 点类型, {len(schema.edges)} 边类型")
+        except Exception as e:
+            log(f"读取 schema 失败: {e}")
+            await client.close()
+            raise ValueError(f"无法读取图空间 {cfg.graph} 的 schema: {e}")
+
+    # asyncio 模式始终使用字面量语句
+    builder = _StatementBuilder(write_map, schema, cfg.insert_mode, metrics)
+    pending: Set[asyncio.Task] = set()
+    # 在途语句写入的元素与在途的点写入语句数，由任务完成回调更新
+    inflight_keys: Dict[Hashable, int] = {}
+    inflight_vertices = 0
+
+    def _track(task: asyncio.Task, key: Hashable, vertex: bool) -> None:
+        nonlocal inflight_vertices
+        inflight_keys[key] = inflight_keys.get(key, 0) + 1
+        inflight_vertices += vertex
+
+        def done(_: asyncio.Task) -> None:
+            nonlocal inflight_vertices
+            remaining = inflight_keys.pop(key) - 1
+            if remaining:
+                inflight_keys[key] = remaining
+            inflight_vertices -= vertex
+
+        task.add_done_callback(done)
+
+    async def _execute(stream: str, gql: str, nbytes: int) -> None:
+        start = time.perf_counter()
+        await client.execute(gql, rows=1, stream=stream)
+        metrics.add_stage_time("execute", time.perf_counter() - start)
+        metrics.add_records(stream, 1, nbytes)
+
+    async def _drain(return_when: str = asyncio.ALL_COMPLETED) -> None:
+        if not pending:
+            return
+        done, _ = await asyncio.wait(pending, return_when=return_when)
+        pending.difference_update(done)
+        for task in done:
+            task.result()
+
+    try:
+        current_graph = cfg.graph if cfg.graph else None
+        initialized_streams: Set[str] = set()
+        messages = _iter_messages(stdin, metrics)
+        while True:
+            chunk = await loop.run_in_executor(None, _read_chunk, messages, _ASYNC_READ_CHUNK)
+            if not chunk:
+                break
+            for message, nbytes in chunk:
+                if message.get("type") == "STATE":
+                    await _drain()
+                    with tracer.span("state", cat="emit"):
+                        emit_message(message)
+                    continue
+                if message.get("type") != "RECORD":
+                    continue
+                record = message.get("record", {})
+                stream = record.get("stream")
+                data = record.get("data", {})
+                write_item = write_map.get(stream)
+                if not write_item:
+                    metrics.inc("skipped")
+                    continue
+
+                statements, current_graph = _stream_statements(
+                    write_item, stream, current_graph, initialized_streams
+                )
+                if statements:
+                    await _drain()
+                    for statement in statements:
+                        await client.execute(statement, stream=stream)
+
+                generate_start = time.perf_counter()
+                gql = builder.render(stream, data)
+                generate_end = time.perf_counter()
+                metrics.add_stage_time("generate", generate_end - generate_start)
+                tracer.add_complete("generate", generate_start, generate_end, args={"stream": stream})
+                _STATEMENT_LOG.info("写入流 %s: %s", stream, gql)
+
+                key = builder.key(stream, data)
+                vertex = statement_phase(gql) == PHASE_VERTEX
+                if key in inflight_keys or (not vertex and inflight_vertices):
+                    await _drain()
+                if len(pending) >= cfg.max_in_flight:
+                    await _drain(asyncio.FIRST_COMPLETED)
+                task = asyncio.ensure_future(_execute(stream, gql, nbytes))
+                _track(task, key, vertex)
+                pending.add(task)
+            metrics.maybe_report()
+
+        await _drain()
+        with tracer.span("state", cat="emit"):
+            emit_message({"type": "STATE", "state": {"last_write": True}})
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await client.close()
+        metrics.report_final()
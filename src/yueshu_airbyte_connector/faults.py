@@ -0,0 +1,231 @@
+"""
+FaultInjector - 向底层客户端注入故障，用于弹性与吞吐测试
+
+包装任意 client_factory（真实驱动或 MemoryBackend.factory），按 host 与语句
+类型注入：
+- 延迟分布（fixed / uniform / lognormal，或自定义函数）
+- 语句拒绝：返回失败的结果集（语句错误，不重试）；批量写入中表现为部分语句被拒绝
+- 会话断开：抛出连接错误，该会话此后不可用，由 NebulaClient 驱逐并在其它会话上重试
+- 建连失败：创建会话时抛出连接错误
+
+注入发生在驱动客户端层，NebulaClient 的重试、host 健康检查与故障转移逻辑
+原样参与测试：
+
+    injector = FaultInjector(backend.factory, [FaultRule(host="h2:*", latency=fixed(0.05))])
+    client = NebulaClient(hosts, "root", "root", client_factory=injector.factory)
+"""
+from __future__ import annotations
+
+import fnmatch
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .nebula_client import ClientFactory, _accepts_timeout
+
+# 延迟分布：根据随机数生成器返回秒数
+LatencyDistribution = Callable[[random.Random], float]
+
+STATEMENT_KINDS = ("session", "schema", "vertex", "edge", "read")
+
+_SESSION_RE = re.compile(r"^\s*(USE\b|SESSION\s+SET\b)", re.I)
+_SCHEMA_RE = re.compile(r"^\s*(DESC(RIBE)?|SHOW)\b", re.I)
+_EDGE_RE = re.compile(r"^\s*(TABLE\s+)?MATCH\b.*\bINSERT\b", re.I | re.S)
+_VERTEX_RE = re.compile(r"^\s*(TABLE\s+)?INSERT\b", re.I)
+
+
+def statement_kind(query: str) -> str:
+    """语句类型：session / schema / vertex / edge / read"""
+    if _SESSION_RE.match(query):
+        return "session"
+    if _SCHEMA_RE.match(query):
+        return "schema"
+    if _EDGE_RE.match(query):
+        return "edge"
+    if _VERTEX_RE.match(query):
+        return "vertex"
+    return "read"
+
+
+def fixed(seconds: float) -> LatencyDistribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> LatencyDistribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> LatencyDistribution:
+    """对数正态分布（长尾），median 为中位数"""
+    if median <= 0:
+        return fixed(0.0)
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class InjectedConnectionError(ConnectionError):
+    """注入的会话断开 / 建连失败"""
+
+
+class InjectedResult:
+    """注入的失败结果集（语句被拒绝）"""
+
+    is_succeeded = False
+
+    def __init__(self, error_msg: str) -> None:
+        self.error_msg = error_msg
+
+
+@dataclass
+class FaultRule:
+    """
+    一条故障规则；匹配的规则依次生效（延迟累加，任一规则触发故障即生效）
+
+    Args:
+        host: host 通配符（fnmatch），None 匹配所有 host
+        statements: 语句类型（见 STATEMENT_KINDS），空表示所有类型
+        latency: 额外延迟分布
+        reject_rate: 语句被拒绝（返回失败结果）的概率
+        drop_rate: 会话断开（抛出连接错误）的概率
+        connect_error_rate: 创建会话失败的概率
+    """
+    host: Optional[str] = None
+    statements: Sequence[str] = ()
+    latency: Optional[LatencyDistribution] = None
+    reject_rate: float = 0.0
+    drop_rate: float = 0.0
+    connect_error_rate: float = 0.0
+
+    def matches(self, host: str, kind: Optional[str] = None) -> bool:
+        if self.host is not None and not fnmatch.fnmatchcase(host, self.host):
+            return False
+        return kind is None or not self.statements or kind in self.statements
+
+
+@dataclass
+class FaultStats:
+    """已注入的故障计数"""
+    statements: int = 0
+    rejected: int = 0
+    dropped: int = 0
+    connect_errors: int = 0
+    injected_latency: float = 0.0
+    by_host: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def count(self, host: str, event: str) -> None:
+        counts = self.by_host.setdefault(host, {})
+        counts[event] = counts.get(event, 0) + 1
+
+
+@dataclass
+class Fault:
+    """一条语句上注入的延迟与故障"""
+    latency: float = 0.0
+    action: Optional[str] = None  # None / "reject" / "drop"
+
+
+class FaultInjector:
+    """
+    client_factory 的故障注入包装
+
+    Args:
+        factory: 被包装的 client_factory
+        rules: 故障规则
+        seed: 随机种子，固定后同一语句序列的故障可复现
+    """
+
+    def __init__(
+        self,
+        factory: ClientFactory,
+        rules: Sequence[FaultRule] = (),
+        seed: Optional[int] = None,
+    ) -> None:
+        self._factory = factory
+        self.rules = list(rules)
+        self.stats = FaultStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def factory(self, hosts: List[str], username: str, password: str) -> "FaultyClient":
+        host = hosts[0] if hosts else ""
+        rules = [rule for rule in self.rules if rule.matches(host)]
+        for rule in rules:
+            if rule.connect_error_rate and self._roll(rule.connect_error_rate):
+                self._record(host, "connect_errors")
+                raise InjectedConnectionError(f"注入的建连失败: {host}")
+        return FaultyClient(self, host, self._factory(hosts, username, password))
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _sample(self, distribution: LatencyDistribution) -> float:
+        with self._lock:
+            return max(0.0, distribution(self._rng))
+
+    def _record(self, host: str, event: str, latency: float = 0.0) -> None:
+        with self._lock:
+            stats = self.stats
+            if event == "statements":
+                stats.statements += 1
+                stats.injected_latency += latency
+            else:
+                setattr(stats, event, getattr(stats, event) + 1)
+            stats.count(host, event)
+
+    def plan(self, host: str, query: str) -> "Fault":
+        """为一条语句决定注入的延迟与故障"""
+        kind = statement_kind(query)
+        fault = Fault()
+        for rule in self.rules:
+            if not rule.matches(host, kind):
+                continue
+            if rule.latency is not None:
+                fault.latency += self._sample(rule.latency)
+            if fault.action is None and rule.drop_rate and self._roll(rule.drop_rate):
+                fault.action = "drop"
+            if fault.action is None and rule.reject_rate and self._roll(rule.reject_rate):
+                fault.action = "reject"
+        self._record(host, "statements", fault.latency)
+        if fault.action == "drop":
+            self._record(host, "dropped")
+        elif fault.action == "reject":
+            self._record(host, "rejected")
+        return fault
+
+
+class FaultyClient:
+    """注入故障的底层客户端，接口与被包装的客户端一致"""
+
+    def __init__(self, injector: FaultInjector, host: str, client: Any) -> None:
+        self._injector = injector
+        self._host = host
+        self._client = client
+        self._accepts_timeout = _accepts_timeout(client)
+        self.dropped = False
+
+    def execute(self, query: str, **kwargs: Any) -> Any:
+        if self.dropped:
+            raise InjectedConnectionError(f"会话已断开: {self._host}")
+        fault = self._injector.plan(self._host, query)
+        timeout = kwargs.get("timeout")
+        if fault.latency > 0:
+            if timeout is not None and fault.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError(f"deadline exceeded after {timeout}s")
+            time.sleep(fault.latency)
+        if fault.action == "drop":
+            self.dropped = True
+            raise InjectedConnectionError(f"注入的会话断开: {self._host}")
+        if fault.action == "reject":
+            return InjectedResult(f"注入的语句拒绝: {self._host}")
+        if not self._accepts_timeout:
+            kwargs.pop("timeout", None)
+        return self._client.execute(query, **kwargs)
+
+    def close(self) -> None:
+        self._client.close()
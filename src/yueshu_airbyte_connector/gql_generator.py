@@ -1,7 +1,7 @@
 """
 GQL 生成工具：根据 mapping 配置自动生成 GQL 语句
 """
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
 import json
 
 
@@ -78,91 +78,7 @@ def generate_gql_from_mapping(mapping_config: Dict[str, Any], record: Dict[str,
     Returns:
         GQL 语句
     """
-    mapping = mapping_config.get("mapping", {})
-    mapping_type = mapping.get("type", "vertex")
-    
-    if mapping_type == "vertex":
-        return _generate_vertex_gql(mapping, record)
-    else:
-        return _generate_edge_gql(mapping, record)
-
-
-def _generate_vertex_gql(mapping: Dict[str, Any], record: Dict[str, Any]) -> str:
-    """生成点插入 GQL"""
-    label = mapping.get("label", "")
-    pk = mapping.get("primary_key", {})
-    properties = mapping.get("properties", [])
-    
-    # 构建属性列表
-    attrs = []
-    
-    # 主键
-    pk_source = pk.get("source_field", "")
-    pk_dest = pk.get("dest_field", "id")
-    if pk_source in record:
-        attrs.append(f"{pk_dest}: {_format_value(record[pk_source])}")
-    
-    # 其他属性
-    for prop in properties:
-        source_field = prop.get("source_field", "")
-        dest_field = prop.get("dest_field", "")
-        transform = prop.get("transform", "")
-        
-        if source_field in record:
-            value = record[source_field]
-            formatted = _apply_transform(value, transform)
-            attrs.append(f"{dest_field}: {formatted}")
-    
-    attrs_str = ", ".join(attrs)
-    return f"INSERT (@{label}{{{attrs_str}}})"
-
-
-def _generate_edge_gql(mapping: Dict[str, Any], record: Dict[str, Any]) -> str:
-    """生成边插入 GQL"""
-    label = mapping.get("label", "")
-    src = mapping.get("src_vertex", {})
-    dst = mapping.get("dst_vertex", {})
-    multiedge = mapping.get("multiedge_key", {})
-    properties = mapping.get("properties", [])
-    
-    # 构建 MATCH 子句
-    src_label = src.get("label", "")
-    src_pk_source = src.get("primary_key", {}).get("source_field", "")
-    src_pk_dest = src.get("primary_key", {}).get("dest_field", "id")
-    
-    dst_label = dst.get("label", "")
-    dst_pk_source = dst.get("primary_key", {}).get("source_field", "")
-    dst_pk_dest = dst.get("primary_key", {}).get("dest_field", "id")
-    
-    src_pk_val = _format_value(record.get(src_pk_source, ""))
-    dst_pk_val = _format_value(record.get(dst_pk_source, ""))
-    
-    match_clause = f"MATCH (src@{src_label}{{{src_pk_dest}: {src_pk_val}}}), "
-    match_clause += f"(dst@{dst_label}{{{dst_pk_dest}: {dst_pk_val}}})"
-    
-    # 多边键
-    ranking = ""
-    if multiedge and "source_field" in multiedge:
-        ranking_field = multiedge["source_field"]
-        if ranking_field in record:
-            ranking = f":{record[ranking_field]}"
-    
-    # 边属性
-    attrs = []
-    for prop in properties:
-        source_field = prop.get("source_field", "")
-        dest_field = prop.get("dest_field", "")
-        transform = prop.get("transform", "")
-        
-        if source_field in record:
-            value = record[source_field]
-            formatted = _apply_transform(value, transform)
-            attrs.append(f"{dest_field}: {formatted}")
-    
-    attrs_str = ", ".join(attrs) if attrs else ""
-    edge_clause = f"(src)-[@{label}{ranking}{{{attrs_str}}}]->(dst)"
-    
-    return f"{match_clause} INSERT {edge_clause}"
+    return compile_mapping_template(mapping_config).render(record)
 
 
 def _format_value(value: Any) -> str:
@@ -179,21 +95,6 @@ def _format_value(value: Any) -> str:
         return str(value)
 
 
-def _apply_transform(value: Any, transform: str) -> str:
-    """应用类型转换"""
-    if not transform:
-        return _format_value(value)
-    
-    if transform == "date":
-        return f'date("{value}")'
-    elif transform == "datetime":
-        return f'datetime("{value}")'
-    elif transform == "timestamp":
-        return f'timestamp("{value}")'
-    else:
-        return _format_value(value)
-
-
 # ============================================================================
 # 基于 Schema 的 GQL 生成（新方法）
 # ============================================================================
@@ -219,26 +120,7 @@ def generate_vertex_gql_with_schema(
         record = {"id": 1001, "name": "Tom Hanks", "birth_date": "1956-07-09"}
         -> INSERT (@Actor{id: 1001, name: "Tom Hanks", birthDate: date("1956-07-09")})
     """
-    label = tag_schema.label
-    attrs = []
-    
-    for source_field, dest_field in field_mapping.items():
-        if source_field not in record:
-            continue
-        
-        value = record[source_field]
-        
-        # 从 schema 获取目标字段的数据类型
-        prop_schema = tag_schema.get_property(dest_field)
-        if prop_schema:
-            formatted = _format_value_by_type(value, prop_schema.type)
-        else:
-            formatted = _format_value(value)
-        
-        attrs.append(f"{dest_field}: {formatted}")
-    
-    attrs_str = ", ".join(attrs)
-    return f"INSERT (@{label}{{{attrs_str}}})"
+    return compile_vertex_template(tag_schema, field_mapping).render(record)
 
 
 def generate_edge_gql_with_schema(
@@ -271,53 +153,9 @@ def generate_edge_gql_with_schema(
         -> MATCH (src@Actor{id: 1001}), (dst@Movie{id: 2001}) 
            INSERT (src)-[@Act:1{roleName: "Forrest Gump"}]->(dst)
     """
-    label = edge_schema.label
-    
-    # 解析字段映射
-    src_mapping = {}
-    dst_mapping = {}
-    ranking_field = None
-    edge_attrs = {}
-    
-    for source_field, dest_field in field_mapping.items():
-        if source_field not in record:
-            continue
-        
-        value = record[source_field]
-        
-        if dest_field.startswith("_src."):
-            # 起点字段
-            actual_field = dest_field[5:]  # 移除 "_src." 前缀
-            src_mapping[actual_field] = value
-        elif dest_field.startswith("_dst."):
-            # 终点字段
-            actual_field = dest_field[5:]  # 移除 "_dst." 前缀
-            dst_mapping[actual_field] = value
-        elif dest_field == "_ranking":
-            # ranking 字段（多边键）
-            ranking_field = value
-        else:
-            # 边的属性
-            prop_schema = edge_schema.get_property(dest_field)
-            if prop_schema:
-                formatted = _format_value_by_type(value, prop_schema.type)
-            else:
-                formatted = _format_value(value)
-            edge_attrs[dest_field] = formatted
-    
-    # 构建 MATCH 子句
-    src_attrs_str = ", ".join([f"{k}: {_format_value(v)}" for k, v in src_mapping.items()])
-    dst_attrs_str = ", ".join([f"{k}: {_format_value(v)}" for k, v in dst_mapping.items()])
-    
-    match_clause = f"MATCH (src@{src_tag_label}{{{src_attrs_str}}}), (dst@{dst_tag_label}{{{dst_attrs_str}}})"
-    
-    # 构建 INSERT 子句
-    ranking_str = f":{ranking_field}" if ranking_field is not None else ""
-    edge_attrs_str = ", ".join([f"{k}: {v}" for k, v in edge_attrs.items()])
-    
-    edge_clause = f"(src)-[@{label}{ranking_str}{{{edge_attrs_str}}}]->(dst)"
-    
-    return f"{match_clause} INSERT {edge_clause}"
+    return compile_edge_template(
+        edge_schema, src_tag_label, dst_tag_label, field_mapping
+    ).render(record)
 
 
 def _format_value_by_type(value: Any, nebula_type: str) -> str:
@@ -364,6 +202,493 @@ def _format_value_by_type(value: Any, nebula_type: str) -> str:
         return _format_value(value)
 
 
+# ============================================================================
+# 预编译语句模板
+# ============================================================================
+#
+# 同一个 stream 的所有记录共享 label、字段映射与属性类型，模板在 stream 首次
+# 出现时编译一次：预先查好每个属性的类型与格式化函数、拼好固定的语句骨架
+# （包括写入模式关键字），之后每条记录只需填值。
+#
+# render(record) 生成内联字面量的语句；bind(record) 生成稳定的参数化语句
+# 和参数字典，供支持查询参数的驱动使用。
+
+_TEMPORAL_TYPES = ("date", "datetime", "timestamp", "time")
+_INT_TYPES = ("int", "int8", "int16", "int32", "int64")
+_FLOAT_TYPES = ("float", "double")
+_BOOL_TYPES = ("bool", "boolean")
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("true", "1", "yes")
+
+
+class _Field:
+    """
+    单个字段的编译结果
+
+    Args:
+        source: 记录中的源字段名
+        dest: 目标属性名
+        literal: 字面量格式化函数
+        wrap: 参数模式下包裹占位符的函数名（如 date），None 表示不包裹
+        convert: 参数模式下的值转换函数
+    """
+
+    __slots__ = ("source", "dest", "literal", "wrap", "convert")
+
+    def __init__(
+        self,
+        source: str,
+        dest: str,
+        literal: Optional[Callable[[Any], str]] = None,
+        wrap: Optional[str] = None,
+        convert: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.source = source
+        self.dest = dest
+        self.literal = literal or _format_value
+        self.wrap = wrap
+        self.convert = convert
+
+    def placeholder(self, name: str) -> str:
+        return f"{self.wrap}(${name})" if self.wrap else f"${name}"
+
+    def param(self, value: Any) -> Any:
+        if value is None or self.convert is None:
+            return value
+        return self.convert(value)
+
+
+def _typed_field(source: str, dest: str, nebula_type: Optional[str]) -> _Field:
+    """按 schema 类型编译字段，与 _format_value_by_type 输出一致"""
+    if nebula_type is None:
+        return _Field(source, dest)
+    type_lower = nebula_type.lower()
+    if type_lower in _TEMPORAL_TYPES:
+        return _Field(
+            source, dest,
+            lambda v, f=type_lower: "NULL" if v is None else f'{f}("{v}")',
+            wrap=type_lower, convert=str,
+        )
+    if type_lower in _INT_TYPES:
+        return _Field(source, dest, lambda v: "NULL" if v is None else str(int(v)), convert=int)
+    if type_lower in _FLOAT_TYPES:
+        return _Field(source, dest, lambda v: "NULL" if v is None else str(float(v)), convert=float)
+    if type_lower in _BOOL_TYPES:
+        return _Field(
+            source, dest,
+            lambda v: "NULL" if v is None else ("true" if _to_bool(v) else "false"),
+            convert=_to_bool,
+        )
+    return _Field(source, dest)
+
+
+def _transform_field(source: str, dest: str, transform: str) -> _Field:
+    """按 mapping 中的 transform 编译字段：date/datetime/timestamp 包裹为对应函数，其余按值格式化"""
+    if transform in ("date", "datetime", "timestamp"):
+        return _Field(
+            source, dest, lambda v, f=transform: f'{f}("{v}")', wrap=transform, convert=str
+        )
+    return _Field(source, dest)
+
+
+def _statement_head(insert_keyword: str, table: bool) -> Tuple[str, str]:
+    return ("TABLE " if table else ""), insert_keyword
+
+
+# render_columns 中整列格式化字段值的函数：(字段, 列) -> 每行的字面量
+ColumnFormatter = Callable[["_Field", Any], List[str]]
+
+
+def format_column(field: _Field, column: Sequence[Any]) -> List[str]:
+    """按字段的字面量格式化函数逐个格式化一列值"""
+    return list(map(field.literal, column))
+
+
+def _ranking_literal(value: Any) -> str:
+    return "" if value is None else f":{value}"
+
+
+def _esc(text: str) -> str:
+    """语句骨架中的固定文本，用于 % 格式化"""
+    return text.replace("%", "%%")
+
+
+def _key_value(value: Any) -> Hashable:
+    """键中的字段值；不可哈希的值（list、dict 等）按 repr 比较"""
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _column_values(column: Any) -> List[Any]:
+    return column.to_pylist() if hasattr(column, "to_pylist") else list(column)
+
+
+def _fill_rows(fmt: str, columns: List[List[str]], rows: int) -> List[str]:
+    if not columns:
+        return [fmt % ()] * rows
+    return [fmt % row for row in zip(*columns)]
+
+
+class StatementTemplate:
+    """预编译的单个 stream 写入语句模板"""
+
+    label = ""
+    # 标识写入元素的源字段：点的主键，边的端点主键与 rank；None 表示未知
+    key_fields: Optional[List[str]] = None
+
+    def key(self, record: Dict[str, Any]) -> Hashable:
+        """
+        记录写入的点或边的标识（见 NebulaClient.execute_many 的 keys）；
+        key_fields 未知时同一类型的记录共用一个键，按顺序执行
+        """
+        if self.key_fields is None:
+            return (self.label,)
+        return (self.label,) + tuple(_key_value(record.get(f)) for f in self.key_fields)
+
+    def column_keys(self, columns: Mapping[str, Any], rows: int) -> List[Hashable]:
+        """按列计算 rows 条记录的 key，与 render_columns 的语句一一对应"""
+        if not self.key_fields:
+            return [self.key({})] * rows
+        values = [
+            _column_values(columns[f]) if f in columns else [None] * rows for f in self.key_fields
+        ]
+        return [(self.label,) + tuple(map(_key_value, row)) for row in zip(*values)]
+
+    def render(self, record: Dict[str, Any]) -> str:
+        """生成内联字面量的语句"""
+        raise NotImplementedError
+
+    def render_columns(
+        self,
+        columns: Mapping[str, Any],
+        rows: int,
+        formatter: ColumnFormatter = format_column,
+    ) -> List[str]:
+        """
+        按列生成 rows 条内联字面量的语句，不构造逐行的 dict（用于列式文件导入）
+        每个字段整列调用一次 formatter；列中的 None 按 NULL 写出，缺少的列整列省略
+        """
+        raise NotImplementedError
+
+    def source_fields(self) -> List[str]:
+        """模板读取的源字段名"""
+        raise NotImplementedError
+
+    def bind(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """生成参数化语句与参数；同一字段组合的记录得到相同的语句文本"""
+        raise NotImplementedError
+
+
+class VertexTemplate(StatementTemplate):
+    """点插入：INSERT (@Label{prop: value, ...})"""
+
+    def __init__(
+        self,
+        label: str,
+        fields: List[_Field],
+        insert_keyword: str = "INSERT",
+        table: bool = False,
+        key_fields: Optional[List[str]] = None,
+    ) -> None:
+        self.label = label
+        self.fields = fields
+        self.key_fields = key_fields
+        prefix, keyword = _statement_head(insert_keyword, table)
+        self._head = f"{prefix}{keyword} (@{label}{{"
+
+    def render(self, record: Dict[str, Any]) -> str:
+        attrs = ", ".join(
+            f"{f.dest}: {f.literal(record[f.source])}" for f in self.fields if f.source in record
+        )
+        return f"{self._head}{attrs}}})"
+
+    def bind(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        attrs: List[str] = []
+        params: Dict[str, Any] = {}
+        for i, f in enumerate(self.fields):
+            if f.source in record:
+                name = f"p{i}"
+                attrs.append(f"{f.dest}: {f.placeholder(name)}")
+                params[name] = f.param(record[f.source])
+        return f"{self._head}{', '.join(attrs)}}})", params
+
+    def render_columns(
+        self,
+        columns: Mapping[str, Any],
+        rows: int,
+        formatter: ColumnFormatter = format_column,
+    ) -> List[str]:
+        present = [f for f in self.fields if f.source in columns]
+        fmt = _esc(self._head) + ", ".join(_esc(f"{f.dest}: ") + "%s" for f in present) + "})"
+        return _fill_rows(fmt, [formatter(f, columns[f.source]) for f in present], rows)
+
+    def source_fields(self) -> List[str]:
+        return [f.source for f in self.fields]
+
+
+class MappingEdgeTemplate(StatementTemplate):
+    """mapping 配置的边插入：起点/终点主键缺失时按空字符串匹配"""
+
+    def __init__(
+        self,
+        label: str,
+        src_label: str,
+        src_pk: _Field,
+        dst_label: str,
+        dst_pk: _Field,
+        ranking_field: Optional[str],
+        fields: List[_Field],
+        insert_keyword: str = "INSERT",
+        table: bool = False,
+    ) -> None:
+        self.label = label
+        self.src_pk = src_pk
+        self.dst_pk = dst_pk
+        self.ranking_field = ranking_field
+        self.fields = fields
+        self.key_fields = [src_pk.source, dst_pk.source] + ([ranking_field] if ranking_field else [])
+        prefix, keyword = _statement_head(insert_keyword, table)
+        self._src = f"{prefix}MATCH (src@{src_label}{{{src_pk.dest}: "
+        self._dst = f"}}), (dst@{dst_label}{{{dst_pk.dest}: "
+        self._edge = f"}}) {keyword} (src)-[@{label}"
+
+    def _ranking(self, record: Dict[str, Any]) -> str:
+        if self.ranking_field and self.ranking_field in record:
+            return f":{record[self.ranking_field]}"
+        return ""
+
+    def render(self, record: Dict[str, Any]) -> str:
+        src = _format_value(record.get(self.src_pk.source, ""))
+        dst = _format_value(record.get(self.dst_pk.source, ""))
+        attrs = ", ".join(
+            f"{f.dest}: {f.literal(record[f.source])}" for f in self.fields if f.source in record
+        )
+        return f"{self._src}{src}{self._dst}{dst}{self._edge}{self._ranking(record)}{{{attrs}}}]->(dst)"
+
+    def bind(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        params: Dict[str, Any] = {
+            "src": record.get(self.src_pk.source, ""),
+            "dst": record.get(self.dst_pk.source, ""),
+        }
+        attrs: List[str] = []
+        for i, f in enumerate(self.fields):
+            if f.source in record:
+                name = f"p{i}"
+                attrs.append(f"{f.dest}: {f.placeholder(name)}")
+                params[name] = f.param(record[f.source])
+        text = (
+            f"{self._src}$src{self._dst}$dst{self._edge}{self._ranking(record)}"
+            f"{{{', '.join(attrs)}}}]->(dst)"
+        )
+        return text, params
+
+    def render_columns(
+        self,
+        columns: Mapping[str, Any],
+        rows: int,
+        formatter: ColumnFormatter = format_column,
+    ) -> List[str]:
+        # 端点主键列缺失时与 render 一致按空字符串匹配
+        values = [
+            formatter(pk, columns[pk.source]) if pk.source in columns else ['""'] * rows
+            for pk in (self.src_pk, self.dst_pk)
+        ]
+        fmt = _esc(self._src) + "%s" + _esc(self._dst) + "%s" + _esc(self._edge)
+        if self.ranking_field and self.ranking_field in columns:
+            ranking = _Field(self.ranking_field, "_ranking", _ranking_literal)
+            values.append(formatter(ranking, columns[self.ranking_field]))
+            fmt += "%s"
+        present = [f for f in self.fields if f.source in columns]
+        fmt += "{" + ", ".join(_esc(f"{f.dest}: ") + "%s" for f in present) + "}]->(dst)"
+        values.extend(formatter(f, columns[f.source]) for f in present)
+        return _fill_rows(fmt, values, rows)
+
+    def source_fields(self) -> List[str]:
+        fields = [self.src_pk.source, self.dst_pk.source] + [f.source for f in self.fields]
+        if self.ranking_field:
+            fields.append(self.ranking_field)
+        return fields
+
+
+class SchemaEdgeTemplate(StatementTemplate):
+    """schema 配置的边插入：字段映射中 _src./_dst. 为端点属性，_ranking 为多边键"""
+
+    def __init__(
+        self,
+        label: str,
+        src_label: str,
+        dst_label: str,
+        field_mapping: Dict[str, str],
+        property_types: Dict[str, Optional[str]],
+        insert_keyword: str = "INSERT",
+        table: bool = False,
+    ) -> None:
+        self.label = label
+        # (类别, 字段)；类别为 src / dst / ranking / prop
+        self.fields: List[Tuple[str, _Field]] = []
+        for source_field, dest_field in field_mapping.items():
+            if dest_field.startswith("_src."):
+                self.fields.append(("src", _Field(source_field, dest_field[5:])))
+            elif dest_field.startswith("_dst."):
+                self.fields.append(("dst", _Field(source_field, dest_field[5:])))
+            elif dest_field == "_ranking":
+                self.fields.append(("ranking", _Field(source_field, dest_field)))
+            else:
+                self.fields.append(
+                    ("prop", _typed_field(source_field, dest_field, property_types.get(dest_field)))
+                )
+        self.key_fields = [f.source for kind, f in self.fields if kind != "prop"]
+        prefix, keyword = _statement_head(insert_keyword, table)
+        self._src = f"{prefix}MATCH (src@{src_label}{{"
+        self._dst = f"}}), (dst@{dst_label}{{"
+        self._edge = f"}}) {keyword} (src)-[@{label}"
+
+    def _build(self, record: Dict[str, Any], placeholders: bool) -> Tuple[str, Dict[str, Any]]:
+        parts: Dict[str, Dict[str, str]] = {"src": {}, "dst": {}, "prop": {}}
+        params: Dict[str, Any] = {}
+        ranking = None
+        for i, (kind, f) in enumerate(self.fields):
+            if f.source not in record:
+                continue
+            value = record[f.source]
+            if kind == "ranking":
+                ranking = value
+            elif placeholders:
+                name = f"p{i}"
+                parts[kind][f.dest] = f.placeholder(name)
+                params[name] = f.param(value)
+            else:
+                parts[kind][f.dest] = f.literal(value)
+        src = ", ".join(f"{k}: {v}" for k, v in parts["src"].items())
+        dst = ", ".join(f"{k}: {v}" for k, v in parts["dst"].items())
+        attrs = ", ".join(f"{k}: {v}" for k, v in parts["prop"].items())
+        ranking_str = f":{ranking}" if ranking is not None else ""
+        text = f"{self._src}{src}{self._dst}{dst}{self._edge}{ranking_str}{{{attrs}}}]->(dst)"
+        return text, params
+
+    def render(self, record: Dict[str, Any]) -> str:
+        return self._build(record, placeholders=False)[0]
+
+    def bind(self, record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        return self._build(record, placeholders=True)
+
+    def render_columns(
+        self,
+        columns: Mapping[str, Any],
+        rows: int,
+        formatter: ColumnFormatter = format_column,
+    ) -> List[str]:
+        # 与 _build 一致：同一目标属性以最后一个字段为准，最后一个 _ranking 字段生效
+        parts: Dict[str, Dict[str, _Field]] = {"src": {}, "dst": {}, "prop": {}}
+        ranking: Optional[_Field] = None
+        for kind, f in self.fields:
+            if f.source not in columns:
+                continue
+            if kind == "ranking":
+                ranking = _Field(f.source, f.dest, _ranking_literal)
+            else:
+                parts[kind][f.dest] = f
+        values: List[List[str]] = []
+
+        def section(kind: str) -> str:
+            fields = parts[kind]
+            values.extend(formatter(f, columns[f.source]) for f in fields.values())
+            return ", ".join(_esc(f"{dest}: ") + "%s" for dest in fields)
+
+        fmt = _esc(self._src) + section("src") + _esc(self._dst) + section("dst") + _esc(self._edge)
+        if ranking is not None:
+            values.append(formatter(ranking, columns[ranking.source]))
+            fmt += "%s"
+        fmt += "{" + section("prop") + "}]->(dst)"
+        return _fill_rows(fmt, values, rows)
+
+    def source_fields(self) -> List[str]:
+        return [f.source for _, f in self.fields]
+
+
+def compile_mapping_template(
+    mapping_config: Dict[str, Any], insert_keyword: str = "INSERT", table: bool = False
+) -> StatementTemplate:
+    """根据 mapping 配置编译语句模板"""
+    mapping = mapping_config.get("mapping", {})
+    properties = [
+        _transform_field(
+            prop.get("source_field", ""), prop.get("dest_field", ""), prop.get("transform", "")
+        )
+        for prop in mapping.get("properties", [])
+    ]
+    label = mapping.get("label", "")
+
+    if mapping.get("type", "vertex") == "vertex":
+        pk = mapping.get("primary_key", {})
+        pk_field = _Field(pk.get("source_field", ""), pk.get("dest_field", "id"))
+        return VertexTemplate(
+            label, [pk_field] + properties, insert_keyword, table, key_fields=[pk_field.source]
+        )
+
+    src = mapping.get("src_vertex", {})
+    dst = mapping.get("dst_vertex", {})
+    src_pk = src.get("primary_key", {})
+    dst_pk = dst.get("primary_key", {})
+    multiedge = mapping.get("multiedge_key", {})
+    return MappingEdgeTemplate(
+        label,
+        src.get("label", ""),
+        _Field(src_pk.get("source_field", ""), src_pk.get("dest_field", "id")),
+        dst.get("label", ""),
+        _Field(dst_pk.get("source_field", ""), dst_pk.get("dest_field", "id")),
+        multiedge.get("source_field") if multiedge else None,
+        properties,
+        insert_keyword,
+        table,
+    )
+
+
+def compile_vertex_template(
+    tag_schema: Any,
+    field_mapping: Dict[str, str],
+    insert_keyword: str = "INSERT",
+    table: bool = False,
+) -> VertexTemplate:
+    """根据 TAG schema 和字段映射编译点插入模板；schema 中不可为空的属性为主键"""
+    fields = []
+    key_fields = []
+    for source_field, dest_field in field_mapping.items():
+        prop_schema = tag_schema.get_property(dest_field)
+        fields.append(
+            _typed_field(source_field, dest_field, prop_schema.type if prop_schema else None)
+        )
+        if prop_schema is not None and not prop_schema.nullable:
+            key_fields.append(source_field)
+    return VertexTemplate(tag_schema.label, fields, insert_keyword, table, key_fields or None)
+
+
+def compile_edge_template(
+    edge_schema: Any,
+    src_tag_label: str,
+    dst_tag_label: str,
+    field_mapping: Dict[str, str],
+    insert_keyword: str = "INSERT",
+    table: bool = False,
+) -> SchemaEdgeTemplate:
+    """根据 EDGE schema 和字段映射编译边插入模板"""
+    property_types: Dict[str, Optional[str]] = {}
+    for dest_field in field_mapping.values():
+        prop_schema = edge_schema.get_property(dest_field)
+        property_types[dest_field] = prop_schema.type if prop_schema else None
+    return SchemaEdgeTemplate(
+        edge_schema.label, src_tag_label, dst_tag_label, field_mapping, property_types,
+        insert_keyword, table,
+    )
+
+
 # 测试代码
 if __name__ == "__main__":
     # 测试点表 GQL 生成
@@ -0,0 +1,382 @@
+"""
+整图快照导出（export 命令）
+
+经 Airbyte 的 read 导出整个图时，所有数据都要挤过单个 stdout 协议流。export 命令
+绕过协议：用 read_graph_schema 列出图中的全部点类型与边类型，按类型计数后切分为
+若干分区（每个分区是一段 element_id 区间），多个线程共享一个会话池并发地按页扫描
+各分区，直接写入本地目录：
+
+    yueshu-airbyte --connector-type source export --config config.json --dir snapshot/ \\
+        --workers 8 --format parquet
+
+目录结构：
+- vertices/<类型>/part-00000.jsonl.gz、edges/<类型>/part-00000.jsonl.gz（或 .parquet）
+- manifest.json：图名、格式、各分区的区间与文件；全部分区完成后补充每个类型的行数
+- progress.jsonl：已完成的分区与行数；中断后以同一目录重新 export 时沿用 manifest 中的
+  分区划分，跳过已完成的分区，未完成的分区整体重新扫描
+
+JSONL 每行是服务端返回的一个点/边（as_primitive_by_row 中的值）；Parquet 每行把
+properties 展开为列，其它字段（labels、src、dst 等）以 "_" 前缀的列保存，每页写为
+一个 row group，列类型由分区的第一页确定（第一页中全为空值的列按字符串保存）。
+分区文件写完后才从临时文件改名，目录中出现的分区文件都是完整的。
+
+分区与分页都按 element_id 的键集分页（keyset pagination），不使用 SKIP：
+- 规划时每个分区边界用一条 "WHERE element_id(v) > <上一边界> ORDER BY element_id(v)
+  SKIP <partition_rows - 1> LIMIT 1" 查出，整个类型只扫描一遍
+- 每页查询 "WHERE element_id(v) > <上一页最后一行> [AND element_id(v) <= <分区上界>]
+  ORDER BY element_id(v) LIMIT <page_size>"，服务端不必为每页重新排序并跳过之前的行
+分区之间不重叠、不遗漏，且不要求导出期间数据不变：导出期间新增或删除的元素只影响
+它所在的分区；每类的第一个分区不设下界，最后一个分区不设上界。
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .common import get_logger, log, to_source_config
+from .metrics import MetricsRegistry, encoded_size, reset_registry
+from .nebula_client import DEFAULT_PAGE_SIZE, ClientFactory, NebulaClient
+from .schema_reader import read_graph_schema
+
+MANIFEST = "manifest.json"
+PROGRESS = "progress.jsonl"
+MANIFEST_VERSION = 2
+FORMATS = ("jsonl", "parquet")
+DEFAULT_PARTITION_ROWS = 1000000
+
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+_LOG = get_logger("export")
+
+# 扫描结果中 element_id 的列名
+_ID = "_element_id"
+
+
+@dataclass(frozen=True)
+class Partition:
+    """一个类型中 element_id 在 (lower, upper] 的元素；lower / upper 为 None 时不设界"""
+    kind: str  # "vertex" / "edge"
+    label: str
+    index: int
+    lower: Any
+    upper: Any
+    file: str
+
+
+def _pattern(kind: str, label: str) -> Tuple[str, str]:
+    return ("v", f"(v@{label})") if kind == "vertex" else ("e", f"()-[e@{label}]->()")
+
+
+def _literal(value: Any) -> str:
+    """element_id 的字面量：字符串加引号并转义，其它（整数）原样输出"""
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _where(var: str, lower: Any, upper: Any) -> str:
+    conditions = []
+    if lower is not None:
+        conditions.append(f"element_id({var}) > {_literal(lower)}")
+    if upper is not None:
+        conditions.append(f"element_id({var}) <= {_literal(upper)}")
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def count_query(kind: str, label: str) -> str:
+    """类型的计数语句，与扫描匹配相同的元素"""
+    var, pattern = _pattern(kind, label)
+    return f"MATCH {pattern} RETURN count({var})"
+
+
+def boundary_query(kind: str, label: str, lower: Any, rows: int) -> str:
+    """element_id 大于 lower 的第 rows 个元素的 element_id，即从 lower 开始的分区的上界"""
+    var, pattern = _pattern(kind, label)
+    return (
+        f"MATCH {pattern}{_where(var, lower, None)} RETURN element_id({var}) AS {_ID} "
+        f"ORDER BY element_id({var}) SKIP {max(rows, 1) - 1} LIMIT 1"
+    )
+
+
+def page_query(partition: Partition, after: Any, page_size: int) -> str:
+    """分区内 element_id 大于 after 的一页，附带每行的 element_id 作为下一页的起点"""
+    var, pattern = _pattern(partition.kind, partition.label)
+    return (
+        f"MATCH {pattern}{_where(var, after, partition.upper)} "
+        f"RETURN {var}, element_id({var}) AS {_ID} ORDER BY element_id({var}) LIMIT {page_size}"
+    )
+
+
+def _count(client: NebulaClient, kind: str, label: str) -> int:
+    rows = list(client.execute(count_query(kind, label)).as_primitive_by_row())
+    return int(next(iter(rows[0].values()))) if rows else 0
+
+
+def _bounds(client: NebulaClient, kind: str, label: str, total: int, partition_rows: int) -> List[Any]:
+    """依次查出每 partition_rows 个元素的分区边界；元素数不超过 partition_rows 时不切分"""
+    bounds: List[Any] = []
+    lower = None
+    for _ in range(max(-(-total // max(partition_rows, 1)), 1) - 1):
+        rows = list(client.execute(boundary_query(kind, label, lower, partition_rows)).as_primitive_by_row())
+        if not rows:
+            break
+        lower = rows[0][_ID]
+        bounds.append(lower)
+    return bounds
+
+
+def plan_partitions(kind: str, label: str, bounds: List[Any], suffix: str) -> List[Partition]:
+    """按 element_id 边界切分分区；第一个分区不设下界，最后一个分区不设上界"""
+    directory = "vertices" if kind == "vertex" else "edges"
+    name = _UNSAFE_RE.sub("_", label)
+    edges = [None] + list(bounds) + [None]
+    return [
+        Partition(kind, label, i, edges[i], edges[i + 1], f"{directory}/{name}/part-{i:05d}{suffix}")
+        for i in range(len(bounds) + 1)
+    ]
+
+
+def _pages(client: NebulaClient, partition: Partition, page_size: int) -> Iterator[List[Any]]:
+    """按 element_id 键集分页扫描分区，每页是结果行中的点/边值列表"""
+    var, _ = _pattern(partition.kind, partition.label)
+    page_size = max(page_size, 1)
+    after = partition.lower
+    while True:
+        rows = list(client.execute(page_query(partition, after, page_size)).as_primitive_by_row())
+        if rows:
+            yield [row[var] for row in rows]
+        if len(rows) < page_size:
+            return
+        after = rows[-1][_ID]
+
+
+def _flatten(element: Any) -> Dict[str, Any]:
+    """Parquet 行：properties 展开为列，其它字段加 "_" 前缀，非标量值转为 JSON"""
+    if not isinstance(element, dict):
+        return {"_value": _scalar(element)}
+    row = {f"_{key}": _scalar(value) for key, value in element.items() if key != "properties"}
+    row.update(element.get("properties") or {})
+    return row
+
+
+def _scalar(value: Any) -> Any:
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _page_table(pa: Any, elements: List[Any], schema: Any) -> Any:
+    """
+    一页点/边转换为 Arrow 表；schema 为 None 时由该页推断，全为空值的列改为字符串。
+    字符串列中的非字符串值（后续页中出现、第一页为空值的列）转为字符串
+    """
+    records = [_flatten(element) for element in elements]
+    if schema is None:
+        inferred = pa.Table.from_pylist(records).schema
+        schema = pa.schema(
+            [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in inferred]
+        )
+    text = [f.name for f in schema if pa.types.is_string(f.type)]
+    for record in records:
+        for name in text:
+            value = record.get(name)
+            if value is not None and not isinstance(value, str):
+                record[name] = str(value)
+    return pa.Table.from_pylist(records, schema=schema)
+
+
+def _export_partition(
+    client: NebulaClient,
+    directory: str,
+    partition: Partition,
+    fmt: str,
+    page_size: int,
+    metrics: MetricsRegistry,
+) -> int:
+    """扫描一个分区写入临时文件，完成后改名；返回行数"""
+    path = os.path.join(directory, partition.file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    pages = _pages(client, partition, page_size)
+    rows = 0
+    if fmt == "parquet":
+        from .columnar import _import_pyarrow
+
+        pa = _import_pyarrow()
+        import pyarrow.parquet as pq
+
+        # 每页写为一个 row group，列类型由第一页确定
+        writer = schema = None
+        try:
+            for page in pages:
+                table = _page_table(pa, page, schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(tmp, schema)
+                writer.write_table(table)
+                rows += len(page)
+                metrics.add_records(partition.label, len(page), 0)
+                metrics.maybe_report()
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(pa.Table.from_pylist([]), tmp)
+    else:
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            for page in pages:
+                text = "".join(
+                    json.dumps(element, ensure_ascii=False, default=str) + "\n" for element in page
+                )
+                f.write(text)
+                rows += len(page)
+                metrics.add_records(partition.label, len(page), encoded_size(text))
+                metrics.maybe_report()
+    os.replace(tmp, path)
+    return rows
+
+
+def _read_progress(directory: str) -> Dict[str, int]:
+    path = os.path.join(directory, PROGRESS)
+    done: Dict[str, int] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done[entry["file"]] = entry["rows"]
+    return done
+
+
+def _write_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _plan(
+    client: NebulaClient, graph: str, fmt: str, partition_rows: int
+) -> Dict[str, Any]:
+    schema = read_graph_schema(client, graph)
+    if not schema.vertices and not schema.edges:
+        raise ValueError(f"图 {graph} 中没有点类型或边类型，或读取 schema 失败")
+    suffix = ".parquet" if fmt == "parquet" else ".jsonl.gz"
+    partitions: List[Partition] = []
+    for kind, labels in (("vertex", schema.vertices), ("edge", schema.edges)):
+        for label in labels:
+            total = _count(client, kind, label)
+            bounds = _bounds(client, kind, label, total, partition_rows)
+            partitions.extend(plan_partitions(kind, label, bounds, suffix))
+            log(f"{'点' if kind == 'vertex' else '边'}类型 {label}: {total} 行")
+    return {
+        "version": MANIFEST_VERSION,
+        "graph": graph,
+        "format": fmt,
+        "partitions": [asdict(p) for p in partitions],
+    }
+
+
+def export(
+    config_data: Dict[str, Any],
+    directory: str,
+    graph: Optional[str] = None,
+    fmt: str = "jsonl",
+    workers: Optional[int] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    partition_rows: int = DEFAULT_PARTITION_ROWS,
+    client_factory: Optional[ClientFactory] = None,
+) -> Dict[str, Any]:
+    """
+    导出 graph（默认取配置中的 graph）的全部点与边到 directory，返回汇总报告
+    workers 为并发扫描的分区数（默认 max_sessions）；目录中已有 manifest 时继续未完成的导出
+    """
+    cfg = to_source_config(config_data)
+    graph = graph or config_data.get("graph")
+    if not graph:
+        raise ValueError("export 需要在配置中指定 graph")
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}（可选 {', '.join(FORMATS)}）")
+    workers = max(int(workers or cfg.max_sessions), 1)
+    os.makedirs(directory, exist_ok=True)
+    metrics = reset_registry("export")
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
+    client.connect()
+    start = time.monotonic()
+    rows = 0
+    try:
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"{directory} 中的导出版本为 {manifest.get('version')}，请使用新的目录")
+            if manifest.get("graph") != graph or manifest.get("format") != fmt:
+                raise ValueError(
+                    f"{directory} 中已有 {manifest.get('graph')} 的 {manifest.get('format')} 导出，"
+                    "请使用新的目录"
+                )
+            log(f"继续 {directory} 中未完成的导出")
+        else:
+            manifest = _plan(client, graph, fmt, partition_rows)
+            _write_manifest(directory, manifest)
+        partitions = [Partition(**p) for p in manifest["partitions"]]
+        done = _read_progress(directory)
+        pending = [p for p in partitions if p.file not in done]
+        log(f"导出 {graph}: {len(partitions)} 个分区（已完成 {len(partitions) - len(pending)}），{workers} 个并发扫描")
+
+        with open(os.path.join(directory, PROGRESS), "a", encoding="utf-8") as progress, \
+                ThreadPoolExecutor(workers, thread_name_prefix="export") as executor:
+            futures = {
+                executor.submit(_export_partition, client, directory, p, fmt, page_size, metrics): p
+                for p in pending
+            }
+            error: Optional[BaseException] = None
+            while futures and error is None:
+                finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in finished:
+                    partition = futures.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    count = future.result()
+                    rows += count
+                    done[partition.file] = count
+                    progress.write(json.dumps({"file": partition.file, "rows": count}) + "\n")
+                    progress.flush()
+            if error is not None:
+                for future in futures:
+                    future.cancel()
+                raise error
+
+        totals: Dict[str, int] = {}
+        for partition in partitions:
+            key = f"{partition.kind}:{partition.label}"
+            totals[key] = totals.get(key, 0) + done[partition.file]
+        manifest["rows"] = totals
+        manifest["complete"] = True
+        _write_manifest(directory, manifest)
+    finally:
+        client.close()
+        metrics.report_final()
+
+    elapsed = time.monotonic() - start
+    summary = {
+        "graph": graph,
+        "partitions": len(partitions),
+        "skipped_partitions": len(partitions) - len(pending),
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / max(elapsed, 1e-9), 1),
+    }
+    _LOG.info(
+        "导出完成: %d 个分区（跳过已完成 %d 个），%d 行（%.1f/s）",
+        summary["partitions"], summary["skipped_partitions"], rows, summary["rows_per_second"],
+    )
+    return summary
@@ -0,0 +1,614 @@
+"""
+MemoryBackend - 内存中的 Yueshu 替身，用于测试与基准测试
+
+只模拟连接器实际发出的 GQL 子集：
+- [TABLE] INSERT / INSERT OR IGNORE / INSERT OR REPLACE / INSERT OR UPDATE 点
+- [TABLE] MATCH (src@A{...}), (dst@B{...}) INSERT ... (src)-[@E[:rank]{...}]->(dst)
+- DESC GRAPH <graph> / DESC GRAPH TYPE <graph_type>
+- USE / SESSION SET（无操作）、RETURN 字面量、SHOW CURRENT_USER
+- 简单读取：MATCH (v[@L]) RETURN v / count(v) [SKIP n] [LIMIT n]，
+  MATCH ()-[e[@E]]->() RETURN e / count(e) [SKIP n] [LIMIT n]；可附带 element_id 区间条件
+  （WHERE element_id(v) > "..." AND ...）、RETURN element_id(v) AS x 与 ORDER BY element_id(v)
+
+每条语句可配置固定或按语句计算的延迟，使 destination.write 与 source.read
+可以在没有网络的情况下端到端地运行与压测：
+
+    backend = MemoryBackend("movie", latency=0.001)
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    destination.write(config, stdin, client_factory=backend.factory)
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+Latency = Union[float, Callable[[str], float]]
+
+_INSERT_MODES = ("IGNORE", "REPLACE", "UPDATE")
+
+_DESC_GRAPH_TYPE_RE = re.compile(r"^\s*DESC(?:RIBE)?\s+GRAPH\s+TYPE\s+`?(\w+)`?\s*;?\s*$", re.I)
+_DESC_GRAPH_RE = re.compile(r"^\s*DESC(?:RIBE)?\s+GRAPH\s+`?(\w+)`?\s*;?\s*$", re.I)
+_NOOP_RE = re.compile(r"^\s*(USE\b|SESSION\s+SET\b)", re.I)
+_CURRENT_USER_RE = re.compile(r"^\s*SHOW\s+CURRENT_USER\s*;?\s*$", re.I)
+_RETURN_RE = re.compile(r"^\s*RETURN\s+(.+?)(?:\s+AS\s+(\w+))?\s*;?\s*$", re.I | re.S)
+# 扫描语句：可选的 element_id 区间条件，返回 count(x)、element_id(x) 或 x（可附带 element_id(x)），
+# 可选的 ORDER BY element_id(x) 与 SKIP / LIMIT
+_SCAN_TAIL = (
+    r"(?:\s+WHERE\s+(?P<where>.+?))?\s+RETURN\s+(?:(?P<count>count)\s*\(\s*(?P=var)\s*\)"
+    r"|element_id\s*\(\s*(?P=var)\s*\)\s+AS\s+(?P<ids>\w+)"
+    r"|(?P=var)(?:\s*,\s*element_id\s*\(\s*(?P=var)\s*\)\s+AS\s+(?P<with_id>\w+))?)"
+    r"(?P<order>\s+ORDER\s+BY\s+element_id\s*\(\s*(?P=var)\s*\))?"
+    r"(?:\s+SKIP\s+(?P<skip>\d+))?(?:\s+LIMIT\s+(?P<limit>\d+))?\s*;?\s*$"
+)
+_MATCH_NODES_RE = re.compile(
+    r"^\s*MATCH\s+\(\s*(?P<var>\w+)\s*(?:[@:]\s*(?P<label>\w+))?\s*\)" + _SCAN_TAIL,
+    re.I | re.S,
+)
+_MATCH_EDGES_RE = re.compile(
+    r"^\s*MATCH\s+\(\s*\w*\s*\)\s*-\s*\[\s*(?P<var>\w+)\s*(?:[@:]\s*(?P<label>\w+))?\s*\]\s*->\s*\(\s*\w*\s*\)"
+    + _SCAN_TAIL,
+    re.I | re.S,
+)
+_ELEMENT_ID_CMP = r'element_id\s*\(\s*\w+\s*\)\s*(>=|<=|>|<)\s*("(?:[^"\\]|\\.)*")'
+_ELEMENT_ID_CMP_RE = re.compile(_ELEMENT_ID_CMP, re.I)
+_ELEMENT_ID_WHERE_RE = re.compile(rf"{_ELEMENT_ID_CMP}(?:\s+AND\s+{_ELEMENT_ID_CMP})*", re.I)
+_COMPARE = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+class MemoryBackendError(Exception):
+    """语句不在模拟的子集内，或违反了主键约束"""
+
+
+@dataclass
+class EntityType:
+    """点类型或边类型定义；key 对点是主键，对边是多边键"""
+    name: str
+    properties: List[str] = field(default_factory=list)
+    key: List[str] = field(default_factory=list)
+
+
+class MemoryResult:
+    """与驱动 ResultSet 相同的最小接口"""
+
+    def __init__(
+        self,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        error_msg: Optional[str] = None,
+    ) -> None:
+        self._rows = rows or []
+        self.error_msg = error_msg
+
+    @property
+    def is_succeeded(self) -> bool:
+        return self.error_msg is None
+
+    def size(self) -> int:
+        return len(self._rows)
+
+    def as_primitive_by_row(self) -> List[Dict[str, Any]]:
+        return list(self._rows)
+
+    def as_primitive_by_column(self) -> Dict[str, List[Any]]:
+        columns: Dict[str, List[Any]] = {}
+        for row in self._rows:
+            for key in row:
+                columns.setdefault(key, [])
+        for row in self._rows:
+            for key, values in columns.items():
+                values.append(row.get(key))
+        return columns
+
+
+# ============================================================================
+# 语句解析
+# ============================================================================
+
+class _Function:
+    """date("...") 等函数调用的字面量，原样保存"""
+
+    def __init__(self, name: str, args: List[Any]) -> None:
+        self.name = name
+        self.args = args
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Function) and (self.name, self.args) == (other.name, other.args)
+
+    def __hash__(self) -> int:
+        return hash((self.name, repr(self.args)))
+
+    def __repr__(self) -> str:
+        return f"{self.name}({', '.join(repr(a) for a in self.args)})"
+
+
+class _Parser:
+    """连接器生成语句的递归下降解析器"""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> MemoryBackendError:
+        return MemoryBackendError(f"{message} (位置 {self.pos}): {self.text[:200]}")
+
+    def skip_ws(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def at_end(self) -> bool:
+        self.skip_ws()
+        if self.pos < len(self.text) and self.text[self.pos] == ";":
+            self.pos += 1
+            self.skip_ws()
+        return self.pos >= len(self.text)
+
+    def peek(self, token: str) -> bool:
+        self.skip_ws()
+        return self.text.startswith(token, self.pos)
+
+    def accept(self, token: str) -> bool:
+        if self.peek(token):
+            self.pos += len(token)
+            return True
+        return False
+
+    def expect(self, token: str) -> None:
+        if not self.accept(token):
+            raise self.error(f"期望 {token!r}")
+
+    def accept_keyword(self, word: str) -> bool:
+        self.skip_ws()
+        end = self.pos + len(word)
+        if self.text[self.pos:end].upper() != word:
+            return False
+        if end < len(self.text) and (self.text[end].isalnum() or self.text[end] == "_"):
+            return False
+        self.pos = end
+        return True
+
+    def expect_keyword(self, word: str) -> None:
+        if not self.accept_keyword(word):
+            raise self.error(f"期望关键字 {word}")
+
+    def ident(self) -> str:
+        self.skip_ws()
+        if self.pos < len(self.text) and self.text[self.pos] == "`":
+            end = self.text.index("`", self.pos + 1)
+            name = self.text[self.pos + 1:end]
+            self.pos = end + 1
+            return name
+        match = re.compile(r"[A-Za-z_]\w*").match(self.text, self.pos)
+        if match is None:
+            raise self.error("期望标识符")
+        self.pos = match.end()
+        return match.group()
+
+    def value(self) -> Any:
+        self.skip_ws()
+        if self.pos >= len(self.text):
+            raise self.error("期望值")
+        ch = self.text[self.pos]
+        if ch in "\"'":
+            return self.string(ch)
+        if ch == "[":
+            self.pos += 1
+            items: List[Any] = []
+            if not self.accept("]"):
+                items.append(self.value())
+                while self.accept(","):
+                    items.append(self.value())
+                self.expect("]")
+            return items
+        if ch == "{":
+            return self.map()
+        number = re.compile(r"-?\d+(\.\d*)?([eE][-+]?\d+)?").match(self.text, self.pos)
+        if number is not None:
+            self.pos = number.end()
+            text = number.group()
+            return float(text) if number.group(1) or number.group(2) else int(text)
+        name = self.ident()
+        upper = name.upper()
+        if upper == "TRUE":
+            return True
+        if upper == "FALSE":
+            return False
+        if upper == "NULL":
+            return None
+        if self.accept("("):
+            args: List[Any] = []
+            if not self.accept(")"):
+                args.append(self.value())
+                while self.accept(","):
+                    args.append(self.value())
+                self.expect(")")
+            return _Function(name.lower(), args)
+        raise self.error(f"不支持的值 {name}")
+
+    def string(self, quote: str) -> str:
+        self.pos += 1
+        chars: List[str] = []
+        while self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if ch == "\\" and self.pos + 1 < len(self.text):
+                chars.append(self.text[self.pos + 1])
+                self.pos += 2
+                continue
+            if ch == quote:
+                self.pos += 1
+                return "".join(chars)
+            chars.append(ch)
+            self.pos += 1
+        raise self.error("字符串未结束")
+
+    def map(self) -> Dict[str, Any]:
+        self.expect("{")
+        props: Dict[str, Any] = {}
+        if self.accept("}"):
+            return props
+        while True:
+            key = self.ident()
+            self.expect(":")
+            props[key] = self.value()
+            if self.accept("}"):
+                return props
+            self.expect(",")
+
+    def insert_mode(self) -> str:
+        self.expect_keyword("INSERT")
+        if self.accept_keyword("OR"):
+            for mode in _INSERT_MODES:
+                if self.accept_keyword(mode):
+                    return mode
+            raise self.error("期望 IGNORE / REPLACE / UPDATE")
+        return "INSERT"
+
+    def node_pattern(self) -> Tuple[str, str, Dict[str, Any]]:
+        """(var@Label{...})，返回 (变量名, label, 属性)"""
+        self.expect("(")
+        var = ""
+        if not self.peek("@") and not self.peek(":"):
+            var = self.ident()
+        if not (self.accept("@") or self.accept(":")):
+            raise self.error("期望 @Label")
+        label = self.ident()
+        props = self.map() if self.peek("{") else {}
+        self.expect(")")
+        return var, label, props
+
+    def edge_pattern(self) -> Tuple[str, str, Any, Dict[str, Any], str]:
+        """(src)-[@E[:rank]{...}]->(dst)，返回 (起点变量, label, rank, 属性, 终点变量)"""
+        self.expect("(")
+        src = self.ident()
+        self.expect(")")
+        self.expect("-")
+        self.expect("[")
+        if not (self.accept("@") or self.accept(":")):
+            raise self.error("期望 @Edge")
+        label = self.ident()
+        rank = self.value() if self.accept(":") else None
+        props = self.map() if self.peek("{") else {}
+        self.expect("]")
+        self.expect("->")
+        self.expect("(")
+        dst = self.ident()
+        self.expect(")")
+        return src, label, rank, props, dst
+
+
+# ============================================================================
+# 内存图
+# ============================================================================
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class MemoryBackend:
+    """
+    内存中的单图存储
+
+    Args:
+        graph: 图名（DESC GRAPH 使用）
+        graph_type: 图类型名，默认 <graph>_type
+        latency: 每条语句的延迟秒数，或根据语句计算延迟的函数
+        strict: True 时写入未定义的点/边类型报错；False 时按首个属性自动建立点类型
+    """
+
+    def __init__(
+        self,
+        graph: str = "g",
+        graph_type: Optional[str] = None,
+        latency: Latency = 0.0,
+        strict: bool = False,
+    ) -> None:
+        self.graph = graph
+        self.graph_type = graph_type or f"{graph}_type"
+        self.latency = latency
+        self.strict = strict
+        self.node_types: Dict[str, EntityType] = {}
+        self.edge_types: Dict[str, EntityType] = {}
+        # label -> 主键 -> 属性
+        self.nodes: Dict[str, Dict[Tuple[Any, ...], Dict[str, Any]]] = {}
+        # label -> (起点, 终点, rank/多边键) -> 属性
+        self.edges: Dict[str, Dict[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self.statements = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # schema
+    # ------------------------------------------------------------------
+
+    def add_node_type(
+        self, name: str, properties: List[str], primary_key: Optional[List[str]] = None
+    ) -> "MemoryBackend":
+        self.node_types[name] = EntityType(name, list(properties), list(primary_key or properties[:1]))
+        return self
+
+    def add_edge_type(
+        self, name: str, properties: List[str], multiedge_key: Optional[List[str]] = None
+    ) -> "MemoryBackend":
+        self.edge_types[name] = EntityType(name, list(properties), list(multiedge_key or []))
+        return self
+
+    def _node_type(self, label: str, props: Dict[str, Any]) -> EntityType:
+        node_type = self.node_types.get(label)
+        if node_type is None:
+            if self.strict or not props:
+                raise MemoryBackendError(f"点类型不存在: {label}")
+            node_type = EntityType(label, list(props), [next(iter(props))])
+            self.node_types[label] = node_type
+        return node_type
+
+    def _edge_type(self, label: str, props: Dict[str, Any]) -> EntityType:
+        edge_type = self.edge_types.get(label)
+        if edge_type is None:
+            if self.strict:
+                raise MemoryBackendError(f"边类型不存在: {label}")
+            edge_type = EntityType(label, list(props), [])
+            self.edge_types[label] = edge_type
+        return edge_type
+
+    # ------------------------------------------------------------------
+    # 客户端
+    # ------------------------------------------------------------------
+
+    def factory(self, hosts: List[str], username: str, password: str) -> "MemoryClient":
+        """作为 NebulaClient 的 client_factory 使用"""
+        return MemoryClient(self)
+
+    def statement_latency(self, query: str) -> float:
+        latency = self.latency
+        return float(latency(query)) if callable(latency) else float(latency)
+
+    def node_count(self, label: Optional[str] = None) -> int:
+        with self._lock:
+            if label is not None:
+                return len(self.nodes.get(label, {}))
+            return sum(len(nodes) for nodes in self.nodes.values())
+
+    def edge_count(self, label: Optional[str] = None) -> int:
+        with self._lock:
+            if label is not None:
+                return len(self.edges.get(label, {}))
+            return sum(len(edges) for edges in self.edges.values())
+
+    def run(self, query: str) -> List[Dict[str, Any]]:
+        """执行一条语句并返回结果行；语句不受支持时抛出 MemoryBackendError"""
+        with self._lock:
+            self.statements += 1
+            match = _DESC_GRAPH_TYPE_RE.match(query)
+            if match:
+                return self._desc_graph_type(match.group(1))
+            match = _DESC_GRAPH_RE.match(query)
+            if match:
+                return self._desc_graph(match.group(1))
+            if _NOOP_RE.match(query):
+                return []
+            if _CURRENT_USER_RE.match(query):
+                return [{"user": "root"}]
+            match = _MATCH_NODES_RE.match(query)
+            if match:
+                return self._scan(self.nodes, self._node_row, **match.groupdict())
+            match = _MATCH_EDGES_RE.match(query)
+            if match:
+                return self._scan(self.edges, self._edge_row, **match.groupdict())
+            match = _RETURN_RE.match(query)
+            if match:
+                parser = _Parser(match.group(1))
+                value = parser.value()
+                if not parser.at_end():
+                    raise parser.error("不支持的 RETURN 表达式")
+                return [{match.group(2) or match.group(1).strip(): value}]
+            return self._write(query)
+
+    def _desc_graph(self, graph: str) -> List[Dict[str, Any]]:
+        if graph != self.graph:
+            raise MemoryBackendError(f"图不存在: {graph}")
+        return [{"graph_name": self.graph, "graph_type_name": self.graph_type}]
+
+    def _desc_graph_type(self, graph_type: str) -> List[Dict[str, Any]]:
+        if graph_type != self.graph_type:
+            raise MemoryBackendError(f"图类型不存在: {graph_type}")
+        rows = []
+        for entity, types in (("Node", self.node_types), ("Edge", self.edge_types)):
+            for t in types.values():
+                rows.append(
+                    {
+                        "entity_type": entity,
+                        "type_name": t.name,
+                        "labels": [t.name],
+                        "properties": list(t.properties),
+                        "primary_key/multiedge_key": list(t.key),
+                    }
+                )
+        return rows
+
+    def _write(self, query: str) -> List[Dict[str, Any]]:
+        parser = _Parser(query)
+        parser.accept_keyword("TABLE")
+        if parser.accept_keyword("MATCH"):
+            self._insert_edges(parser)
+        else:
+            mode = parser.insert_mode()
+            patterns = [parser.node_pattern()]
+            while parser.accept(","):
+                patterns.append(parser.node_pattern())
+            for _, label, props in patterns:
+                self._put(self.nodes, label, self._node_key(label, props), props, mode)
+        if not parser.at_end():
+            raise parser.error("语句末尾有无法解析的内容")
+        return []
+
+    def _node_key(self, label: str, props: Dict[str, Any]) -> Tuple[Any, ...]:
+        node_type = self._node_type(label, props)
+        missing = [k for k in node_type.key if k not in props]
+        if missing:
+            raise MemoryBackendError(f"点 {label} 缺少主键属性: {missing}")
+        return tuple(_freeze(props[k]) for k in node_type.key)
+
+    def _insert_edges(self, parser: _Parser) -> None:
+        bound: Dict[str, Optional[Tuple[str, Tuple[Any, ...]]]] = {}
+        while True:
+            var, label, props = parser.node_pattern()
+            bound[var] = self._match_node(label, props)
+            if not parser.accept(","):
+                break
+        mode = parser.insert_mode()
+        patterns = [parser.edge_pattern()]
+        while parser.accept(","):
+            patterns.append(parser.edge_pattern())
+        for src, label, rank, props, dst in patterns:
+            if src not in bound or dst not in bound:
+                raise parser.error(f"未绑定的变量 {src if src not in bound else dst}")
+            # MATCH 没有匹配到端点时不插入任何边
+            if bound[src] is None or bound[dst] is None:
+                continue
+            edge_type = self._edge_type(label, props)
+            multiedge = tuple(_freeze(props.get(k)) for k in edge_type.key)
+            key = (bound[src], bound[dst], _freeze(rank), multiedge)
+            self._put(self.edges, label, key, props, mode)
+
+    def _match_node(self, label: str, props: Dict[str, Any]) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+        nodes = self.nodes.get(label, {})
+        node_type = self.node_types.get(label)
+        if node_type is not None and set(props) == set(node_type.key):
+            key = tuple(_freeze(props[k]) for k in node_type.key)
+            return (label, key) if key in nodes else None
+        for key, stored in nodes.items():
+            if all(stored.get(k) == v for k, v in props.items()):
+                return label, key
+        return None
+
+    @staticmethod
+    def _put(
+        store: Dict[str, Dict[Tuple[Any, ...], Dict[str, Any]]],
+        label: str,
+        key: Tuple[Any, ...],
+        props: Dict[str, Any],
+        mode: str,
+    ) -> None:
+        entries = store.setdefault(label, {})
+        existing = entries.get(key)
+        if existing is None or mode == "REPLACE":
+            entries[key] = dict(props)
+        elif mode == "UPDATE":
+            existing.update(props)
+        elif mode == "INSERT":
+            raise MemoryBackendError(f"{label} 主键冲突: {key}")
+
+    @staticmethod
+    def _node_row(label: str, key: Tuple[Any, ...], props: Dict[str, Any]) -> Dict[str, Any]:
+        return {"labels": [label], "properties": dict(props)}
+
+    @staticmethod
+    def _edge_row(label: str, key: Tuple[Any, ...], props: Dict[str, Any]) -> Dict[str, Any]:
+        (src_label, src_key), (dst_label, dst_key), rank, _ = key
+        return {
+            "label": label,
+            "src": {"label": src_label, "key": list(src_key)},
+            "dst": {"label": dst_label, "key": list(dst_key)},
+            "rank": rank,
+            "properties": dict(props),
+        }
+
+    @staticmethod
+    def element_id(label: str, position: int) -> str:
+        """模拟的 element_id：类型与写入顺序组成的字符串，按写入顺序排序"""
+        return f"{label}:{position:012d}"
+
+    @staticmethod
+    def _scan(
+        store: Dict[str, Dict[Tuple[Any, ...], Dict[str, Any]]],
+        to_row: Callable[[str, Tuple[Any, ...], Dict[str, Any]], Dict[str, Any]],
+        var: str,
+        label: Optional[str],
+        where: Optional[str] = None,
+        count: Optional[str] = None,
+        ids: Optional[str] = None,
+        with_id: Optional[str] = None,
+        order: Optional[str] = None,
+        skip: Optional[str] = None,
+        limit: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        labels = [label] if label else list(store)
+        # 没有删除，覆盖写入保留原位置，因此元素在 dict 中的位置即写入顺序
+        entries = [
+            (MemoryBackend.element_id(l, i), l, k, p)
+            for l in labels
+            for i, (k, p) in enumerate(store.get(l, {}).items())
+        ]
+        if where:
+            if not _ELEMENT_ID_WHERE_RE.fullmatch(where.strip()):
+                raise MemoryBackendError(f"不支持的 WHERE 条件: {where}")
+            for op, literal in _ELEMENT_ID_CMP_RE.findall(where):
+                bound = json.loads(literal)
+                entries = [e for e in entries if _COMPARE[op](e[0], bound)]
+        if order:
+            entries.sort(key=lambda entry: entry[0])
+        start = int(skip or 0)
+        end = start + int(limit) if limit is not None else None
+        entries = entries[start:end]
+        if count:
+            return [{f"count({var})": len(entries)}]
+        if ids:
+            return [{ids: entry[0]} for entry in entries]
+        rows = [{var: to_row(*entry[1:])} for entry in entries]
+        if with_id:
+            for row, entry in zip(rows, entries):
+                row[with_id] = entry[0]
+        return rows
+
+
+class MemoryClient:
+    """MemoryBackend 上的客户端，接口与驱动的 NebulaClient 一致（execute / close）"""
+
+    def __init__(self, backend: MemoryBackend) -> None:
+        self.backend = backend
+        self.closed = False
+
+    def execute(self, query: str, *, timeout: Optional[float] = None) -> MemoryResult:
+        latency = self.backend.statement_latency(query)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"deadline exceeded after {timeout}s")
+        if latency > 0:
+            time.sleep(latency)
+        try:
+            return MemoryResult(self.backend.run(query))
+        except MemoryBackendError as exc:
+            return MemoryResult(error_msg=str(exc))
+
+    def close(self) -> None:
+        self.closed = True
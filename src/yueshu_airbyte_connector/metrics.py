@@ -0,0 +1,300 @@
+"""
+Metrics - 同步过程的吞吐与延迟统计
+
+记录以下指标：
+- 每个 stream 的记录数与字节数（UTF-8 编码后的字节数）
+- 各阶段累计耗时（decode / generate / execute 等）
+- 每个 host 的执行延迟直方图（按实际执行语句的 host）
+- 每个 host 的重试次数
+- 拒绝、跳过等事件计数
+
+按固定间隔输出进度摘要（Airbyte LOG 消息），可选写出 Prometheus textfile，
+并在同步结束时输出最终报告。
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .common import get_logger
+
+DEFAULT_PROGRESS_INTERVAL = 60.0  # 秒
+
+# 执行延迟直方图桶（秒）
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_METRICS_LOG = get_logger("metrics")
+
+
+def encoded_size(text: Union[str, bytes]) -> int:
+    """UTF-8 编码后的字节数；ASCII 字符串（常见情况）不必编码"""
+    if isinstance(text, bytes) or text.isascii():
+        return len(text)
+    return len(text.encode("utf-8"))
+
+
+def _label_value(value: str) -> str:
+    """按 Prometheus 文本格式转义标签值中的反斜杠、双引号与换行"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@dataclass
+class Histogram:
+    """固定桶直方图"""
+    buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+@dataclass
+class StreamStats:
+    """单个 stream 的计数"""
+    records: int = 0
+    bytes: int = 0
+
+
+class MetricsRegistry:
+    """
+    线程安全的指标注册表
+
+    Args:
+        connector: 连接器类型（source / destination），作为指标标签
+        progress_interval: 进度摘要输出间隔（秒），0 表示不输出
+        textfile: Prometheus textfile 路径（可选）
+    """
+
+    def __init__(
+        self,
+        connector: str = "",
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+        textfile: Optional[str] = None,
+    ) -> None:
+        self.connector = connector
+        self.progress_interval = progress_interval
+        self.textfile = textfile
+        self.streams: Dict[str, StreamStats] = {}
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_counts: Dict[str, int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.retries: Dict[str, int] = {}
+        self.events: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def add_records(self, stream: str, count: int = 1, nbytes: int = 0) -> None:
+        """nbytes 为字节数（字符串用 encoded_size 计算）"""
+        with self._lock:
+            stats = self.streams.get(stream)
+            if stats is None:
+                stats = self.streams[stream] = StreamStats()
+            stats.records += count
+            stats.bytes += nbytes
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - start)
+
+    def observe_execute(self, host: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.latency.get(host)
+            if hist is None:
+                hist = self.latency[host] = Histogram()
+            hist.observe(seconds)
+
+    def inc_retry(self, host: str) -> None:
+        """记录一次在 host 上失败后的重试"""
+        with self._lock:
+            self.retries[host] = self.retries.get(host, 0) + 1
+
+    def inc(self, event: str, value: int = 1) -> None:
+        with self._lock:
+            self.events[event] = self.events.get(event, 0) + value
+
+    # ------------------------------------------------------------------
+    # 输出
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            records = sum(s.records for s in self.streams.values())
+            nbytes = sum(s.bytes for s in self.streams.values())
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "records": records,
+                "bytes": nbytes,
+                "records_per_second": round(records / elapsed, 1),
+                "bytes_per_second": round(nbytes / elapsed, 1),
+                "streams": {
+                    name: {"records": s.records, "bytes": s.bytes}
+                    for name, s in self.streams.items()
+                },
+                "stages": {
+                    name: {"seconds": round(sec, 6), "count": self.stage_counts.get(name, 0)}
+                    for name, sec in self.stage_seconds.items()
+                },
+                "execute_latency": {
+                    host: {
+                        "count": h.count,
+                        "mean": round(h.total / h.count, 6) if h.count else 0.0,
+                        "p50": h.quantile(0.5),
+                        "p99": h.quantile(0.99),
+                    }
+                    for host, h in self.latency.items()
+                },
+                "retries": dict(self.retries),
+                "events": dict(self.events),
+            }
+
+    def _format_summary(self, title: str) -> str:
+        data = self.summary()
+        parts = [
+            f"{title}: 记录 {data['records']} ({data['records_per_second']}/s)",
+            f"字节 {data['bytes']} ({data['bytes_per_second']}/s)",
+        ]
+        if data["stages"]:
+            parts.append(
+                "阶段耗时 "
+                + " ".join(f"{k}={v['seconds']:.3f}s" for k, v in data["stages"].items())
+            )
+        for host, lat in data["execute_latency"].items():
+            parts.append(f"{host} 执行 {lat['count']} 次 p50={lat['p50']}s p99={lat['p99']}s")
+        if data["retries"]:
+            parts.append("重试 " + " ".join(f"{k}={v}" for k, v in data["retries"].items()))
+        if data["events"]:
+            parts.append(" ".join(f"{k}={v}" for k, v in data["events"].items()))
+        return ", ".join(parts)
+
+    def maybe_report(self) -> None:
+        """距上次输出超过 progress_interval 时输出进度摘要"""
+        if not self.progress_interval:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        _METRICS_LOG.info(lambda: self._format_summary("同步进度"))
+        if self.textfile:
+            self.write_textfile(self.textfile)
+
+    def report_final(self) -> None:
+        """输出最终报告"""
+        _METRICS_LOG.info(lambda: self._format_summary("同步完成"))
+        if self.textfile:
+            self.write_textfile(self.textfile)
+
+    def to_prometheus(self) -> str:
+        esc = _label_value
+        label = f'connector="{esc(self.connector)}"'
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# TYPE yueshu_records_total counter")
+            for name, s in self.streams.items():
+                lines.append(f'yueshu_records_total{{{label},stream="{esc(name)}"}} {s.records}')
+            lines.append("# TYPE yueshu_bytes_total counter")
+            for name, s in self.streams.items():
+                lines.append(f'yueshu_bytes_total{{{label},stream="{esc(name)}"}} {s.bytes}')
+            lines.append("# TYPE yueshu_stage_seconds_total counter")
+            for name, sec in self.stage_seconds.items():
+                lines.append(f'yueshu_stage_seconds_total{{{label},stage="{esc(name)}"}} {sec}')
+            lines.append("# TYPE yueshu_execute_latency_seconds histogram")
+            for host, h in self.latency.items():
+                host = esc(host)
+                cumulative = 0
+                for bound, c in zip(h.buckets, h.counts):
+                    cumulative += c
+                    lines.append(
+                        f'yueshu_execute_latency_seconds_bucket{{{label},host="{host}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'yueshu_execute_latency_seconds_bucket{{{label},host="{host}",le="+Inf"}} {h.count}'
+                )
+                lines.append(f'yueshu_execute_latency_seconds_sum{{{label},host="{host}"}} {h.total}')
+                lines.append(f'yueshu_execute_latency_seconds_count{{{label},host="{host}"}} {h.count}')
+            lines.append("# TYPE yueshu_retries_total counter")
+            for host, value in self.retries.items():
+                lines.append(f'yueshu_retries_total{{{label},host="{esc(host)}"}} {value}')
+            lines.append("# TYPE yueshu_events_total counter")
+            for name, value in self.events.items():
+                lines.append(f'yueshu_events_total{{{label},event="{esc(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """原子写出 Prometheus textfile（node_exporter textfile collector 格式）"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+_REGISTRY: Optional[MetricsRegistry] = None
+
+
+def reset_registry(connector: str = "") -> MetricsRegistry:
+    """
+    创建新的全局注册表；配置从环境变量读取：
+    - YUESHU_METRICS_INTERVAL: 进度摘要间隔（秒，默认 60，0 表示关闭）
+    - YUESHU_METRICS_TEXTFILE: Prometheus textfile 输出路径
+    """
+    global _REGISTRY
+    _REGISTRY = MetricsRegistry(
+        connector=connector,
+        progress_interval=float(
+            os.environ.get("YUESHU_METRICS_INTERVAL", DEFAULT_PROGRESS_INTERVAL)
+        ),
+        textfile=os.environ.get("YUESHU_METRICS_TEXTFILE") or None,
+    )
+    return _REGISTRY
+
+
+def get_registry() -> MetricsRegistry:
+    if _REGISTRY is None:
+        return reset_registry()
+    return _REGISTRY
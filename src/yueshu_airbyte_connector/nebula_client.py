@@ -1,14 +1,92 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+import inspect
+import itertools
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, Deque, Dict, Hashable, Iterator, List, Optional, Sequence, Set, Tuple,
+)
 
-from .common import log
+from .common import (
+    ConnectionConfig,
+    adopt_invocation,
+    bind_invocation,
+    current_invocation,
+    get_logger,
+    log,
+)
+from .metrics import get_registry
+from .ratelimit import RateLimiter, RateLimits
+from .tracing import get_tracer
 
 
 class NebulaClientError(RuntimeError):
     pass
 
 
+class NebulaTimeoutError(NebulaClientError):
+    """语句超过 statement_timeout 仍未返回"""
+
+
+DEFAULT_MIN_SESSIONS = 1
+DEFAULT_MAX_SESSIONS = 8
+DEFAULT_KEEPALIVE_INTERVAL = 30.0  # 秒
+DEFAULT_IDLE_TIMEOUT = 300.0  # 秒
+DEFAULT_CHECKOUT_TIMEOUT = 60.0  # 秒
+DEFAULT_HOST_SELECTION = "p2c"
+PROBE_QUERY = "RETURN 1"
+DEFAULT_SLOW_STATEMENT_THRESHOLD = 10.0  # 秒
+PARAMETER_PROBE_QUERY = "RETURN $p AS v"
+DEFAULT_PAGE_SIZE = 10000
+
+# 驱动 execute 中可能表示查询参数的关键字参数名
+_PARAMETER_KEYWORDS = ("params", "parameters")
+
+_NULL_LIMIT = nullcontext()
+
+_SLOW_LOG = get_logger("slow_statement")
+_PAGE_LOG = get_logger("execute_iter")
+
+# 驱动中表示连接/会话不可用的异常（区别于语句本身执行失败）
+_CONNECTION_ERROR_NAMES = {
+    "ConnectingError",
+    "PoolError",
+    "AuthenticatingError",
+}
+
+# 驱动把 Execute 的任何失败都包装为 ExecutingError，只有 __cause__ 中的 gRPC 状态码
+# 表示传输失败时才视为连接错误
+_TRANSPORT_STATUS_CODES = {"UNAVAILABLE"}
+
+# 作用于会话状态的语句：需要在池中每个会话上生效
+_SESSION_STATEMENT_RE = re.compile(r"^\s*(USE\b|SESSION\s+SET\s+\w+)", re.IGNORECASE)
+
+# 边写入语句：先 MATCH 两个端点再 INSERT 边，端点必须已经写入
+_EDGE_WRITE_RE = re.compile(r"^\s*(?:TABLE\s+)?MATCH\b", re.IGNORECASE)
+
+# 写入语句的阶段：点写入在前，边写入在后
+PHASE_VERTEX = 0
+PHASE_EDGE = 1
+
+# 查询末尾的 SKIP / LIMIT：execute_iter 在该窗口内分页
+_WINDOW_RE = re.compile(r"(?:\s+SKIP\s+(\d+))?(?:\s+LIMIT\s+(\d+))?\s*;?\s*$", re.IGNORECASE)
+_RETURN_RE = re.compile(r"\bRETURN\b", re.IGNORECASE)
+# 以 ORDER BY 子句结尾的查询（之后没有其它子句）：只有这样的查询分页时各页不重叠、不遗漏
+_ORDERED_RE = re.compile(
+    r"\bORDER\s+BY\b(?!.*\b(?:RETURN|MATCH|WITH|NEXT|UNION|FILTER|LET|FOR)\b)", re.IGNORECASE | re.DOTALL
+)
+
+# 创建底层客户端的工厂：factory(hosts, username, password) -> 具有 execute/close 的对象
+ClientFactory = Callable[[List[str], str, str], Any]
+
+
 def _import_client() -> Any:
     """导入 nebula5_python 的 NebulaClient"""
     try:
@@ -20,79 +98,1140 @@ def _import_client() -> Any:
         ) from exc
 
 
+def _default_client_factory(hosts: List[str], username: str, password: str) -> Any:
+    client_cls = _import_client()
+    # 参考: https://github.com/vesoft-inc/nebula-python/tree/v5.2.1/docs/1_started.md
+    return client_cls(hosts=hosts, username=username, password=password)
+
+
+def _status_code(error: BaseException) -> Optional[str]:
+    """gRPC 异常的状态码名称（如 "UNAVAILABLE"），其它异常返回 None"""
+    code = getattr(error, "code", None)
+    if callable(code):
+        try:
+            return getattr(code(), "name", None)
+        except Exception:  # noqa: BLE001
+            return None
+    return None
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """
+    判断异常是否表示连接/会话失效（需要重连），而不是语句错误
+
+    只有这类错误会驱逐会话、把 host 标记为不可用并在其它 host 上重试；语句本身
+    执行失败（包括驱动包装为 ExecutingError 的服务端错误）不重试，避免非幂等的
+    INSERT 被重复执行。
+    """
+    error: Optional[BaseException] = exc
+    while error is not None:
+        if isinstance(error, (ConnectionError, OSError)):
+            return True
+        if any(cls.__name__ in _CONNECTION_ERROR_NAMES for cls in type(error).__mro__):
+            return True
+        if _status_code(error) in _TRANSPORT_STATUS_CODES:
+            return True
+        error = error.__cause__
+    return False
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """判断异常是否为语句超时（gRPC DEADLINE_EXCEEDED）"""
+    error: Optional[BaseException] = exc
+    while error is not None:
+        if isinstance(error, TimeoutError):
+            return True
+        if _status_code(error) == "DEADLINE_EXCEEDED":
+            return True
+        if "deadline exceeded" in str(error).lower():
+            return True
+        error = error.__cause__
+    return False
+
+
+def _accepts_timeout(client: Any) -> bool:
+    """底层客户端的 execute 是否支持 timeout 参数"""
+    try:
+        params = inspect.signature(client.execute).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "timeout" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def _parameter_keyword(client: Any) -> Optional[str]:
+    """底层客户端 execute 接收查询参数的关键字参数名，不支持时返回 None"""
+    try:
+        params = inspect.signature(client.execute).parameters
+    except (TypeError, ValueError):
+        return None
+    for name in _PARAMETER_KEYWORDS:
+        if name in params:
+            return name
+    return None
+
+
+def session_statement_key(query: str) -> Optional[str]:
+    """返回会话语句的类别（如 "USE"、"SESSION SET GRAPH"），普通语句返回 None"""
+    match = _SESSION_STATEMENT_RE.match(query)
+    if match is None:
+        return None
+    return " ".join(match.group(1).upper().split())
+
+
+def statement_phase(query: str) -> int:
+    """边写入语句需要端点已存在，放在点写入语句之后执行"""
+    return PHASE_EDGE if _EDGE_WRITE_RE.match(query) else PHASE_VERTEX
+
+
+def split_window(query: str) -> Tuple[str, int, Optional[int]]:
+    """拆出查询末尾的 SKIP / LIMIT，返回 (去掉窗口的查询, skip, limit)"""
+    match = _WINDOW_RE.search(query)
+    assert match is not None
+    limit = match.group(2)
+    return query[: match.start()], int(match.group(1) or 0), int(limit) if limit is not None else None
+
+
+class QueryPager:
+    """
+    execute_iter 的分页状态：next_query 给出下一页的查询，advance 报告该页的行数
+
+    以 ORDER BY 结尾的查询以 SKIP/LIMIT 分页（查询末尾已有 SKIP / LIMIT 时在该窗口内分页），
+    某页不足 page_size 行时结束。没有 ORDER BY 时各次执行的结果顺序不确定，分页会重复或
+    遗漏行，因此告警后只执行一次（结果仍逐页转换）；其它语句（DESC、SHOW 等）或
+    page_size <= 0 时同样只执行一次。ORDER BY 的键需要唯一，否则同值的行仍可能跨页错位。
+    """
+
+    def __init__(self, query: str, page_size: int) -> None:
+        self._query = query
+        self._page_size = page_size
+        self._paged = page_size > 0 and _RETURN_RE.search(query) is not None
+        if self._paged and not _ORDERED_RE.search(split_window(query)[0]):
+            _PAGE_LOG.warn("查询没有以 ORDER BY 结尾，不分页，整体执行一次: %s", query[:200])
+            self._paged = False
+        self._base, self._position, limit = split_window(query) if self._paged else (query, 0, None)
+        self._end = None if limit is None else self._position + limit
+        self._size = 0
+        self._done = False
+
+    def next_query(self) -> Optional[str]:
+        if self._done:
+            return None
+        if not self._paged:
+            self._done = True
+            return self._query
+        size = self._page_size if self._end is None else min(self._page_size, self._end - self._position)
+        if size <= 0:
+            return None
+        self._size = size
+        return f"{self._base} SKIP {self._position} LIMIT {size}"
+
+    def advance(self, rows: int) -> None:
+        if self._paged:
+            self._done = rows < self._size
+            self._position += self._size
+
+
+def result_pages(result: Any, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """把结果集的行（as_primitive_by_row）逐页转换返回，page_size <= 0 时整体作为一页"""
+    if not hasattr(result, "as_primitive_by_row"):
+        return
+    rows = iter(result.as_primitive_by_row())
+    while True:
+        page = list(itertools.islice(rows, page_size) if page_size > 0 else rows)
+        if not page:
+            return
+        yield page
+
+
+def rate_limits_from_config(cfg: ConnectionConfig) -> RateLimits:
+    """从连接配置读取限流设置"""
+    return RateLimits(
+        statements_per_second=cfg.rate_limit_statements,
+        rows_per_second=cfg.rate_limit_rows,
+        host_statements_per_second=cfg.rate_limit_host_statements,
+        max_in_flight_per_host=cfg.max_in_flight_per_host,
+    )
+
+
+def _check_result(result: Any) -> None:
+    """检查 ResultSet 是否执行成功"""
+    if hasattr(result, "is_succeeded"):
+        # is_succeeded 可能是属性，也可能是方法
+        is_succeeded = result.is_succeeded
+        if callable(is_succeeded):
+            is_succeeded = is_succeeded()
+        if not is_succeeded:
+            get_registry().inc("execute_errors")
+            error_msg = getattr(result, "error_msg", "执行失败")
+            raise NebulaClientError(f"查询执行失败: {error_msg}")
+
+
+@dataclass
+class StatementResult:
+    """execute_many 中单条语句的结果：成功时 result 为 ResultSet，失败时 error 为异常"""
+    query: str
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(eq=False)
+class PooledSession:
+    """池中的一个会话：绑定到单个 graphd host 的底层客户端"""
+    host: str
+    client: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+    # 已应用的会话语句版本，见 NebulaClient.execute
+    version: int = 0
+    supports_timeout: Optional[bool] = None
+
+    def execute(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        kwargs: Dict[str, Any] = {}
+        if timeout:
+            if self.supports_timeout is None:
+                self.supports_timeout = _accepts_timeout(self.client)
+            if self.supports_timeout:
+                kwargs["timeout"] = timeout
+        if params is not None:
+            keyword = _parameter_keyword(self.client)
+            if keyword is None:
+                raise NebulaClientError("驱动不支持查询参数")
+            kwargs[keyword] = params
+        return self.client.execute(query, **kwargs)
+
+    def close(self) -> None:
+        try:
+            self.client.close()
+        except Exception as exc:  # noqa: BLE001
+            log(f"关闭会话失败 ({self.host}): {exc}")
+
+
+@dataclass
+class HostState:
+    """host 健康状态与负载统计"""
+    host: str
+    healthy: bool = True
+    failures: int = 0
+    last_failure: float = 0.0
+    ewma_latency: float = 0.0  # 执行延迟 EWMA（秒）
+    error_rate: float = 0.0  # 连接类错误率 EWMA
+    samples: int = 0
+    in_flight: int = 0
+    ejected_until: float = 0.0
+
+
+class HostSelector:
+    """
+    按延迟与负载选择 host
+
+    - policy="p2c": 随机取两个可用 host，选 ewma_latency * (in_flight + 1) 较小者
+      （尚无样本的 host 得分为 0，优先被探索）
+    - policy="round_robin": 依次轮询
+    - 错误率 EWMA 超过 eject_error_rate 的 host 在 eject_duration 秒内不参与选择
+    """
+
+    POLICIES = ("p2c", "round_robin")
+
+    def __init__(
+        self,
+        hosts: List[str],
+        policy: str = DEFAULT_HOST_SELECTION,
+        alpha: float = 0.3,
+        eject_error_rate: float = 0.5,
+        eject_min_samples: int = 5,
+        eject_duration: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if policy not in self.POLICIES:
+            raise NebulaClientError(f"未知的 host_selection: {policy}")
+        self.hosts = list(hosts)
+        self.policy = policy
+        self.states: Dict[str, HostState] = {h: HostState(h) for h in self.hosts}
+        self._alpha = alpha
+        self._eject_error_rate = eject_error_rate
+        self._eject_min_samples = eject_min_samples
+        self._eject_duration = eject_duration
+        self._rng = rng or random.Random()
+        self._rr = itertools.count()
+
+    def available(self) -> List[str]:
+        """可参与选择的 host：健康且未被剔除；都不满足时逐级放宽"""
+        now = time.monotonic()
+        healthy = [h for h in self.hosts if self.states[h].healthy]
+        candidates = [h for h in healthy if self.states[h].ejected_until <= now]
+        return candidates or healthy or list(self.hosts)
+
+    def choose(self) -> str:
+        candidates = self.available()
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.policy == "round_robin":
+            return candidates[next(self._rr) % len(candidates)]
+        a, b = self._rng.sample(candidates, 2)
+        return a if self._score(a) <= self._score(b) else b
+
+    def order(self, first: Optional[str] = None) -> List[str]:
+        """建立会话时尝试的 host 顺序：first 在前，其后为其它可用 host，最后为不健康 host"""
+        preferred = self.available()
+        ordered = [first] if first else []
+        ordered += [h for h in preferred if h not in ordered]
+        ordered += [h for h in self.hosts if h not in ordered]
+        return ordered
+
+    def _score(self, host: str) -> float:
+        state = self.states[host]
+        return state.ewma_latency * (state.in_flight + 1)
+
+    def begin(self, host: str) -> None:
+        self.states[host].in_flight += 1
+
+    def end(self, host: str) -> None:
+        state = self.states[host]
+        state.in_flight = max(state.in_flight - 1, 0)
+
+    def record(self, host: str, latency: Optional[float], error: bool = False) -> None:
+        """记录一次执行结果；error 仅表示连接/超时类错误"""
+        state = self.states[host]
+        alpha = self._alpha
+        if latency is not None and not error:
+            if state.samples == 0:
+                state.ewma_latency = latency
+            else:
+                state.ewma_latency = alpha * latency + (1 - alpha) * state.ewma_latency
+        state.error_rate = alpha * (1.0 if error else 0.0) + (1 - alpha) * state.error_rate
+        state.samples += 1
+        if (
+            error
+            and state.samples >= self._eject_min_samples
+            and state.error_rate >= self._eject_error_rate
+            and state.ejected_until <= time.monotonic()
+        ):
+            state.ejected_until = time.monotonic() + self._eject_duration
+            get_registry().inc("host_ejected")
+            log(f"host {host} 错误率 {state.error_rate:.2f} 过高，暂时剔除 {self._eject_duration:.0f}s")
+
+
+class SessionPool:
+    """
+    多 host 会话池
+
+    - 维持 min_sessions ~ max_sessions 个会话，每个会话绑定一个 host
+    - checkout 先由 HostSelector 选出 host，再取该 host 的空闲会话；
+      checkout/checkin 只涉及一次加锁和 deque 操作，可按批次调用
+    - 后台线程对空闲会话做 keepalive，探测不健康的 host，回收超时空闲会话
+    - 会话出现连接错误时被驱逐，所在 host 标记为不健康，新会话自动建到其它 host
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        username: str,
+        password: str,
+        client_factory: Optional[ClientFactory] = None,
+        min_sessions: int = DEFAULT_MIN_SESSIONS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        host_selection: str = DEFAULT_HOST_SELECTION,
+    ) -> None:
+        if not hosts:
+            raise NebulaClientError("hosts 不能为空")
+        self._hosts = list(hosts)
+        self._username = username
+        self._password = password
+        self._factory = client_factory or _default_client_factory
+        self._min_sessions = max(int(min_sessions), 0)
+        self._max_sessions = max(int(max_sessions), 1, self._min_sessions)
+        self._keepalive_interval = keepalive_interval
+        self._idle_timeout = idle_timeout
+        self.selector = HostSelector(self._hosts, policy=host_selection)
+        self._idle: Dict[str, Deque[PooledSession]] = {h: deque() for h in self._hosts}
+        self._total = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+
+    @property
+    def host_states(self) -> Dict[str, HostState]:
+        return self.selector.states
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """建立 min_sessions 个会话（至少一个）并启动后台 keepalive"""
+        initial = max(self._min_sessions, 1)
+        sessions = [self._open_session(self.selector.choose()) for _ in range(initial)]
+        with self._cond:
+            self._total += len(sessions)
+            for session in sessions:
+                self._idle[session.host].append(session)
+        if self._keepalive_interval and self._keepalive_interval > 0:
+            self._keepalive_thread = threading.Thread(
+                target=bind_invocation(self._keepalive_loop), name="nebula-keepalive", daemon=True
+            )
+            self._keepalive_thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._keepalive_thread is not None:
+            self._keepalive_thread.join()
+        with self._cond:
+            self._closed = True
+            sessions = [s for dq in self._idle.values() for s in dq]
+            for dq in self._idle.values():
+                dq.clear()
+            self._total -= len(sessions)
+            self._cond.notify_all()
+        for session in sessions:
+            session.close()
+
+    # ------------------------------------------------------------------
+    # 借出与归还
+    # ------------------------------------------------------------------
+
+    def checkout(
+        self,
+        timeout: Optional[float] = DEFAULT_CHECKOUT_TIMEOUT,
+        exclude: Optional[List[str]] = None,
+    ) -> PooledSession:
+        """
+        借出会话；exclude 中的 host 仅在没有其它可用 host 时才会被选中
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise NebulaClientError("会话池已关闭")
+                host = self._choose_host(exclude)
+                idle = self._idle[host]
+                if idle:
+                    session = idle.pop()
+                    self.selector.begin(host)
+                    return session
+                if self._total < self._max_sessions:
+                    self._total += 1
+                    break
+                # 已达上限：借用其它可用 host 的空闲会话
+                session = self._pop_any_idle(exclude)
+                if session is not None:
+                    self.selector.begin(session.host)
+                    return session
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise NebulaClientError("等待可用会话超时")
+                self._cond.wait(remaining)
+
+        try:
+            session = self._open_session(host)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        self.selector.begin(session.host)
+        return session
+
+    def _choose_host(self, exclude: Optional[List[str]]) -> str:
+        host = self.selector.choose()
+        if exclude and host in exclude:
+            others = [h for h in self.selector.available() if h not in exclude]
+            if others:
+                host = others[0] if len(others) == 1 else min(others, key=self.selector._score)
+        return host
+
+    def _pop_any_idle(self, exclude: Optional[List[str]]) -> Optional[PooledSession]:
+        hosts = self.selector.available()
+        if exclude:
+            hosts = [h for h in hosts if h not in exclude] + [h for h in hosts if h in exclude]
+        for host in hosts:
+            if self._idle[host]:
+                return self._idle[host].pop()
+        return None
+
+    def checkin(self, session: PooledSession, broken: bool = False) -> None:
+        """归还会话；broken=True 时驱逐该会话并将其 host 标记为不健康"""
+        self.selector.end(session.host)
+        if broken:
+            self.mark_failure(session.host)
+        session.last_used = time.monotonic()
+        self._return_idle(session, evict=broken)
+
+    def _return_idle(self, session: PooledSession, evict: bool = False, front: bool = False) -> None:
+        with self._cond:
+            if evict or self._closed or not self.host_states[session.host].healthy:
+                self._total -= 1
+                evict = True
+            elif front:
+                self._idle[session.host].appendleft(session)
+            else:
+                self._idle[session.host].append(session)
+            self._cond.notify()
+        if evict:
+            session.close()
+
+    @contextmanager
+    def session(self) -> Iterator[PooledSession]:
+        session = self.checkout()
+        broken = False
+        try:
+            yield session
+        except Exception as exc:
+            broken = is_connection_error(exc)
+            raise
+        finally:
+            self.checkin(session, broken=broken)
+
+    # ------------------------------------------------------------------
+    # host 健康状态
+    # ------------------------------------------------------------------
+
+    def mark_failure(self, host: str) -> None:
+        """标记 host 不可用，并关闭其上的全部空闲会话"""
+        state = self.host_states[host]
+        state.failures += 1
+        state.last_failure = time.monotonic()
+        with self._cond:
+            stale = list(self._idle[host])
+            self._idle[host].clear()
+            self._total -= len(stale)
+            self._cond.notify_all()
+        for session in stale:
+            session.close()
+        if state.healthy:
+            state.healthy = False
+            get_registry().inc("host_down")
+            log(f"host {host} 不可用，已暂停向其分配会话")
+
+    def mark_healthy(self, host: str) -> None:
+        state = self.host_states[host]
+        if not state.healthy:
+            log(f"host {host} 已恢复")
+        state.healthy = True
+        state.failures = 0
+
+    def healthy_hosts(self) -> List[str]:
+        return [h for h in self._hosts if self.host_states[h].healthy]
+
+    def _open_session(self, host: Optional[str] = None, only: bool = False) -> PooledSession:
+        errors = []
+        for candidate in ([host] if only else self.selector.order(host)):
+            try:
+                client = self._factory([candidate], self._username, self._password)
+            except Exception as exc:  # noqa: BLE001
+                errors.append(f"{candidate}: {exc}")
+                self.mark_failure(candidate)
+                continue
+            self.mark_healthy(candidate)
+            return PooledSession(host=candidate, client=client)
+        raise NebulaClientError(f"无法连接任何 host: {'; '.join(errors)}")
+
+    # ------------------------------------------------------------------
+    # 后台维护
+    # ------------------------------------------------------------------
+
+    def _keepalive_loop(self) -> None:
+        while not self._stop.wait(self._keepalive_interval):
+            try:
+                self._maintain()
+            except Exception as exc:  # noqa: BLE001
+                log(f"会话池维护失败: {exc}")
+
+    def _maintain(self) -> None:
+        now = time.monotonic()
+        # 1) 取出需要 keepalive 或回收的空闲会话
+        due: List[PooledSession] = []
+        with self._cond:
+            for idle in self._idle.values():
+                for session in list(idle):
+                    if now - max(session.last_used, session.last_checked) >= self._keepalive_interval:
+                        idle.remove(session)
+                        due.append(session)
+        for session in due:
+            with self._cond:
+                expired = (
+                    now - session.last_used >= self._idle_timeout
+                    and self._total > self._min_sessions
+                )
+                if expired:
+                    self._total -= 1
+            if expired:
+                session.close()
+                continue
+            try:
+                _check_result(session.execute(PROBE_QUERY))
+            except Exception as exc:  # noqa: BLE001
+                log(f"会话 keepalive 失败 ({session.host}): {exc}")
+                self.mark_failure(session.host)
+                self._return_idle(session, evict=True)
+                continue
+            session.last_checked = time.monotonic()
+            self._return_idle(session, front=True)
+
+        # 2) 探测不健康的 host
+        for host in self._hosts:
+            if self.host_states[host].healthy:
+                continue
+            try:
+                session = PooledSession(
+                    host=host, client=self._factory([host], self._username, self._password)
+                )
+            except Exception:  # noqa: BLE001
+                continue
+            try:
+                _check_result(session.execute(PROBE_QUERY))
+            except Exception:  # noqa: BLE001
+                session.close()
+                continue
+            self.mark_healthy(host)
+            with self._cond:
+                self._total += 1
+            self._return_idle(session)
+
+        # 3) 补足最小会话数
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self._min_sessions:
+                    break
+                self._total += 1
+            try:
+                session = self._open_session(self.selector.choose())
+            except NebulaClientError:
+                with self._cond:
+                    self._total -= 1
+                break
+            self._return_idle(session)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "total": self._total,
+                "idle": sum(len(dq) for dq in self._idle.values()),
+                "healthy_hosts": self.healthy_hosts(),
+                "hosts": {
+                    h: {
+                        "ewma_latency": round(s.ewma_latency, 6),
+                        "error_rate": round(s.error_rate, 3),
+                        "in_flight": s.in_flight,
+                        "ejected": s.ejected_until > time.monotonic(),
+                    }
+                    for h, s in self.host_states.items()
+                },
+            }
+
+
+@dataclass
+class _RunningStatement:
+    host: str
+    stream: Optional[str]
+    size: int
+    preview: str
+    start: float
+    reported: bool = False
+
+
+class SlowStatementWatchdog:
+    """
+    慢语句看门狗：客户端视角的慢查询日志
+
+    执行超过 threshold 秒仍未返回的语句由后台线程立即告警一次，
+    结束时若总耗时超过 threshold 再记录一次最终耗时。
+
+    Args:
+        threshold: 慢语句阈值（秒）
+        preview: 日志中保留的语句前缀长度
+    """
+
+    def __init__(self, threshold: float, preview: int = 200) -> None:
+        self.threshold = threshold
+        self._preview = preview
+        self._running: Dict[int, _RunningStatement] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=bind_invocation(self._loop), name="nebula-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def begin(self, host: str, query: str, stream: Optional[str]) -> int:
+        token = next(self._ids)
+        running = _RunningStatement(
+            host, stream, len(query), query[: self._preview], time.monotonic()
+        )
+        with self._lock:
+            self._running[token] = running
+        return token
+
+    def end(self, token: int) -> None:
+        with self._lock:
+            running = self._running.pop(token, None)
+        if running is None:
+            return
+        elapsed = time.monotonic() - running.start
+        if elapsed >= self.threshold:
+            if not running.reported:
+                get_registry().inc("slow_statements")
+            _SLOW_LOG.warn(
+                "慢语句完成: 耗时 %.3fs, stream=%s, host=%s, 大小 %d 字节: %s",
+                elapsed, running.stream, running.host, running.size, running.preview,
+            )
+
+    def _loop(self) -> None:
+        interval = max(min(self.threshold / 2, 5.0), 0.05)
+        while not self._stop.wait(interval):
+            self.check()
+
+    def check(self) -> None:
+        """对超过阈值且尚未告警的在途语句告警"""
+        now = time.monotonic()
+        with self._lock:
+            overdue = [
+                r for r in self._running.values()
+                if not r.reported and now - r.start >= self.threshold
+            ]
+            for running in overdue:
+                running.reported = True
+        for running in overdue:
+            get_registry().inc("slow_statements")
+            _SLOW_LOG.warn(
+                "慢语句仍在执行: 已耗时 %.3fs, stream=%s, host=%s, 大小 %d 字节: %s",
+                now - running.start, running.stream, running.host, running.size, running.preview,
+            )
+
+
 class NebulaClient:
     """
     封装 nebula5_python 的 NebulaClient
     参考: https://github.com/vesoft-inc/nebula-python/tree/v5.2.1/docs/1_started.md
+
+    内部使用 SessionPool 管理多个 host 上的会话，execute 在连接错误时
+    驱逐失效会话并在其它 host 上透明重试。
     """
-    
+
     def __init__(
         self,
         hosts: List[str],
         username: str,
         password: str,
         graph: Optional[str] = None,
+        *,
+        min_sessions: int = DEFAULT_MIN_SESSIONS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+        host_selection: str = DEFAULT_HOST_SELECTION,
+        max_retries: Optional[int] = None,
+        rate_limits: Optional[RateLimits] = None,
+        statement_timeout: Optional[float] = None,
+        slow_statement_threshold: float = DEFAULT_SLOW_STATEMENT_THRESHOLD,
+        client_factory: Optional[ClientFactory] = None,
     ) -> None:
         self._hosts = hosts
         self._username = username
         self._password = password
         self._graph = graph
-        self._client = None
+        self._min_sessions = min_sessions
+        self._max_sessions = max_sessions
+        self._keepalive_interval = keepalive_interval
+        self._host_selection = host_selection
+        # 默认每个 host 最多尝试一次
+        self._max_retries = len(hosts) if max_retries is None else max_retries
+        self._client_factory = client_factory
+        self._limiter = (
+            RateLimiter(rate_limits) if rate_limits is not None and rate_limits.enabled else None
+        )
+        self._statement_timeout = statement_timeout or None
+        self._watchdog = (
+            SlowStatementWatchdog(slow_statement_threshold) if slow_statement_threshold > 0 else None
+        )
+        self._supports_parameters: Optional[bool] = None
+        self._pool: Optional[SessionPool] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        # 会话语句（USE / SESSION SET ...），按类别保留最新一条，在每个会话上重放
+        self._session_statements: Dict[str, Tuple[int, str]] = {}
+        self._session_version = 0
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: ConnectionConfig,
+        graph: Optional[str] = None,
+        client_factory: Optional[ClientFactory] = None,
+    ) -> "NebulaClient":
+        """根据连接配置创建客户端"""
+        return cls(
+            hosts=cfg.hosts,
+            username=cfg.username,
+            password=cfg.password,
+            graph=graph,
+            min_sessions=cfg.min_sessions,
+            max_sessions=cfg.max_sessions,
+            keepalive_interval=cfg.keepalive_interval,
+            host_selection=cfg.host_selection,
+            rate_limits=rate_limits_from_config(cfg),
+            statement_timeout=cfg.statement_timeout,
+            slow_statement_threshold=cfg.slow_statement_threshold,
+            client_factory=client_factory,
+        )
+
+    @property
+    def pool(self) -> SessionPool:
+        if self._pool is None:
+            raise NebulaClientError("客户端未初始化，请先调用 connect()")
+        return self._pool
 
     def connect(self) -> None:
         """
-        连接到 Nebula Graph (Yueshu 5.2.0)
-        使用 context manager 方式创建客户端
+        连接到 Nebula Graph (Yueshu 5.2.0)，建立会话池
         """
-        client_cls = _import_client()
-        
-        # 创建同步客户端实例
-        # 参考: https://github.com/vesoft-inc/nebula-python/tree/v5.2.1/docs/1_started.md
-        self._client = client_cls(
+        pool = SessionPool(
             hosts=self._hosts,
             username=self._username,
             password=self._password,
+            client_factory=self._client_factory,
+            min_sessions=self._min_sessions,
+            max_sessions=self._max_sessions,
+            keepalive_interval=self._keepalive_interval,
+            host_selection=self._host_selection,
         )
-        
+        pool.start()
+        self._pool = pool
+        if self._watchdog is not None:
+            self._watchdog.start()
+
         # 注意: Yueshu 5.2.0 不需要执行 OPEN GRAPH 或 USE 命令
         # 直接在 execute() 中执行 INSERT 等 GQL 语句即可
         # graph 参数存储在 self._graph 中作为上下文记录
 
     def close(self) -> None:
         """关闭连接"""
-        if self._client is not None:
+        if self._watchdog is not None:
+            self._watchdog.stop()
+        if self._hedge_executor is not None:
+            # 被对冲的慢查询可能仍在执行，不等待其结束
+            self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+            self._hedge_executor = None
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=True)
+            self._batch_executor = None
+        if self._pool is not None:
             try:
-                self._client.close()
+                self._pool.close()
             except Exception as exc:  # noqa: BLE001
                 log(f"关闭客户端失败: {exc}")
+            self._pool = None
+
+    @contextmanager
+    def session(self) -> Iterator[PooledSession]:
+        """借出一个会话，供一个批次内连续执行多条语句"""
+        with self.pool.session() as session:
+            yield session
+
+    def supports_parameters(self) -> bool:
+        """
+        探测驱动与服务端是否支持查询参数（结果缓存）
 
-    def execute(self, query: str) -> Any:
+        驱动 execute 没有参数入口，或服务端执行探测语句失败时返回 False，
+        调用方应退回内联字面量的语句。
+        """
+        if self._supports_parameters is None:
+            supported = False
+            with self.pool.session() as session:
+                if _parameter_keyword(session.client) is not None:
+                    try:
+                        _check_result(session.execute(PARAMETER_PROBE_QUERY, params={"p": 1}))
+                        supported = True
+                    except Exception as exc:  # noqa: BLE001
+                        log(f"查询参数探测失败: {exc}")
+            self._supports_parameters = supported
+        return self._supports_parameters
+
+    def execute(
+        self,
+        query: str,
+        rows: int = 0,
+        stream: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
         """
         执行 GQL 查询
         返回 ResultSet 对象
+
+        rows 为该语句写入的记录数，用于按行数/秒限流；stream 用于慢语句日志；
+        params 为查询参数，仅在 supports_parameters() 为 True 时使用。
+        配置了 statement_timeout 时，超时的语句由驱动取消并抛出 NebulaTimeoutError，
+        不会在其它 host 上重试。
+
+        USE / SESSION SET 等会话语句会被记录下来，并在池中其它会话
+        （包括重连后的新会话）首次被使用前重放，保证会话状态一致。
         """
-        if self._client is None:
-            raise NebulaClientError("客户端未初始化，请先调用 connect()")
-        
-        result = self._client.execute(query)
-        
-        # 检查执行是否成功
-        if hasattr(result, "is_succeeded"):
-            # is_succeeded 是一个属性，不是方法
-            is_succeeded = result.is_succeeded
-            if callable(is_succeeded):
-                # 如果是方法，则调用
-                if not is_succeeded():
-                    error_msg = getattr(result, "error_msg", "执行失败")
-                    raise NebulaClientError(f"查询执行失败: {error_msg}")
-            else:
-                # 如果是属性，直接判断
-                if not is_succeeded:
-                    error_msg = getattr(result, "error_msg", "执行失败")
-                    raise NebulaClientError(f"查询执行失败: {error_msg}")
-        
+        key = session_statement_key(query)
+        if key is not None:
+            with self._session_lock:
+                self._session_version += 1
+                self._session_statements.pop(key, None)
+                self._session_statements[key] = (self._session_version, query)
+        return self._execute(query, rows=rows, stream=stream, params=params)
+
+    def session_statements(self) -> List[str]:
+        with self._session_lock:
+            return [statement for _, statement in self._session_statements.values()]
+
+    def _prepare_session(self, session: PooledSession, query: str) -> None:
+        """在会话上重放该会话尚未应用的会话语句（跳过即将执行的 query 本身）"""
+        with self._session_lock:
+            version = self._session_version
+            statements = list(self._session_statements.values())
+        if session.version == version:
+            return
+        for statement_version, statement in statements:
+            if statement_version > session.version and statement is not query:
+                _check_result(session.execute(statement))
+        session.version = version
+
+    def _execute(
+        self,
+        query: str,
+        exclude: Optional[List[str]] = None,
+        used_hosts: Optional[List[str]] = None,
+        rows: int = 0,
+        stream: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        pool = self.pool
+        metrics = get_registry()
+        limiter = self._limiter
+        watchdog = self._watchdog
+        attempt = 0
+        with limiter.statement(rows) if limiter is not None else _NULL_LIMIT:
+            while True:
+                session = pool.checkout(exclude=exclude)
+                if used_hosts is not None:
+                    used_hosts.append(session.host)
+                with limiter.host(session.host) if limiter is not None else _NULL_LIMIT:
+                    start = time.perf_counter()
+                    token = watchdog.begin(session.host, query, stream) if watchdog else None
+                    try:
+                        self._prepare_session(session, query)
+                        result = session.execute(query, self._statement_timeout, params)
+                    except Exception as exc:  # noqa: BLE001
+                        self._observe(session.host, start, time.perf_counter(), query)
+                        if token is not None:
+                            watchdog.end(token)
+                        if self._statement_timeout and is_timeout_error(exc):
+                            pool.selector.record(session.host, time.perf_counter() - start)
+                            pool.checkin(session)
+                            metrics.inc("timeouts")
+                            raise NebulaTimeoutError(
+                                f"查询超时 ({session.host}, {self._statement_timeout}s): {exc}"
+                            ) from exc
+                        connection_error = is_connection_error(exc)
+                        pool.selector.record(session.host, None, error=connection_error)
+                        pool.checkin(session, broken=connection_error)
+                        if connection_error and attempt < self._max_retries:
+                            attempt += 1
+                            metrics.inc_retry(session.host)
+                            log(f"会话 {session.host} 连接错误，重试 ({attempt}/{self._max_retries}): {exc}")
+                            continue
+                        raise NebulaClientError(f"查询执行失败 ({session.host}): {exc}") from exc
+                    end = time.perf_counter()
+                    if token is not None:
+                        watchdog.end(token)
+                self._observe(session.host, start, end, query)
+                pool.selector.record(session.host, end - start)
+                pool.checkin(session)
+                break
+
+        _check_result(result)
         return result
 
+    def execute_many(
+        self,
+        queries: Sequence[str],
+        rows: int = 0,
+        stream: Optional[str] = None,
+        params: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        keys: Optional[Sequence[Optional[Hashable]]] = None,
+    ) -> List[StatementResult]:
+        """
+        批量执行多条写入语句，按输入顺序返回每条语句的结果或错误
+
+        Yueshu 的请求只返回一个结果集，无法在一个请求中拿到多条语句各自的
+        结果，因此语句被分发到池中多个会话上并发执行，不逐条等待应答。并发
+        执行的语句之间没有先后，语句按输入顺序切分为若干轮，一轮全部完成后
+        才发出下一轮，轮内的语句相互独立：
+        - USE / SESSION SET 等会话语句单独作为一轮
+        - 本轮已有点写入语句时，边写入语句（MATCH 端点后 INSERT）开始新的一轮，
+          保证端点先写入
+        - keys 与 queries 一一对应（可选），标识语句写入的点或边；键相同的语句
+          不在同一轮中，保证同一元素后写入的值生效
+
+        rows 为每条语句写入的记录数（用于限流），params 为与 queries 一一对应的
+        查询参数（可选）。
+        """
+        results = [StatementResult(query) for query in queries]
+        bindings = list(params) if params is not None else [None] * len(queries)
+        batch: List[int] = []
+        batch_keys: Set[Hashable] = set()
+        has_vertex = False
+        with get_tracer().span("execute_many", cat="client", size=len(queries)):
+            for idx, query in enumerate(queries):
+                if session_statement_key(query) is not None:
+                    self._run_batch(batch, results, bindings, rows, stream)
+                    batch, batch_keys, has_vertex = [], set(), False
+                    self._run_batch([idx], results, bindings, 0, stream)
+                    continue
+                key = keys[idx] if keys is not None else None
+                edge = statement_phase(query) == PHASE_EDGE
+                if (edge and has_vertex) or (key is not None and key in batch_keys):
+                    self._run_batch(batch, results, bindings, rows, stream)
+                    batch, batch_keys, has_vertex = [], set(), False
+                batch.append(idx)
+                if key is not None:
+                    batch_keys.add(key)
+                has_vertex = has_vertex or not edge
+            self._run_batch(batch, results, bindings, rows, stream)
+        return results
+
+    def _run_batch(
+        self,
+        indexes: List[int],
+        results: List[StatementResult],
+        bindings: List[Optional[Dict[str, Any]]],
+        rows: int,
+        stream: Optional[str],
+    ) -> None:
+        if not indexes:
+            return
+        if len(indexes) == 1 or self._max_sessions <= 1:
+            for idx in indexes:
+                item = results[idx]
+                try:
+                    item.result = self.execute(
+                        item.query, rows=rows, stream=stream, params=bindings[idx]
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    item.error = exc
+            return
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(
+                max_workers=self._max_sessions, thread_name_prefix="nebula-batch",
+                initializer=adopt_invocation, initargs=(current_invocation(),),
+            )
+        submit = self._batch_executor.submit
+        futures = [
+            (
+                idx,
+                submit(
+                    self._execute, results[idx].query,
+                    rows=rows, stream=stream, params=bindings[idx],
+                ),
+            )
+            for idx in indexes
+        ]
+        for idx, future in futures:
+            try:
+                results[idx].result = future.result()
+            except Exception as exc:  # noqa: BLE001
+                results[idx].error = exc
+
+    def execute_iter(
+        self, query: str, page_size: int = DEFAULT_PAGE_SIZE, stream: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        逐页返回查询结果的行（as_primitive_by_row 的 dict），每页最多 page_size 行
+
+        nebula5_python 5.2.1 的客户端只提供一元 Execute，没有流式读取的入口，因此以
+        ORDER BY 结尾的查询以 SKIP/LIMIT 分页执行后续查询（见 QueryPager），峰值内存为一页
+        结果而不是整个结果集。没有 ORDER BY 的查询以及 DESC / SHOW 等语句只执行一次，
+        结果逐页转换。
+        """
+        pager = QueryPager(query, page_size)
+        while True:
+            page_query = pager.next_query()
+            if page_query is None:
+                return
+            rows = 0
+            for page in result_pages(self.execute(page_query, stream=stream), page_size):
+                rows += len(page)
+                yield page
+            pager.advance(rows)
+
+    def execute_hedged(self, query: str, delay: float, stream: Optional[str] = None) -> Any:
+        """
+        对冲执行幂等的读查询
+
+        先在一个 host 上执行；若 delay 秒内未返回，则在另一个 host 上再发起
+        一次同样的查询，采用先成功返回的结果，另一方的结果被忽略。
+        """
+        if len(self._hosts) < 2:
+            return self._execute(query, stream=stream)
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=max(self._max_sessions, 2), thread_name_prefix="nebula-hedge",
+                initializer=adopt_invocation, initargs=(current_invocation(),),
+            )
+        metrics = get_registry()
+        primary_hosts: List[str] = []
+        primary = self._hedge_executor.submit(
+            self._execute, query, None, primary_hosts, stream=stream
+        )
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        metrics.inc("hedges")
+        backup = self._hedge_executor.submit(
+            self._execute, query, list(primary_hosts), stream=stream
+        )
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if exc is not None:
+                    error = exc
+                    continue
+                for other in pending:
+                    other.cancel()
+                if future is backup:
+                    metrics.inc("hedge_wins")
+                return future.result()
+        assert error is not None
+        raise error
+
+    @staticmethod
+    def _observe(host: str, start: float, end: float, query: str) -> None:
+        get_registry().observe_execute(host, end - start)
+        get_tracer().add_complete(
+            "execute", start, end, cat="client", args={"host": host, "size": len(query)},
+        )
+
     @staticmethod
     def result_to_payload(result: Any) -> str:
         """
@@ -110,3 +1249,10 @@ class NebulaClient:
             except Exception:  # noqa: BLE001
                 pass
         return str(result)
+
+    @staticmethod
+    def rows_to_payload(rows: List[Dict[str, Any]]) -> str:
+        """将 execute_iter 的一页行转换为与 result_to_payload 相同的按列格式"""
+        if not rows:
+            return str({})
+        return str({col: [row.get(col) for row in rows] for col in rows[0]})
@@ -0,0 +1,229 @@
+"""
+Profiling - CLI 命令的可选性能剖析
+
+支持三种模式（可组合）：
+- cprofile: 使用 cProfile 记录整个命令，输出 .prof 与按累计耗时排序的 .txt
+- sample: 统计采样主线程调用栈，输出 flamegraph/speedscope 可读的 .folded
+- tracemalloc: 周期性记录内存分配 top-N 快照，输出 .tracemalloc.txt
+
+通过环境变量或 CLI 参数开启，无需修改代码即可在 Airbyte 容器中采集。
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, Iterable, List, Optional, Set
+
+from .common import log
+
+PROFILE_MODES = ("cprofile", "sample", "tracemalloc")
+
+DEFAULT_PROFILE_DIR = "/tmp/yueshu-profile"
+DEFAULT_SAMPLE_INTERVAL = 0.01  # 秒
+DEFAULT_TRACEMALLOC_INTERVAL = 30.0  # 秒
+DEFAULT_TRACEMALLOC_TOP = 20
+
+
+def parse_modes(raw: Optional[str]) -> Set[str]:
+    """解析 "cprofile,tracemalloc" 形式的模式列表"""
+    if not raw:
+        return set()
+    modes = {item.strip().lower() for item in raw.split(",") if item.strip()}
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"未知的 profile 模式: {', '.join(sorted(unknown))}")
+    return modes
+
+
+class _StackSampler:
+    """后台线程定时采样目标线程的调用栈，按折叠栈计数"""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            names: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items(), key=lambda kv: -kv[1]):
+                f.write(f"{stack} {count}\n")
+
+
+class _TracemallocReporter:
+    """周期性输出内存分配 top-N 快照"""
+
+    def __init__(self, path: str, interval: float, top_n: int) -> None:
+        self._path = path
+        self._interval = interval
+        self._top_n = top_n
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-tracemalloc", daemon=True)
+        self._started = time.monotonic()
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._snapshot("final")
+        tracemalloc.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._snapshot("periodic")
+
+    def _snapshot(self, kind: str) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.statistics("lineno")[: self._top_n]
+        elapsed = time.monotonic() - self._started
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(
+                f"=== {kind} t={elapsed:.1f}s current={current / 1024:.1f}KiB "
+                f"peak={peak / 1024:.1f}KiB ===\n"
+            )
+            for stat in stats:
+                f.write(f"{stat}\n")
+            f.write("\n")
+
+
+class Profiler:
+    """
+    组合多种剖析模式，start/stop 包裹整个命令
+
+    Args:
+        modes: 开启的模式集合（cprofile / sample / tracemalloc）
+        output_dir: 结果输出目录
+        label: 文件名前缀，如 "destination-write"
+    """
+
+    def __init__(
+        self,
+        modes: Iterable[str],
+        output_dir: str = DEFAULT_PROFILE_DIR,
+        label: str = "yueshu",
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+        tracemalloc_interval: float = DEFAULT_TRACEMALLOC_INTERVAL,
+        tracemalloc_top: int = DEFAULT_TRACEMALLOC_TOP,
+    ) -> None:
+        self.modes = set(modes)
+        self.output_dir = output_dir
+        self._prefix = os.path.join(
+            output_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        )
+        self._sample_interval = sample_interval
+        self._tracemalloc_interval = tracemalloc_interval
+        self._tracemalloc_top = tracemalloc_top
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._tracemalloc: Optional[_TracemallocReporter] = None
+        self.outputs: List[str] = []
+
+    def start(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        if "tracemalloc" in self.modes:
+            self._tracemalloc = _TracemallocReporter(
+                f"{self._prefix}.tracemalloc.txt",
+                self._tracemalloc_interval,
+                self._tracemalloc_top,
+            )
+            self._tracemalloc.start()
+        if "sample" in self.modes:
+            self._sampler = _StackSampler(threading.get_ident(), self._sample_interval)
+            self._sampler.start()
+        if "cprofile" in self.modes:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            prof_path = f"{self._prefix}.prof"
+            self._cprofile.dump_stats(prof_path)
+            text = io.StringIO()
+            pstats.Stats(self._cprofile, stream=text).sort_stats("cumulative").print_stats(50)
+            with open(f"{self._prefix}.txt", "w", encoding="utf-8") as f:
+                f.write(text.getvalue())
+            self.outputs.extend([prof_path, f"{self._prefix}.txt"])
+            self._cprofile = None
+        if self._sampler is not None:
+            self._sampler.stop()
+            folded_path = f"{self._prefix}.folded"
+            self._sampler.dump(folded_path)
+            self.outputs.append(folded_path)
+            self._sampler = None
+        if self._tracemalloc is not None:
+            self._tracemalloc.stop()
+            self.outputs.append(f"{self._prefix}.tracemalloc.txt")
+            self._tracemalloc = None
+        for path in self.outputs:
+            log(f"profile 结果已写入: {path}")
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def profiler_from_env(
+    label: str,
+    modes: Optional[str] = None,
+    output_dir: Optional[str] = None,
+) -> Optional[Profiler]:
+    """
+    根据 CLI 参数与环境变量创建 Profiler，未开启时返回 None：
+    - YUESHU_PROFILE: 模式列表，如 "cprofile,tracemalloc"
+    - YUESHU_PROFILE_DIR: 输出目录（默认 /tmp/yueshu-profile）
+    - YUESHU_PROFILE_SAMPLE_INTERVAL: sample 模式采样间隔（秒）
+    - YUESHU_TRACEMALLOC_INTERVAL: tracemalloc 快照间隔（秒）
+    - YUESHU_TRACEMALLOC_TOP: 每次快照输出的条目数
+    """
+    selected = parse_modes(modes if modes is not None else os.environ.get("YUESHU_PROFILE"))
+    if not selected:
+        return None
+    return Profiler(
+        selected,
+        output_dir=output_dir or os.environ.get("YUESHU_PROFILE_DIR") or DEFAULT_PROFILE_DIR,
+        label=label,
+        sample_interval=float(
+            os.environ.get("YUESHU_PROFILE_SAMPLE_INTERVAL", DEFAULT_SAMPLE_INTERVAL)
+        ),
+        tracemalloc_interval=float(
+            os.environ.get("YUESHU_TRACEMALLOC_INTERVAL", DEFAULT_TRACEMALLOC_INTERVAL)
+        ),
+        tracemalloc_top=int(os.environ.get("YUESHU_TRACEMALLOC_TOP", DEFAULT_TRACEMALLOC_TOP)),
+    )
@@ -0,0 +1,173 @@
+"""
+RateLimiter - 客户端限流，避免全速回填挤占同一集群上的在线流量
+
+- TokenBucket: 预约式令牌桶，每次请求按需预约令牌并只等待自己的时间片，
+  请求被均匀地摊开，而不是攒满一批后再整体 sleep
+- RateLimiter: 组合全局与按 host 的语句数/秒、行数/秒以及在途语句数限制
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+from .metrics import get_registry
+
+# 令牌桶默认允许的突发量（秒 × 速率），越小越平滑
+DEFAULT_BURST_SECONDS = 0.1
+
+
+class TokenBucket:
+    """
+    预约式令牌桶
+
+    Args:
+        rate: 每秒补充的令牌数
+        burst: 桶容量（允许的突发量），默认 rate × 0.1，至少为 1
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate * DEFAULT_BURST_SECONDS)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1.0) -> float:
+        """预约 n 个令牌，返回需要等待的秒数（令牌可以透支，由后续请求排队偿还）"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, n: float = 1.0) -> float:
+        """阻塞直到获得 n 个令牌，返回等待的秒数"""
+        wait = self.reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+@dataclass
+class RateLimits:
+    """限流配置，0 表示不限制"""
+    statements_per_second: float = 0.0
+    rows_per_second: float = 0.0
+    host_statements_per_second: float = 0.0
+    max_in_flight_per_host: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            (
+                self.statements_per_second,
+                self.rows_per_second,
+                self.host_statements_per_second,
+                self.max_in_flight_per_host,
+            )
+        )
+
+
+class RateLimiter:
+    """
+    全局与按 host 的限流
+
+    语句在借出会话前通过全局限制（语句数/秒、行数/秒），选定 host 后再通过
+    该 host 的限制（语句数/秒、在途数）。全局在途数由会话池大小（sync）或
+    max_in_flight（asyncio）约束。
+    """
+
+    def __init__(self, limits: RateLimits) -> None:
+        self.limits = limits
+        self._statements = (
+            TokenBucket(limits.statements_per_second) if limits.statements_per_second > 0 else None
+        )
+        self._rows = TokenBucket(limits.rows_per_second) if limits.rows_per_second > 0 else None
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._host_in_flight: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, rows: int = 0) -> float:
+        """预约全局语句与行令牌，返回需要等待的秒数（供 asyncio 调用方自行 sleep）"""
+        wait = 0.0
+        if self._statements is not None:
+            wait = max(wait, self._statements.reserve(1))
+        if self._rows is not None and rows > 0:
+            wait = max(wait, self._rows.reserve(rows))
+        return wait
+
+    def reserve_host(self, host: str) -> float:
+        if self.limits.host_statements_per_second <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._host_buckets.get(host)
+            if bucket is None:
+                bucket = self._host_buckets[host] = TokenBucket(
+                    self.limits.host_statements_per_second
+                )
+        return bucket.reserve(1)
+
+    def _host_semaphore(self, host: str) -> Optional[threading.BoundedSemaphore]:
+        if self.limits.max_in_flight_per_host <= 0:
+            return None
+        with self._lock:
+            sem = self._host_in_flight.get(host)
+            if sem is None:
+                sem = self._host_in_flight[host] = threading.BoundedSemaphore(
+                    self.limits.max_in_flight_per_host
+                )
+        return sem
+
+    @contextmanager
+    def statement(self, rows: int = 0) -> Iterator[None]:
+        """全局限制：按语句数与行数速率等待"""
+        start = time.perf_counter()
+        self._sleep(self.reserve(rows))
+        self._record(start)
+        yield
+
+    @contextmanager
+    def host(self, host: str) -> Iterator[None]:
+        """按 host 的限制"""
+        start = time.perf_counter()
+        sem = self._host_semaphore(host)
+        if sem is not None:
+            sem.acquire()
+        try:
+            self._sleep(self.reserve_host(host))
+            self._record(start)
+            yield
+        finally:
+            if sem is not None:
+                sem.release()
+
+    @staticmethod
+    def _sleep(wait: float) -> None:
+        if wait > 0:
+            time.sleep(wait)
+
+    @staticmethod
+    def _record(start: float) -> None:
+        record_wait(time.perf_counter() - start)
+
+
+def record_wait(waited: float) -> None:
+    """将超过 1ms 的限流等待计入 metrics"""
+    if waited > 0.001:
+        metrics = get_registry()
+        metrics.inc("throttled")
+        metrics.add_stage_time("throttle", waited)
@@ -9,8 +9,10 @@ Schema Reader - 从 NebulaGraph 读取 graph schema
 """
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from .common import log
 
@@ -143,6 +145,64 @@ def read_graph_schema(client: Any, graph_name: str) -> GraphSchema:
     return schema
 
 
+class SchemaCache:
+    """
+    已解析 GraphSchema 的缓存，供长驻进程（守护进程）在多次写入之间复用
+
+    按 (hosts, username, graph) 缓存，超过 ttl 秒后重新读取；
+    空 schema（读取失败或图不存在）不缓存。
+    """
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[Any, ...], Tuple[float, GraphSchema]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        hosts: List[str],
+        username: str,
+        graph: str,
+        loader: Callable[[], GraphSchema],
+    ) -> GraphSchema:
+        key = (tuple(hosts), username, graph)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        schema = loader()
+        if schema.vertices or schema.edges:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), schema)
+        return schema
+
+    def invalidate(self, graph: Optional[str] = None) -> None:
+        """清除指定图（默认全部）的缓存"""
+        with self._lock:
+            if graph is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[2] == graph]:
+                    del self._entries[key]
+
+
+def _iter_rows(client: Any, query: str) -> Iterator[Dict[str, Any]]:
+    """逐行返回查询结果；客户端提供 execute_iter（NebulaClient）时逐页转换"""
+    execute_iter = getattr(client, "execute_iter", None)
+    if execute_iter is not None:
+        for page in execute_iter(query):
+            yield from page
+        return
+    result = client.execute(query)
+    if hasattr(result, 'as_primitive_by_row'):
+        yield from result.as_primitive_by_row()
+
+
 def _get_graph_type(client: Any, graph_name: str) -> Optional[str]:
     """
     从 DESC GRAPH 获取 graph 的 type
@@ -151,11 +211,9 @@ def _get_graph_type(client: Any, graph_name: str) -> Optional[str]:
         graph type 名称，如 'blockchain'
     """
     try:
-        result = client.execute(f"DESC GRAPH {graph_name}")
-        if hasattr(result, 'as_primitive_by_row'):
-            for row_data in result.as_primitive_by_row():
-                if isinstance(row_data, dict):
-                    return row_data.get('graph_type_name')
+        for row_data in _iter_rows(client, f"DESC GRAPH {graph_name}"):
+            if isinstance(row_data, dict):
+                return row_data.get('graph_type_name')
         return None
     except Exception as e:
         log(f"获取 graph type 失败: {e}")
@@ -177,17 +235,15 @@ def _read_graph_type_schema(client: Any, graph_type: str) -> List[tuple]:
     """
     result = []
     try:
-        query_result = client.execute(f"DESC GRAPH TYPE {graph_type}")
-        if hasattr(query_result, 'as_primitive_by_row'):
-            for row_data in query_result.as_primitive_by_row():
-                if isinstance(row_data, dict):
-                    entity_type = row_data.get('entity_type', '')
-                    type_name = row_data.get('type_name', '')
-                    labels = row_data.get('labels', [])
-                    properties = row_data.get('properties', [])
-                    primary_or_multi_key = row_data.get('primary_key/multiedge_key', [])
-                    
-                    result.append((entity_type, type_name, labels, properties, primary_or_multi_key))
+        for row_data in _iter_rows(client, f"DESC GRAPH TYPE {graph_type}"):
+            if isinstance(row_data, dict):
+                entity_type = row_data.get('entity_type', '')
+                type_name = row_data.get('type_name', '')
+                labels = row_data.get('labels', [])
+                properties = row_data.get('properties', [])
+                primary_or_multi_key = row_data.get('primary_key/multiedge_key', [])
+                
+                result.append((entity_type, type_name, labels, properties, primary_or_multi_key))
         return result
     except Exception as e:
         log(f"读取 graph type schema 失败: {e}")
@@ -0,0 +1,359 @@
+"""
+写入语句的导出（dry run）与回放（apply 命令）
+
+destination 配置了 export_dir 时，write 不执行写入语句，而是把最终的语句（写入模式与
+TABLE 前缀已编译进模板，始终为字面量语句）写入导出目录下的分片脚本文件，并在写入
+结束后生成 manifest.json，记录每个 stream 与每个分片的语句数。语句可以在离集群较远的
+批处理机器上生成，再在靠近集群的机器上用 apply 命令回放：
+
+    yueshu-airbyte --connector-type destination apply --config config.json --dir export/
+
+目录结构：
+- 分片文件 "<阶段>-<stream 序号>-<stream>-<分片号>.gql[.gz]"，每行一条语句，格式为
+  "<键哈希>\\t<语句>"；语句中的换行只会出现在字符串字面量中，写为 \\n 转义
+- manifest.json：setup 语句（USE / setup_queries，apply 开始时执行一次）、各 stream 与
+  各分片的语句数；只在导出成功结束时写入
+- applied.txt：apply 的进度，每行 "<分片文件>\\t<已完成的语句数>"，中断后重新 apply 时
+  从该位置继续
+
+点写入语句属于阶段 0，边写入语句（MATCH 端点后 INSERT）属于阶段 1；apply 按阶段依次
+执行，同一阶段内的分片由多个线程并行执行，共享一个会话池。语句按写入的点或边（key）
+的稳定哈希选择分片，同一元素的多次写入落在同一分片中并按导出顺序执行，与 destination
+直接写入时的顺序保证相同。
+
+进度在每批语句执行成功后记录；批次中有语句失败时，重新 apply 会重新执行整个批次，
+普通 INSERT 可能因此报主键冲突，建议使用 insert or ignore / insert or replace 写入模式。
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .common import get_logger, log, to_destination_config
+from .metrics import MetricsRegistry, encoded_size, reset_registry
+from .nebula_client import ClientFactory, NebulaClient, session_statement_key, statement_phase
+
+MANIFEST = "manifest.json"
+APPLIED = "applied.txt"
+MANIFEST_VERSION = 2
+# 版本 1 的分片文件每行只有语句，没有键哈希，分片轮流选择
+_SUPPORTED_VERSIONS = (1, 2)
+_NO_KEY = "-"
+DEFAULT_SHARDS = 4
+
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+_LOG = get_logger("apply")
+
+
+def key_hash(key: Optional[Hashable]) -> Optional[int]:
+    """key 的稳定哈希（跨进程一致，不受 PYTHONHASHSEED 影响），key 为 None 时返回 None"""
+    if key is None:
+        return None
+    return zlib.crc32(repr(key).encode("utf-8"))
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(path, mode, encoding="utf-8")
+
+
+@dataclass
+class _Shard:
+    file: str
+    stream: str
+    phase: int
+    handle: IO[str]
+    statements: int = 0
+
+
+class ScriptExporter:
+    """
+    接口与 destination 的 _WriteBuffer 相同（add / flush）：语句按 key 的哈希写入 stream 的
+    shards 个分片文件之一（没有 key 时轮流选择），不执行；finish 写入 manifest
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        metrics: MetricsRegistry,
+        shards: int = DEFAULT_SHARDS,
+        compress: bool = True,
+    ) -> None:
+        if os.path.exists(os.path.join(directory, MANIFEST)):
+            raise ValueError(f"导出目录已包含 {MANIFEST}，请使用新的目录: {directory}")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._metrics = metrics
+        self._shards = max(int(shards), 1)
+        self._compress = compress
+        self._setup: List[str] = []
+        self._streams: Dict[str, Dict[str, int]] = {}
+        self._files: Dict[tuple, _Shard] = {}
+
+    def add_setup(self, statement: str, stream: Optional[str] = None) -> None:
+        """记录 apply 开始时执行的语句；会话语句在整个会话池上生效，同类只能有一条"""
+        if statement in self._setup:
+            return
+        key = session_statement_key(statement)
+        if key is not None and any(session_statement_key(s) == key for s in self._setup):
+            raise ValueError(f"导出模式不支持在 stream 之间切换会话状态: {statement} (stream: {stream})")
+        self._setup.append(statement)
+
+    def add(
+        self,
+        stream: str,
+        gql: str,
+        params: Optional[Dict[str, Any]],
+        nbytes: int,
+        key: Optional[Hashable] = None,
+    ) -> None:
+        """key 相同的语句写入同一分片，apply 时按写入顺序执行"""
+        if params is not None:
+            raise ValueError("导出模式只支持字面量语句")
+        entry = self._streams.get(stream)
+        if entry is None:
+            entry = self._streams[stream] = {
+                "index": len(self._streams), "phase": statement_phase(gql), "statements": 0, "bytes": 0,
+            }
+        digest = key_hash(key)
+        index = entry["statements"] if digest is None else digest
+        shard = self._shard(stream, entry, index % self._shards)
+        shard.handle.write(_NO_KEY if digest is None else f"{digest:08x}")
+        shard.handle.write("\t")
+        shard.handle.write(gql.replace("\r", "\\r").replace("\n", "\\n"))
+        shard.handle.write("\n")
+        shard.statements += 1
+        entry["statements"] += 1
+        entry["bytes"] += nbytes
+        self._metrics.add_records(stream, 1, nbytes)
+
+    def flush(self) -> None:
+        """语句写入文件即视为完成，只报告进度"""
+        self._metrics.maybe_report()
+
+    def _shard(self, stream: str, entry: Dict[str, int], index: int) -> _Shard:
+        shard = self._files.get((stream, index))
+        if shard is None:
+            name = _UNSAFE_RE.sub("_", stream)
+            file = f"{entry['phase']}-{entry['index']:03d}-{name}-{index:04d}.gql"
+            if self._compress:
+                file += ".gz"
+            handle = _open(os.path.join(self._directory, file), "w")
+            shard = self._files[(stream, index)] = _Shard(file, stream, entry["phase"], handle)
+        return shard
+
+    def close(self) -> None:
+        for shard in self._files.values():
+            if not shard.handle.closed:
+                shard.handle.close()
+
+    def finish(self) -> Dict[str, Any]:
+        """关闭分片文件并写入 manifest，返回 manifest 内容"""
+        self.close()
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "compress": self._compress,
+            "sharding": "key",
+            "setup": list(self._setup),
+            "streams": {
+                name: {"phase": e["phase"], "statements": e["statements"], "bytes": e["bytes"]}
+                for name, e in self._streams.items()
+            },
+            "shards": [
+                {"file": s.file, "stream": s.stream, "phase": s.phase, "statements": s.statements}
+                for s in sorted(self._files.values(), key=lambda s: s.file)
+            ],
+            "statements": sum(e["statements"] for e in self._streams.values()),
+        }
+        path = os.path.join(self._directory, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+        log(f"已导出 {manifest['statements']} 条语句到 {len(manifest['shards'])} 个分片: {self._directory}")
+        return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        raise ValueError(f"{directory} 中没有 {MANIFEST}，导出未完成或目录错误")
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") not in _SUPPORTED_VERSIONS:
+        raise ValueError(f"不支持的 manifest 版本: {manifest.get('version')}")
+    return manifest
+
+
+def iter_entries(path: str, keyed: bool = True) -> Iterator[Tuple[Optional[str], str]]:
+    """逐条读取分片文件中的 (键哈希, 语句)；keyed 为 False 时是版本 1 的文件，键哈希为 None"""
+    with _open(path, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            if not keyed:
+                yield None, line
+                continue
+            digest, statement = line.split("\t", 1)
+            yield (None if digest == _NO_KEY else digest), statement
+
+
+def iter_statements(path: str, keyed: bool = True) -> Iterator[str]:
+    """逐条读取分片文件中的语句"""
+    for _, statement in iter_entries(path, keyed):
+        yield statement
+
+
+def _read_applied(directory: str) -> Dict[str, Optional[int]]:
+    """各分片已完成的语句数；旧格式只记录分片文件名，表示整个分片已完成（None）"""
+    path = os.path.join(directory, APPLIED)
+    applied: Dict[str, Optional[int]] = {}
+    if not os.path.exists(path):
+        return applied
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            file, _, offset = line.strip().partition("\t")
+            if file:
+                applied[file] = int(offset) if offset else None
+    return applied
+
+
+def _apply_shard(
+    client: NebulaClient,
+    path: str,
+    stream: str,
+    batch_size: int,
+    metrics: MetricsRegistry,
+    keyed: bool = True,
+    start: int = 0,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    从第 start 条语句开始按 batch_size 条一批执行分片中的语句，返回执行的语句数；
+    每批成功后以已完成的语句数调用 progress，有语句失败时在该批执行完后抛出第一个错误
+    """
+    count = 0
+    batch: List[str] = []
+    keys: List[Optional[str]] = []
+
+    def run() -> None:
+        results = client.execute_many(batch, rows=1, stream=stream, keys=keys)
+        errors = [r.error for r in results if not r.ok]
+        for result in results:
+            if result.ok:
+                metrics.add_records(stream, 1, encoded_size(result.query))
+        metrics.maybe_report()
+        if errors:
+            log(f"分片 {os.path.basename(path)} 中 {len(errors)}/{len(batch)} 条语句失败")
+            raise errors[0]
+        if progress is not None:
+            progress(start + count + len(batch))
+
+    for index, (digest, statement) in enumerate(iter_entries(path, keyed)):
+        if index < start:
+            continue
+        batch.append(statement)
+        keys.append(digest)
+        if len(batch) >= batch_size:
+            run()
+            count += len(batch)
+            batch, keys = [], []
+    if batch:
+        run()
+        count += len(batch)
+    return count
+
+
+def apply(
+    config_data: Dict[str, Any],
+    directory: str,
+    workers: Optional[int] = None,
+    client_factory: Optional[ClientFactory] = None,
+) -> Dict[str, Any]:
+    """
+    执行导出目录中的分片，返回汇总报告
+    workers 为并行执行的分片数（默认 max_sessions），每个分片按 batch_size 批量执行；
+    applied.txt 中记录的已完成语句跳过
+    """
+    cfg = to_destination_config(config_data)
+    manifest = read_manifest(directory)
+    applied = _read_applied(directory)
+    keyed = manifest["version"] >= 2
+    workers = max(int(workers or cfg.max_sessions), 1)
+    metrics = reset_registry("apply")
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
+    client.connect()
+    start = time.monotonic()
+    statements = skipped = 0
+    try:
+        for statement in manifest["setup"]:
+            client.execute(statement)
+        with open(os.path.join(directory, APPLIED), "a", encoding="utf-8") as progress, \
+                ThreadPoolExecutor(workers, thread_name_prefix="apply") as executor:
+            progress_lock = threading.Lock()
+
+            def recorder(file: str) -> Callable[[int], None]:
+                def record(offset: int) -> None:
+                    with progress_lock:
+                        progress.write(f"{file}\t{offset}\n")
+                        progress.flush()
+                return record
+
+            def done_count(shard: Dict[str, Any]) -> int:
+                if shard["file"] not in applied:
+                    return 0
+                offset = applied[shard["file"]]
+                return shard["statements"] if offset is None else offset
+
+            for phase in sorted({s["phase"] for s in manifest["shards"]}):
+                shards = [s for s in manifest["shards"] if s["phase"] == phase]
+                pending = [s for s in shards if done_count(s) < s["statements"]]
+                skipped += len(shards) - len(pending)
+                futures = {
+                    executor.submit(
+                        _apply_shard, client, os.path.join(directory, s["file"]),
+                        s["stream"], cfg.batch_size, metrics,
+                        keyed, done_count(s), recorder(s["file"]),
+                    ): s
+                    for s in pending
+                }
+                error: Optional[BaseException] = None
+                while futures and error is None:
+                    done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        futures.pop(future)
+                        if future.exception() is not None:
+                            error = error or future.exception()
+                            continue
+                        statements += future.result()
+                if error is not None:
+                    for future in futures:
+                        future.cancel()
+                    raise error
+    finally:
+        client.close()
+        metrics.report_final()
+
+    elapsed = time.monotonic() - start
+    summary = {
+        "shards": len(manifest["shards"]),
+        "skipped_shards": skipped,
+        "statements": statements,
+        "elapsed_seconds": round(elapsed, 3),
+        "statements_per_second": round(statements / max(elapsed, 1e-9), 1),
+    }
+    _LOG.info(
+        "回放完成: %d 个分片（跳过已完成 %d 个），%d 条语句（%.1f/s）",
+        summary["shards"], skipped, statements, summary["statements_per_second"],
+    )
+    return summary
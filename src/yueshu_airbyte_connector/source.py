@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import itertools
 import time
-from typing import Any, Dict, List
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 from .common import (
     DEFAULT_CHECK_QUERY,
@@ -10,34 +12,16 @@ from .common import (
     read_catalog_from_env,
     to_source_config,
 )
-from .nebula_client import NebulaClient, NebulaClientError
-
-
-def spec() -> Dict[str, Any]:
-    return {
-        "type": "SPEC",
-        "spec": {
-            "documentationUrl": "",
-            "connectionSpecification": {
-                "type": "object",
-                "required": ["hosts", "username", "password"],
-                "properties": {
-                    "hosts": {"type": "array", "items": {"type": "string"}},
-                    "username": {"type": "string", "default": "root"},
-                    "password": {"type": "string", "airbyte_secret": True, "default": "root"},
-                },
-            },
-        },
-    }
+from .metrics import encoded_size, get_registry, reset_registry
+from .nebula_client import ClientFactory, NebulaClient, NebulaClientError
+from .spec import source_spec as spec  # noqa: F401  保持 source.spec() 可用
+from .tracing import get_tracer
 
 
-def check(config_data: Dict[str, Any]) -> None:
+def check(config_data: Dict[str, Any], client_factory: Optional[ClientFactory] = None) -> None:
+    """执行检查查询并输出 CONNECTION_STATUS；client_factory 可替换底层客户端（见 daemon）"""
     cfg = to_source_config(config_data)
-    client = NebulaClient(
-        hosts=cfg.hosts,
-        username=cfg.username,
-        password=cfg.password,
-    )
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
     try:
         client.connect()
         client.execute(DEFAULT_CHECK_QUERY)
@@ -58,7 +42,8 @@ def check(config_data: Dict[str, Any]) -> None:
         client.close()
 
 
-def discover(config_data: Dict[str, Any]) -> None:
+def discover(config_data: Dict[str, Any], client_factory: Optional[ClientFactory] = None) -> None:
+    """由 AIRBYTE_CATALOG 生成 CATALOG，不连接集群；client_factory 只为与其它命令的接口一致"""
     streams: List[Dict[str, Any]] = []
     catalog = read_catalog_from_env() or {}
     for stream_entry in catalog.get("streams", []):
@@ -76,6 +61,7 @@ def discover(config_data: Dict[str, Any]) -> None:
                         "payload": {"type": "string"},
                         "query": {"type": "string"},
                         "index": {"type": "integer"},
+                        "page": {"type": "integer"},
                     },
                 },
             }
@@ -101,6 +87,7 @@ def _load_read_queries(config_data: Dict[str, Any]) -> List[Dict[str, Any]]:
                 "query": query,
                 "graph": config.get("graph"),
                 "setup_queries": config.get("setup_queries") or [],
+                "page_size": int(config.get("page_size") or 0),
             }
         )
 
@@ -117,20 +104,105 @@ def _load_read_queries(config_data: Dict[str, Any]) -> List[Dict[str, Any]]:
                 "query": item.get("query"),
                 "graph": item.get("graph"),
                 "setup_queries": item.get("setup_queries") or [],
+                "page_size": int(item.get("page_size") or 0),
             }
         )
     return queries
 
 
-def read(config_data: Dict[str, Any]) -> None:
+class _HedgePolicy:
+    """按 stream 记录读查询延迟，计算对冲等待时间"""
+
+    MIN_SAMPLES = 5
+    WINDOW = 200
+
+    def __init__(self, quantile: float, default_delay: float) -> None:
+        self._quantile = quantile
+        self._default_delay = default_delay
+        self._streams: Dict[str, Deque[float]] = {}
+        self._all: Deque[float] = deque(maxlen=self.WINDOW)
+
+    def record(self, stream: str, seconds: float) -> None:
+        window = self._streams.get(stream)
+        if window is None:
+            window = self._streams[stream] = deque(maxlen=self.WINDOW)
+        window.append(seconds)
+        self._all.append(seconds)
+
+    def delay(self, stream: str) -> float:
+        """优先使用该 stream 的延迟分位数，样本不足时退化为全部读查询，再退化为默认值"""
+        for window in (self._streams.get(stream), self._all):
+            if window is not None and len(window) >= self.MIN_SAMPLES:
+                ordered = sorted(window)
+                idx = min(int(self._quantile * len(ordered)), len(ordered) - 1)
+                return ordered[idx]
+        return self._default_delay
+
+
+def _emit_record(name: str, gql: str, idx: int, payload: str, page: Optional[int] = None) -> None:
+    data: Dict[str, Any] = {
+        "payload": payload,
+        "query": gql,
+        "index": idx,
+    }
+    if page is not None:
+        data["page"] = page
+    emit_message(
+        {
+            "type": "RECORD",
+            "record": {
+                "stream": name,
+                "data": data,
+                "emitted_at": int(time.time() * 1000),
+            },
+        }
+    )
+
+
+def _read_pages(client: NebulaClient, name: str, gql: str, idx: int, page_size: int) -> None:
+    """
+    配置了 page_size 的读查询：经 execute_iter 分页读取，每页输出一条 RECORD（data.page
+    为页号）；以 ORDER BY 结尾的查询内存中只保留一页结果，其它查询整体执行一次（见
+    QueryPager）；该模式下不使用对冲读
+    """
+    metrics = get_registry()
+    tracer = get_tracer()
+    pages = client.execute_iter(gql, page_size, stream=name)
+    page_no = 0
+    while True:
+        execute_start = time.perf_counter()
+        rows = next(pages, None)
+        if rows is None:
+            break
+        convert_start = time.perf_counter()
+        metrics.add_stage_time("execute", convert_start - execute_start)
+        payload = client.rows_to_payload(rows)
+        emit_start = time.perf_counter()
+        metrics.add_stage_time("convert", emit_start - convert_start)
+        tracer.add_complete("convert", convert_start, emit_start, args={"stream": name, "page": page_no})
+        _emit_record(name, gql, idx, payload, page_no)
+        metrics.add_stage_time("emit", time.perf_counter() - emit_start)
+        metrics.add_records(name, 1, encoded_size(payload))
+        metrics.maybe_report()
+        page_no += 1
+
+
+def read(config_data: Dict[str, Any], client_factory: Optional[ClientFactory] = None) -> None:
+    """执行读查询并输出 RECORD；client_factory 可替换底层客户端"""
     cfg = to_source_config(config_data)
+    if cfg.execution_mode == "asyncio":
+        import asyncio
+
+        asyncio.run(read_async(config_data, client_factory))
+        return
+    metrics = reset_registry("source")
+    tracer = get_tracer()
     read_queries = _load_read_queries(config_data)
     if not read_queries:
         raise ValueError("read_queries 不能为空，请在 AIRBYTE_CATALOG 的 stream config 中提供 read_query")
-    client = NebulaClient(
-        hosts=cfg.hosts,
-        username=cfg.username,
-        password=cfg.password,
+    client = NebulaClient.from_config(cfg, client_factory=client_factory)
+    hedge: Optional[_HedgePolicy] = (
+        _HedgePolicy(cfg.hedge_quantile, cfg.hedge_delay) if cfg.hedge_reads else None
     )
     try:
         client.connect()
@@ -149,22 +221,112 @@ def read(config_data: Dict[str, Any]) -> None:
                 if setup:
                     client.execute(setup)
             log(f"执行读查询: {name}")
-            result = client.execute(gql)
+            if query.get("page_size"):
+                _read_pages(client, name, gql, idx, query["page_size"])
+                continue
+            execute_start = time.perf_counter()
+            if hedge is not None:
+                result = client.execute_hedged(gql, hedge.delay(name), stream=name)
+            else:
+                result = client.execute(gql, stream=name)
+            convert_start = time.perf_counter()
+            metrics.add_stage_time("execute", convert_start - execute_start)
+            if hedge is not None:
+                hedge.record(name, convert_start - execute_start)
             payload = client.result_to_payload(result)
-            emit_message(
-                {
-                    "type": "RECORD",
-                    "record": {
-                        "stream": name,
-                        "data": {
-                            "payload": payload,
-                            "query": gql,
-                            "index": idx,
-                        },
-                        "emitted_at": int(time.time() * 1000),
-                    },
-                }
-            )
-        emit_message({"type": "STATE", "state": {"last_read": int(time.time())}})
+            emit_start = time.perf_counter()
+            metrics.add_stage_time("convert", emit_start - convert_start)
+            tracer.add_complete("convert", convert_start, emit_start, args={"stream": name})
+            _emit_record(name, gql, idx, payload)
+            metrics.add_stage_time("emit", time.perf_counter() - emit_start)
+            metrics.add_records(name, 1, encoded_size(payload))
+            metrics.maybe_report()
+        with tracer.span("state", cat="emit"):
+            emit_message({"type": "STATE", "state": {"last_read": int(time.time())}})
     finally:
         client.close()
+        metrics.report_final()
+
+
+async def read_async(
+    config_data: Dict[str, Any], client_factory: Optional[ClientFactory] = None
+) -> None:
+    """
+    asyncio 模式的 read：setup_queries 相同的相邻读查询作为一组并发执行
+    （在途上限 max_in_flight），RECORD 按完成顺序输出；组之间顺序执行，
+    保证 setup_queries 只作用于本组查询。该模式下不使用对冲读。
+    """
+    import asyncio
+
+    from .aio_client import AsyncNebulaClient
+
+    cfg = to_source_config(config_data)
+    metrics = reset_registry("source")
+    tracer = get_tracer()
+    read_queries = _load_read_queries(config_data)
+    if not read_queries:
+        raise ValueError("read_queries 不能为空，请在 AIRBYTE_CATALOG 的 stream config 中提供 read_query")
+    if cfg.hedge_reads:
+        log("asyncio 模式下忽略 hedge_reads")
+    client = AsyncNebulaClient.from_config(cfg, client_factory=client_factory)
+
+    async def _run_pages(idx: int, name: str, gql: str, page_size: int) -> None:
+        page_no = 0
+        pages = client.execute_iter(gql, page_size, stream=name)
+        while True:
+            execute_start = time.perf_counter()
+            rows = await anext(pages, None)
+            if rows is None:
+                break
+            convert_start = time.perf_counter()
+            metrics.add_stage_time("execute", convert_start - execute_start)
+            payload = client.rows_to_payload(rows)
+            emit_start = time.perf_counter()
+            metrics.add_stage_time("convert", emit_start - convert_start)
+            tracer.add_complete("convert", convert_start, emit_start, args={"stream": name, "page": page_no})
+            _emit_record(name, gql, idx, payload, page_no)
+            metrics.add_stage_time("emit", time.perf_counter() - emit_start)
+            metrics.add_records(name, 1, encoded_size(payload))
+            metrics.maybe_report()
+            page_no += 1
+
+    async def _run(idx: int, name: str, gql: str, page_size: int = 0) -> None:
+        log(f"执行读查询: {name}")
+        if page_size:
+            await _run_pages(idx, name, gql, page_size)
+            return
+        execute_start = time.perf_counter()
+        result = await client.execute(gql, stream=name)
+        convert_start = time.perf_counter()
+        metrics.add_stage_time("execute", convert_start - execute_start)
+        payload = client.result_to_payload(result)
+        emit_start = time.perf_counter()
+        metrics.add_stage_time("convert", emit_start - convert_start)
+        tracer.add_complete("convert", convert_start, emit_start, args={"stream": name})
+        _emit_record(name, gql, idx, payload)
+        metrics.add_stage_time("emit", time.perf_counter() - emit_start)
+        metrics.add_records(name, 1, encoded_size(payload))
+        metrics.maybe_report()
+
+    try:
+        await client.connect()
+        indexed = [
+            (idx, query) for idx, query in enumerate(read_queries)
+            if query.get("name") and query.get("query")
+        ]
+        groups = itertools.groupby(indexed, key=lambda item: tuple(item[1].get("setup_queries") or []))
+        for setup_queries, group in groups:
+            for setup in setup_queries:
+                if setup:
+                    await client.execute(setup)
+            await asyncio.gather(
+                *(
+                    _run(idx, query["name"], query["query"], query.get("page_size") or 0)
+                    for idx, query in group
+                )
+            )
+        with tracer.span("state", cat="emit"):
+            emit_message({"type": "STATE", "state": {"last_read": int(time.time())}})
+    finally:
+        await client.close()
+        metrics.report_final()
@@ -0,0 +1,89 @@
+"""
+连接器 SPEC 定义
+
+spec 命令只需要这里的静态定义；与 source / destination 模块分开，避免 Airbyte
+频繁调用 spec 时导入客户端、GQL 生成与 schema 读取等模块。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from .common import CONNECTION_SPEC_PROPERTIES
+
+
+def source_spec() -> Dict[str, Any]:
+    return {
+        "type": "SPEC",
+        "spec": {
+            "documentationUrl": "",
+            "connectionSpecification": {
+                "type": "object",
+                "required": ["hosts", "username", "password"],
+                "properties": {
+                    "hosts": {"type": "array", "items": {"type": "string"}},
+                    "username": {"type": "string", "default": "root"},
+                    "password": {"type": "string", "airbyte_secret": True, "default": "root"},
+                    **CONNECTION_SPEC_PROPERTIES,
+                    "hedge_reads": {
+                        "type": "boolean",
+                        "description": "对冲读：读查询超过该 stream 历史延迟分位数仍未返回时，在另一个 host 上重复发起",
+                        "default": False,
+                    },
+                    "hedge_quantile": {
+                        "type": "number",
+                        "description": "触发对冲的延迟分位数",
+                        "default": 0.95,
+                    },
+                    "hedge_delay": {
+                        "type": "number",
+                        "description": "历史样本不足时的对冲等待时间（秒）",
+                        "default": 1.0,
+                    },
+                },
+            },
+        },
+    }
+
+
+def destination_spec() -> Dict[str, Any]:
+    return {
+        "type": "SPEC",
+        "spec": {
+            "documentationUrl": "",
+            "connectionSpecification": {
+                "type": "object",
+                "required": ["hosts", "username", "password"],
+                "properties": {
+                    "hosts": {"type": "array", "items": {"type": "string"}},
+                    "username": {"type": "string", "default": "root"},
+                    "password": {"type": "string", "airbyte_secret": True, "default": "root"},
+                    "graph": {"type": "string", "description": "The graph space to connect to.", "default": ""},
+                    "batch_size": {
+                        "type": "integer",
+                        "description": "每批通过 execute_many 一起发送的写入语句数；收到 STATE 时先写完缓冲的语句再回传",
+                        "default": 1,
+                        "minimum": 1,
+                    },
+                    "export_dir": {
+                        "type": "string",
+                        "description": "导出（dry run）模式：不执行写入，把语句写入该目录下的分片脚本文件，之后用 apply 命令执行",
+                    },
+                    "export_shards": {
+                        "type": "integer",
+                        "description": "导出模式下每个 stream 的分片文件数",
+                        "default": 4,
+                        "minimum": 1,
+                    },
+                    "export_compress": {
+                        "type": "boolean",
+                        "description": "导出模式下以 gzip 压缩分片文件",
+                        "default": True,
+                    },
+                    **CONNECTION_SPEC_PROPERTIES,
+                },
+            },
+            "supportsNormalization": False,
+            "supportsDBT": False,
+            "supported_destination_sync_modes": ["append", "overwrite"],
+        },
+    }
@@ -0,0 +1,177 @@
+"""
+Tracing - 以 Chrome/Perfetto trace 格式记录流水线各阶段的时间线
+
+开启后记录 stdin 读取、语句生成、execute 调用、输出刷新、STATE 输出以及
+GC 暂停等 span，在进程结束时写出 JSON 文件，可直接在 chrome://tracing
+或 https://ui.perfetto.dev 中打开查看空闲间隙与停顿。
+"""
+from __future__ import annotations
+
+import gc
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_EVENTS = 1_000_000
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    记录 Chrome trace "complete"（ph=X）事件
+
+    Args:
+        path: 输出文件路径
+        max_events: 事件上限，超过后丢弃新事件并计数，避免长同步占满内存
+    """
+
+    enabled = True
+
+    def __init__(self, path: str, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        self.path = path
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._thread_names: Dict[int, str] = {}
+        self._gc_start: Optional[float] = None
+
+    def _ts(self, t: float) -> float:
+        return (t - self._origin) * 1_000_000
+
+    def add_complete(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        cat: str = "pipeline",
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """记录一个 [start, end) 区间（perf_counter 秒）"""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(self._ts(start), 3),
+            "dur": round((end - start) * 1_000_000, 3),
+            "pid": self._pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+            if thread.ident not in self._thread_names:
+                self._thread_names[thread.ident] = thread.name
+
+    @contextmanager
+    def span(self, name: str, cat: str = "pipeline", **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_complete(name, start, time.perf_counter(), cat, args or None)
+
+    def install_gc_hook(self) -> None:
+        """将 GC 暂停记录为 span"""
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self.add_complete(
+                "gc",
+                self._gc_start,
+                time.perf_counter(),
+                cat="gc",
+                args={"generation": info.get("generation"), "collected": info.get("collected")},
+            )
+            self._gc_start = None
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._thread_names.items()
+            ]
+            return {
+                "traceEvents": metadata + list(self.events),
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped},
+            }
+
+    def write(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
+        from .common import log
+
+        log(f"trace 已写入: {self.path} ({len(self.events)} 个事件, 丢弃 {self.dropped})")
+
+
+class NullTracer:
+    """未开启 tracing 时的空实现，span 返回共享的空上下文"""
+
+    enabled = False
+
+    def span(self, name: str, cat: str = "pipeline", **args: Any) -> Any:
+        return _NULL_SPAN
+
+    def add_complete(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+    def write(self) -> None:
+        return None
+
+
+_TRACER: Any = NullTracer()
+
+
+def get_tracer() -> Any:
+    return _TRACER
+
+
+def configure_tracing(path: Optional[str] = None) -> Any:
+    """
+    开启 tracing；path 为空时读取环境变量：
+    - YUESHU_TRACE_FILE: trace JSON 输出路径，未设置则不记录
+    - YUESHU_TRACE_MAX_EVENTS: 事件上限（默认 1000000）
+    """
+    global _TRACER
+    path = path or os.environ.get("YUESHU_TRACE_FILE")
+    if not path:
+        _TRACER = NullTracer()
+        return _TRACER
+    tracer = Tracer(
+        path,
+        max_events=int(os.environ.get("YUESHU_TRACE_MAX_EVENTS", DEFAULT_MAX_EVENTS)),
+    )
+    tracer.install_gc_hook()
+    _TRACER = tracer
+    return tracer
+
+
+def finish_tracing() -> None:
+    """写出 trace 文件并恢复为空实现"""
+    global _TRACER
+    tracer = _TRACER
+    _TRACER = NullTracer()
+    tracer.write()
@@ -0,0 +1,259 @@
+"""
+测试 AsyncNebulaClient 与 asyncio 模式的 read/write
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import aio_client, common, destination, nebula_client, source
+from yueshu_airbyte_connector.aio_client import AsyncNebulaClient
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+
+
+class FakeResult:
+    is_succeeded = True
+
+    def __init__(self, query):
+        self.query = query
+
+    def as_primitive_by_column(self):
+        return {"query": [self.query]}
+
+
+class FakeDriver:
+    """记录执行语句与最大并发数的假驱动"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.executed = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def factory(self, hosts, username, password):
+        driver = self
+
+        class _Client:
+            def execute(self, query):
+                with driver._lock:
+                    driver.active += 1
+                    driver.peak = max(driver.peak, driver.active)
+                time.sleep(driver.delay)
+                with driver._lock:
+                    driver.active -= 1
+                    driver.executed.append(query)
+                return FakeResult(query)
+
+            def close(self):
+                pass
+
+        return _Client()
+
+
+def test_shim_execute_concurrent():
+    """shim 模式下语句在线程池中并发执行，受 max_in_flight 限制"""
+    driver = FakeDriver(delay=0.02)
+
+    async def main():
+        client = AsyncNebulaClient(
+            ["h1:9669"], "root", "root",
+            max_sessions=4, max_in_flight=4, client_factory=driver.factory,
+        )
+        await client.connect()
+        assert client.mode == "shim"
+        try:
+            results = await asyncio.gather(*(client.execute(f"RETURN {i}") for i in range(12)))
+        finally:
+            await client.close()
+        return results
+
+    results = asyncio.run(main())
+    assert [r.query for r in results] == [f"RETURN {i}" for i in range(12)]
+    assert 1 < driver.peak <= 4
+    print("✓ shim 并发执行测试通过")
+
+
+def test_blocking_adapter():
+    """同步适配器可在其它线程中调用"""
+    driver = FakeDriver()
+
+    async def main():
+        client = AsyncNebulaClient(["h1:9669"], "root", "root", client_factory=driver.factory)
+        await client.connect()
+        try:
+            adapter = client.blocking()
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, adapter.execute, "RETURN 1"
+            )
+        finally:
+            await client.close()
+        return result
+
+    assert asyncio.run(main()).query == "RETURN 1"
+    print("✓ 同步适配器测试通过")
+
+
+def test_host_limits_use_shim(monkeypatch):
+    """配置了按 host 的限制时即使驱动可用也使用 shim 模式，按 host 的在途数限制生效"""
+    class UnusedAsyncClient:
+        @classmethod
+        async def connect(cls, **kwargs):
+            raise AssertionError("配置了按 host 的限制时不应使用驱动模式")
+
+    driver = FakeDriver(delay=0.01)
+    monkeypatch.setattr(aio_client, "_import_async_client", lambda: (UnusedAsyncClient, dict))
+    monkeypatch.setattr(nebula_client, "_default_client_factory", driver.factory)
+    cfg = common.to_source_config(
+        {"hosts": ["h1:9669"], "username": "root", "password": "root", "max_sessions": 6, "max_in_flight_per_host": 2}
+    )
+    err = io.StringIO()
+
+    async def main(client):
+        await client.connect()
+        try:
+            assert client.mode == "shim"
+            await asyncio.gather(*(client.execute(f"RETURN {i}") for i in range(12)))
+        finally:
+            await client.close()
+
+    asyncio.run(main(AsyncNebulaClient.from_config(cfg)))
+    assert 1 <= driver.peak <= 2 and len(driver.executed) == 12
+
+    driver.peak = 0
+    client = AsyncNebulaClient(
+        ["h1:9669"], "root", "root", max_sessions=6, rate_limits=nebula_client.rate_limits_from_config(cfg)
+    )
+    monkeypatch.setattr(sys, "stderr", err)
+    asyncio.run(main(client))
+    assert driver.peak <= 2
+    assert "按 host 的限流" in err.getvalue()
+    print("✓ 按 host 限流使用 shim 模式测试通过")
+
+
+def _use_fake_driver(monkeypatch, driver):
+    monkeypatch.setattr(aio_client, "_import_async_client", lambda: None)
+    monkeypatch.setattr(
+        nebula_client, "_default_client_factory", driver.factory
+    )
+
+
+def test_write_async(monkeypatch):
+    """asyncio 模式写入所有记录，setup_queries 先于该 stream 的记录执行"""
+    driver = FakeDriver(delay=0.001)
+    _use_fake_driver(monkeypatch, driver)
+    catalog = {
+        "streams": [
+            {
+                "stream": {"name": "people"},
+                "config": {
+                    "mapping_type": "vertex",
+                    "graph": "g",
+                    "label": "Person",
+                    "primary_key_source": "id",
+                    "setup_queries": ["SESSION SET GRAPH g"],
+                },
+            }
+        ]
+    }
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(catalog))
+    out = io.StringIO()
+    common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+    lines = [
+        json.dumps({"type": "RECORD", "record": {"stream": "people", "data": {"id": i}}})
+        for i in range(50)
+    ]
+    try:
+        destination.write(
+            {"hosts": ["h1:9669"], "execution_mode": "asyncio", "max_in_flight": 8},
+            lines,
+        )
+    finally:
+        common.uninstall_emitter()
+
+    assert driver.executed[:2] == ["USE g", "SESSION SET GRAPH g"]
+    inserts = [q for q in driver.executed if "INSERT" in q]
+    assert len(inserts) == 50
+    messages = [json.loads(line) for line in out.getvalue().splitlines()]
+    states = [m for m in messages if m["type"] == "STATE"]
+    assert states == [{"type": "STATE", "state": {"last_write": True}}]
+    print("✓ asyncio write 测试通过")
+
+
+def test_write_async_edges_wait_for_vertices(monkeypatch):
+    """asyncio 模式下没有 setup 语句时切换到边 stream，边仍等待在途的点写入完成"""
+    monkeypatch.setattr(aio_client, "_import_async_client", lambda: None)
+    backend = MemoryBackend("movie", latency=lambda q: 0 if "MATCH" in q else 0.005)
+    backend.add_node_type("Actor", ["id"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id"], primary_key=["id"])
+    backend.add_edge_type("Act", [])
+    catalog = {
+        "streams": [
+            {"stream": {"name": "actors"}, "config": {"tag": "Actor", "field_mapping": {"id": "id"}}},
+            {"stream": {"name": "movies"}, "config": {"tag": "Movie", "field_mapping": {"id": "id"}}},
+            {
+                "stream": {"name": "acts"},
+                "config": {
+                    "edge": "Act", "src_tag": "Actor", "dst_tag": "Movie",
+                    "field_mapping": {"a": "_src.id", "m": "_dst.id"},
+                },
+            },
+        ]
+    }
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(catalog))
+
+    def record(stream, data):
+        return json.dumps({"type": "RECORD", "record": {"stream": stream, "data": data}})
+
+    lines = [record("actors", {"id": i}) for i in range(20)]
+    lines += [record("movies", {"id": i}) for i in range(20)]
+    lines += [record("acts", {"a": i, "m": i}) for i in range(20)]
+    common.install_emitter(common.BufferedEmitter(stream=io.StringIO()), handle_signals=False)
+    try:
+        destination.write(
+            {"hosts": ["h1:9669"], "graph": "movie", "execution_mode": "asyncio", "max_in_flight": 16},
+            lines, client_factory=backend.factory,
+        )
+    finally:
+        common.uninstall_emitter()
+    assert backend.node_count() == 40
+    assert backend.edge_count("Act") == 20
+    print("✓ asyncio write 边等待端点测试通过")
+
+
+def test_read_async(monkeypatch):
+    """asyncio 模式读取：每个读查询输出一条 RECORD"""
+    driver = FakeDriver(delay=0.001)
+    _use_fake_driver(monkeypatch, driver)
+    catalog = {
+        "streams": [
+            {"stream": {"name": f"q{i}"}, "config": {"read_query": f"MATCH (n) RETURN {i}"}}
+            for i in range(5)
+        ]
+    }
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(catalog))
+    out = io.StringIO()
+    common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+    try:
+        source.read(
+            {"hosts": ["h1:9669"], "username": "root", "password": "root", "execution_mode": "asyncio"}
+        )
+    finally:
+        common.uninstall_emitter()
+
+    messages = [json.loads(line) for line in out.getvalue().splitlines()]
+    records = [m for m in messages if m["type"] == "RECORD"]
+    assert sorted(r["record"]["data"]["index"] for r in records) == list(range(5))
+    assert [m["type"] for m in messages if m["type"] != "LOG"][-1] == "STATE"
+    print("✓ asyncio read 测试通过")
+
+
+if __name__ == "__main__":
+    test_shim_execute_concurrent()
+    test_blocking_adapter()
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,171 @@
+"""
+测试本地 JSONL 文件的批量导入（load 命令）
+"""
+import json
+import os
+import sys
+from multiprocessing.managers import BaseManager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.bulk_load import FileSpec, iter_segment_lines, load, split_segments
+from yueshu_airbyte_connector.memory_backend import MemoryBackend, MemoryClient
+
+CATALOG = {
+    "streams": [
+        {"stream": {"name": "actors"}, "config": {"tag": "Actor", "field_mapping": {"id": "id", "name": "name"}}},
+        {"stream": {"name": "movies"}, "config": {"tag": "Movie", "field_mapping": {"id": "id", "title": "title"}}},
+    ]
+}
+CONFIG = {"hosts": ["h1:9669"], "graph": "movie", "batch_size": 16, "max_sessions": 2}
+
+
+def _backend():
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    return backend
+
+
+def _write_files(tmp_path, count):
+    """actors 为 Airbyte 消息格式，movies 为每行一个 data 对象"""
+    messages = tmp_path / "actors.jsonl"
+    with open(messages, "w", encoding="utf-8") as f:
+        for i in range(count):
+            record = {"stream": "actors", "data": {"id": i, "name": f"演员{i}" * (i % 5 + 1)}}
+            f.write(json.dumps({"type": "RECORD", "record": record}, ensure_ascii=False) + "\n")
+            if i % 50 == 0:
+                f.write("\n")
+    raw = tmp_path / "movies.jsonl"
+    with open(raw, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"id": i, "title": f"m{i}"}) + "\n")
+    return [FileSpec(str(messages)), FileSpec.parse(f"movies={raw}")]
+
+
+def test_split_segments_on_line_boundaries(tmp_path):
+    """各组的段首尾相接、对齐到行，逐行读取结果与原文件一致"""
+    files = _write_files(tmp_path, 500)
+    for parts in (1, 3, 7, 64):
+        groups = split_segments(files, parts)
+        assert 1 <= len(groups) <= parts
+        for spec in files:
+            segments = [s for g in groups for s in g if s.path == spec.path]
+            assert segments[0].start == 0
+            assert segments[-1].end == os.path.getsize(spec.path)
+            for a, b in zip(segments, segments[1:]):
+                assert a.end == b.start
+            with open(spec.path, "rb") as f:
+                expected = [line.rstrip(b"\n") for line in f if line.strip()]
+            lines = [line for s in segments for line in iter_segment_lines(s)]
+            if spec.stream is None:
+                assert lines == expected
+            else:
+                assert [json.loads(line)["record"]["data"] for line in lines] == [json.loads(e) for e in expected]
+    print("✓ 分段测试通过")
+
+
+def test_load_in_process(tmp_path):
+    """workers=1 在当前进程中导入两种格式的文件"""
+    backend = _backend()
+    files = _write_files(tmp_path, 300)
+    summary = load(CONFIG, CATALOG, files, workers=1, client_factory=backend.factory)
+    assert summary["records"] == 600
+    assert summary["streams"]["movies"]["records"] == 300
+    assert backend.node_count("Actor") == 300
+    assert backend.node_count("Movie") == 300
+    print("✓ 单进程导入测试通过")
+
+
+def test_load_with_workers(tmp_path):
+    """多个工作进程各自导入一部分，汇总的记录数等于文件中的记录数"""
+    backend = _backend()
+    files = _write_files(tmp_path, 400)
+    summary = load(CONFIG, CATALOG, files, workers=3, client_factory=backend.factory, progress_interval=0.05)
+    assert summary["workers"] == 3
+    assert summary["records"] == 800
+    assert summary["streams"]["actors"]["records"] == 400
+    assert summary["file_bytes"] == sum(os.path.getsize(f.path) for f in files)
+    print("✓ 多进程导入测试通过")
+
+
+GRAPH_CATALOG = {
+    "streams": CATALOG["streams"] + [
+        {
+            "stream": {"name": "acts"},
+            "config": {
+                "edge": "Act", "src_tag": "Actor", "dst_tag": "Movie",
+                "field_mapping": {"actor": "_src.id", "movie": "_dst.id"},
+            },
+        },
+    ]
+}
+
+
+def _graph_backend():
+    # 点写入较慢，边的 MATCH 没有延迟：并发写入时边会先于其它进程中的端点执行
+    backend = MemoryBackend("movie", latency=lambda q: 0 if "MATCH" in q else 0.001)
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    backend.add_edge_type("Act", [])
+    return backend
+
+
+class _BackendManager(BaseManager):
+    pass
+
+
+_BackendManager.register("graph_backend", _graph_backend)
+
+
+class _SharedFactory:
+    """在工作进程中通过代理访问管理进程中的同一个 MemoryBackend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __call__(self, hosts, username, password):
+        return MemoryClient(self.backend)
+
+
+def test_load_edges_after_vertices(tmp_path):
+    """多个工作进程导入点与边：边在全部点写入后才写入，边数等于文件中的边数"""
+    count = 120
+    messages = tmp_path / "records.jsonl"
+    with open(messages, "w", encoding="utf-8") as f:
+        # 消息文件中点与边交错，边的端点可能位于其它工作进程的段中
+        for i in range(count):
+            for stream, data in (("acts", {"actor": i, "movie": i}), ("actors", {"id": i, "name": f"a{i}"})):
+                f.write(json.dumps({"type": "RECORD", "record": {"stream": stream, "data": data}}) + "\n")
+    movies = tmp_path / "movies.jsonl"
+    with open(movies, "w", encoding="utf-8") as f:
+        for i in reversed(range(count)):
+            f.write(json.dumps({"id": i, "title": f"m{i}"}) + "\n")
+    files = [FileSpec(str(messages)), FileSpec.parse(f"movies={movies}")]
+
+    with _BackendManager() as manager:
+        backend = manager.graph_backend()
+        summary = load(
+            {**CONFIG, "batch_size": 8}, GRAPH_CATALOG, files, workers=3,
+            client_factory=_SharedFactory(backend), progress_interval=0.05,
+        )
+        assert summary["records"] == 3 * count
+        assert summary["streams"]["acts"]["records"] == count
+        assert summary["file_bytes"] == sum(os.path.getsize(f.path) for f in files)
+        assert backend.node_count("Actor") == count
+        assert backend.node_count("Movie") == count
+        assert backend.edge_count("Act") == count
+    print("✓ 多进程导入边等待端点测试通过")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    for test in (
+        test_split_segments_on_line_boundaries, test_load_in_process, test_load_with_workers,
+        test_load_edges_after_vertices,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("\n✅ 所有测试通过!")
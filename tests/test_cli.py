@@ -0,0 +1,65 @@
+"""
+测试 CLI 启动时只导入所选命令需要的模块
+"""
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# spec 不应导入的模块
+SPEC_EXCLUDED = {
+    "asyncio",
+    "concurrent.futures",
+    "nebulagraph_python",
+    "yueshu_airbyte_connector.aio_client",
+    "yueshu_airbyte_connector.destination",
+    "yueshu_airbyte_connector.gql_generator",
+    "yueshu_airbyte_connector.nebula_client",
+    "yueshu_airbyte_connector.profiling",
+    "yueshu_airbyte_connector.schema_reader",
+    "yueshu_airbyte_connector.source",
+}
+
+
+def _loaded_modules(code):
+    """在干净的解释器中执行 code，返回执行后已导入的模块"""
+    script = code + "\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONPATH=SRC)
+    env.pop("YUESHU_PROFILE", None)
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return set(json.loads(out.splitlines()[-1]))
+
+
+def test_spec_imports_only_spec():
+    """spec 命令不导入连接器、客户端与驱动"""
+    for connector in ("source", "destination"):
+        modules = _loaded_modules(
+            "import sys\n"
+            f"sys.argv = ['yueshu-airbyte', '--connector-type', '{connector}', 'spec']\n"
+            "from yueshu_airbyte_connector import cli\n"
+            "cli.main()"
+        )
+        assert "yueshu_airbyte_connector.spec" in modules
+        assert not (modules & SPEC_EXCLUDED), sorted(modules & SPEC_EXCLUDED)
+    print("✓ spec 导入测试通过")
+
+
+def test_connector_defers_driver_and_asyncio():
+    """导入 source / destination 时不导入驱动与 asyncio，直到建立连接或使用 asyncio 模式"""
+    modules = _loaded_modules(
+        "import yueshu_airbyte_connector.source\nimport yueshu_airbyte_connector.destination"
+    )
+    assert "nebulagraph_python" not in modules
+    assert "asyncio" not in modules
+    assert "yueshu_airbyte_connector.aio_client" not in modules
+    print("✓ 延迟导入测试通过")
+
+
+if __name__ == "__main__":
+    test_spec_imports_only_spec()
+    test_connector_defers_driver_and_asyncio()
+    print("\n✅ 所有测试通过!")
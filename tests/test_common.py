@@ -0,0 +1,193 @@
+"""
+测试 common 模块：缓冲输出与分级日志
+"""
+import io
+import json
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import common
+from yueshu_airbyte_connector.common import BufferedEmitter, Logger, LOG_LEVELS
+
+
+def _lines(stream: io.StringIO):
+    return [json.loads(line) for line in stream.getvalue().splitlines() if line]
+
+
+def test_buffered_emitter_flush_by_size():
+    """超过缓冲区大小时才写出"""
+    out = io.StringIO()
+    emitter = BufferedEmitter(stream=out, buffer_size=200, flush_interval=3600)
+    emitter.emit({"type": "RECORD", "record": {"stream": "a", "data": {"i": 0}}})
+    assert out.getvalue() == ""
+
+    for i in range(1, 10):
+        emitter.emit({"type": "RECORD", "record": {"stream": "a", "data": {"i": i}}})
+    assert len(_lines(out)) > 0
+
+    emitter.close()
+    assert [m["record"]["data"]["i"] for m in _lines(out)] == list(range(10))
+    print("✓ 按大小刷新测试通过")
+
+
+def test_buffered_emitter_flush_by_interval():
+    """间隔为 0 时每条消息都会写出"""
+    out = io.StringIO()
+    emitter = BufferedEmitter(stream=out, buffer_size=1 << 20, flush_interval=0)
+    emitter.emit({"type": "STATE", "state": {"n": 1}})
+    assert _lines(out) == [{"type": "STATE", "state": {"n": 1}}]
+    emitter.close()
+    print("✓ 按间隔刷新测试通过")
+
+
+def test_buffered_emitter_flushes_on_timer():
+    """未使用写线程时，缓冲区在 flush_interval 后由定时线程写出，不等待下一条消息"""
+    out = io.StringIO()
+    emitter = BufferedEmitter(stream=out, buffer_size=1 << 20, flush_interval=0.05)
+    emitter.emit({"type": "STATE", "state": {"n": 1}})
+    assert out.getvalue() == ""
+    deadline = time.monotonic() + 5
+    while not out.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _lines(out) == [{"type": "STATE", "state": {"n": 1}}]
+    emitter.close()
+    print("✓ 定时刷新测试通过")
+
+
+def test_signal_during_append_flushes_after_lock():
+    """信号打断持锁的写出时推迟到释放锁后再写出，不会死锁"""
+    received = []
+
+    class _SignalOnWrite(io.StringIO):
+        def write(self, text):
+            if not received and not self.getvalue():
+                os.kill(os.getpid(), signal.SIGUSR1)
+            return super().write(text)
+
+    out = _SignalOnWrite()
+    previous = signal.signal(signal.SIGUSR1, lambda signum, frame: received.append(signum))
+    try:
+        common._install_flush_handler(signal.SIGUSR1)
+        common.install_emitter(BufferedEmitter(stream=out, buffer_size=1, flush_interval=3600), handle_signals=False)
+        try:
+            common.emit_message({"type": "STATE", "state": {"n": 1}})
+            assert received == [signal.SIGUSR1]
+            assert common._EMITTER is None
+        finally:
+            common.uninstall_emitter()
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert _lines(out) == [{"type": "STATE", "state": {"n": 1}}]
+    print("✓ 信号打断写出测试通过")
+
+
+def test_threaded_emitter_preserves_order():
+    """写线程模式下 flush/close 后消息完整且有序"""
+    out = io.StringIO()
+    emitter = BufferedEmitter(stream=out, buffer_size=1 << 20, flush_interval=3600, threaded=True)
+    for i in range(500):
+        emitter.emit({"type": "RECORD", "record": {"stream": "a", "data": {"i": i}}})
+    emitter.flush()
+    assert len(_lines(out)) == 500
+    emitter.emit({"type": "STATE", "state": {}})
+    emitter.close()
+    messages = _lines(out)
+    assert [m["record"]["data"]["i"] for m in messages[:-1]] == list(range(500))
+    assert messages[-1]["type"] == "STATE"
+    print("✓ 写线程模式测试通过")
+
+
+def test_emit_message_uses_installed_emitter():
+    """install_emitter 后 emit_message 走缓冲输出，uninstall 时写出"""
+    out = io.StringIO()
+    common.install_emitter(
+        BufferedEmitter(stream=out, buffer_size=1 << 20, flush_interval=3600),
+        handle_signals=False,
+    )
+    try:
+        common.emit_message({"type": "STATE", "state": {"x": 1}})
+        assert out.getvalue() == ""
+    finally:
+        common.uninstall_emitter()
+    assert _lines(out) == [{"type": "STATE", "state": {"x": 1}}]
+    print("✓ emit_message 缓冲输出测试通过")
+
+
+def _capture_logs(fn):
+    out = io.StringIO()
+    common.install_emitter(
+        BufferedEmitter(stream=out, buffer_size=1 << 20, flush_interval=3600),
+        handle_signals=False,
+    )
+    try:
+        fn()
+    finally:
+        common.uninstall_emitter()
+    return _lines(out)
+
+
+def test_logger_disabled_level_is_lazy():
+    """低于阈值的级别不调用格式化函数"""
+    logger = Logger("statement", level=LOG_LEVELS["INFO"])
+
+    def _boom():
+        raise AssertionError("不应格式化")
+
+    messages = _capture_logs(lambda: logger.debug(_boom))
+    assert messages == []
+
+    messages = _capture_logs(lambda: logger.info("写入流 %s: %s", "actors", "INSERT ..."))
+    assert messages[0]["type"] == "LOG"
+    assert messages[0]["log"]["level"] == "INFO"
+    assert "写入流 actors: INSERT ..." in messages[0]["log"]["message"]
+    print("✓ 延迟格式化测试通过")
+
+
+def test_logger_sampling():
+    """每 N 条只输出 1 条"""
+    logger = Logger("statement", sample_every=100)
+    messages = _capture_logs(lambda: [logger.info("stmt %s", i) for i in range(1000)])
+    assert len(messages) == 10
+    assert "stmt 0 " in messages[0]["log"]["message"]
+    print("✓ 采样测试通过")
+
+
+def test_logger_rate_limit():
+    """每秒最多输出 rate_limit 条"""
+    logger = Logger("record", rate_limit=5)
+    messages = _capture_logs(lambda: [logger.warn("slow %s", i) for i in range(50)])
+    assert len(messages) == 5
+    assert all(m["log"]["level"] == "WARN" for m in messages)
+    print("✓ 限流测试通过")
+
+
+def test_configure_logging_updates_existing_loggers():
+    """configure_logging 会更新已创建的 Logger"""
+    logger = common.get_logger("test-category")
+    try:
+        common.configure_logging(level="ERROR", sampling={}, rate_limits={})
+        assert not logger.is_enabled(LOG_LEVELS["WARN"])
+        common.configure_logging(level="debug", sampling={"test-category": 10}, rate_limits={})
+        assert logger.is_enabled(LOG_LEVELS["DEBUG"])
+        assert logger.sample_every == 10
+    finally:
+        common.configure_logging()
+    print("✓ 日志配置测试通过")
+
+
+if __name__ == "__main__":
+    test_buffered_emitter_flush_by_size()
+    test_buffered_emitter_flush_by_interval()
+    test_buffered_emitter_flushes_on_timer()
+    test_signal_during_append_flushes_after_lock()
+    test_threaded_emitter_preserves_order()
+    test_emit_message_uses_installed_emitter()
+    test_logger_disabled_level_is_lazy()
+    test_logger_sampling()
+    test_logger_rate_limit()
+    test_configure_logging_updates_existing_loggers()
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,201 @@
+"""
+测试守护进程模式：转发调用、会话与 schema 复用
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.daemon import Daemon, DaemonUnavailableError, forward
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+
+CATALOG = {
+    "streams": [
+        {"stream": {"name": "actors"}, "config": {"tag": "Actor", "field_mapping": {"id": "id", "name": "name"}}},
+    ]
+}
+CONFIG = {"hosts": ["h1:9669"], "graph": "movie", "batch_size": 4, "max_sessions": 2}
+READ_CONFIG = {"hosts": ["h1:9669"], "username": "root", "password": "root"}
+
+
+class _CountingFactory:
+    """记录底层客户端的创建次数与执行过的语句"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.created = 0
+        self.queries = []
+
+    def __call__(self, hosts, username, password):
+        self.created += 1
+        client = self.backend.factory(hosts, username, password)
+        queries = self.queries
+        execute = client.execute
+
+        def recording_execute(query, *, timeout=None):
+            queries.append(query)
+            return execute(query, timeout=timeout)
+
+        client.execute = recording_execute
+        return client
+
+
+def _start(tmp_path, factory):
+    daemon = Daemon(str(tmp_path / "daemon.sock"), client_factory=factory)
+    daemon.bind()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    return daemon, thread
+
+
+def _stop(daemon, thread):
+    daemon.shutdown()
+    thread.join(timeout=5)
+
+
+def _records(start, count):
+    lines = [
+        json.dumps({"type": "RECORD", "record": {"stream": "actors", "data": {"id": i, "name": f"a{i}"}}})
+        for i in range(start, start + count)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _forward(daemon, command, config, catalog, stdin=b"", connector_type=None):
+    out, err = io.StringIO(), io.StringIO()
+    code = forward(
+        daemon.socket_path, connector_type or ("destination" if command == "write" else "source"),
+        command, config, catalog, io.BytesIO(stdin), out, err,
+    )
+    messages = [json.loads(line) for line in out.getvalue().splitlines()]
+    return code, messages, err.getvalue()
+
+
+def test_forwarded_writes_reuse_sessions_and_schema(tmp_path):
+    """连续两次写入复用底层会话与 schema，输出按调用写回"""
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    factory = _CountingFactory(backend)
+    daemon, thread = _start(tmp_path, factory)
+    try:
+        code, messages, err = _forward(daemon, "write", CONFIG, CATALOG, _records(0, 10))
+        assert code == 0, err
+        assert {"type": "STATE", "state": {"last_write": True}} in messages
+        assert "成功读取 graph movie schema" in err
+        created = factory.created
+        assert created >= 1
+
+        code, messages, err = _forward(daemon, "write", CONFIG, CATALOG, _records(10, 10))
+        assert code == 0, err
+        assert factory.created == created
+        assert daemon.sessions.reused >= 1
+        assert daemon.schemas.hits == 1
+        assert sum(q.startswith("DESC GRAPH TYPE") for q in factory.queries) == 1
+        assert backend.node_count("Actor") == 20
+    finally:
+        _stop(daemon, thread)
+    assert not os.path.exists(daemon.socket_path)
+    print("✓ 会话与 schema 复用测试通过")
+
+
+def test_forwarded_read_and_error(tmp_path):
+    """读取结果写回 stdout；调用失败时返回非零退出码与错误信息"""
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    daemon, thread = _start(tmp_path, backend.factory)
+    try:
+        code, _, err = _forward(daemon, "write", CONFIG, CATALOG, _records(0, 5))
+        assert code == 0, err
+        read_catalog = {
+            "streams": [{"stream": {"name": "count"}, "config": {"read_query": "MATCH (v@Actor) RETURN count(v)"}}]
+        }
+        code, messages, err = _forward(daemon, "read", READ_CONFIG, read_catalog)
+        assert code == 0, err
+        records = [m for m in messages if m["type"] == "RECORD"]
+        assert records[0]["record"]["data"]["payload"] == str({"count(v)": [5]})
+
+        code, messages, err = _forward(daemon, "read", READ_CONFIG, {"streams": []})
+        assert code == 1
+        assert "read_queries 不能为空" in err
+    finally:
+        _stop(daemon, thread)
+    print("✓ 转发读取与错误测试通过")
+
+
+def test_worker_thread_logs_follow_invocation(tmp_path):
+    """慢语句 watchdog 等工作线程的日志写回发起调用的输出，而不是守护进程自身的 stdout/stderr"""
+    backend = MemoryBackend("movie", latency=0.3)
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    daemon_out, daemon_err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(daemon_out), contextlib.redirect_stderr(daemon_err):
+        daemon, thread = _start(tmp_path, backend.factory)
+        try:
+            config = dict(CONFIG, slow_statement_threshold=0.05)
+            code, messages, err = _forward(daemon, "write", config, CATALOG, _records(0, 4))
+            assert code == 0, err
+        finally:
+            _stop(daemon, thread)
+    logs = [m["log"]["message"] for m in messages if m["type"] == "LOG"]
+    assert any("慢语句仍在执行" in message for message in logs), logs
+    assert "慢语句" not in daemon_out.getvalue()
+    assert "慢语句" not in daemon_err.getvalue()
+    print("✓ 工作线程日志归属调用测试通过")
+
+
+def test_check_and_discover_reuse_sessions_and_schema(tmp_path):
+    """重复的 check / discover 复用常驻会话与 schema 缓存，只建立一次连接、读取一次 schema"""
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    factory = _CountingFactory(backend)
+    daemon, thread = _start(tmp_path, factory)
+    try:
+        for _ in range(3):
+            code, messages, err = _forward(daemon, "check", CONFIG, None, connector_type="destination")
+            assert code == 0, err
+            assert messages[-1]["connectionStatus"]["status"] == "SUCCEEDED"
+        created = factory.created
+        for _ in range(2):
+            code, messages, err = _forward(daemon, "discover", CONFIG, None, connector_type="destination")
+            assert code == 0, err
+            assert [s["stream"]["name"] for s in messages[-1]["catalog"]["streams"]] == ["Actor"]
+        for _ in range(2):
+            code, messages, err = _forward(daemon, "check", READ_CONFIG, None, connector_type="source")
+            assert code == 0, err
+            assert messages[-1]["connectionStatus"]["status"] == "SUCCEEDED"
+        assert created == factory.created == 1
+        assert sum(q.startswith("DESC GRAPH TYPE") for q in factory.queries) == 1
+        assert daemon.schemas.hits == 4
+    finally:
+        _stop(daemon, thread)
+    print("✓ check / discover 复用测试通过")
+
+
+def test_unavailable_daemon(tmp_path):
+    """socket 不存在时抛出 DaemonUnavailableError，由 CLI 回退为本地执行"""
+    try:
+        forward(str(tmp_path / "missing.sock"), "source", "check", {}, None, None, io.StringIO(), io.StringIO())
+    except DaemonUnavailableError:
+        pass
+    else:
+        raise AssertionError("应抛出 DaemonUnavailableError")
+    print("✓ 守护进程不可用测试通过")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    for test in (
+        test_forwarded_writes_reuse_sessions_and_schema,
+        test_forwarded_read_and_error,
+        test_worker_thread_logs_follow_invocation,
+        test_check_and_discover_reuse_sessions_and_schema,
+        test_unavailable_daemon,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,174 @@
+"""
+测试 destination.write：批量写入与 STATE 回传
+"""
+import io
+import json
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import common, destination, nebula_client
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+
+
+class FakeResult:
+    is_succeeded = True
+
+
+class FakeDriver:
+    def __init__(self):
+        self.executed = []
+        self._lock = threading.Lock()
+
+    def factory(self, hosts, username, password):
+        driver = self
+
+        class _Client:
+            def execute(self, query):
+                with driver._lock:
+                    driver.executed.append(query)
+                return FakeResult()
+
+            def close(self):
+                pass
+
+        return _Client()
+
+
+CATALOG = {
+    "streams": [
+        {
+            "stream": {"name": "people"},
+            "config": {
+                "mapping_type": "vertex",
+                "label": "Person",
+                "primary_key_source": "id",
+            },
+        }
+    ]
+}
+
+
+def _record(i):
+    return json.dumps({"type": "RECORD", "record": {"stream": "people", "data": {"id": i}}})
+
+
+def _state(i):
+    return json.dumps({"type": "STATE", "state": {"data": {"cursor": i}}})
+
+
+def _run_write(monkeypatch, lines, **config):
+    driver = FakeDriver()
+    monkeypatch.setattr(nebula_client, "_default_client_factory", driver.factory)
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(CATALOG))
+    out = io.StringIO()
+    emitted = []
+    original_emit = common.BufferedEmitter.emit
+
+    def emit(self, message):
+        # 记录每条输出时已执行的语句数
+        emitted.append((message, len(driver.executed)))
+        original_emit(self, message)
+
+    monkeypatch.setattr(common.BufferedEmitter, "emit", emit)
+    common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+    try:
+        destination.write({"hosts": ["h1:9669"], **config}, lines)
+    finally:
+        common.uninstall_emitter()
+    return driver, [(m, n) for m, n in emitted if m["type"] == "STATE"]
+
+
+def test_batched_write_echoes_state_after_flush(monkeypatch):
+    """按 batch_size 批量执行；STATE 在之前的记录全部写入后才回传"""
+    lines = [_record(i) for i in range(5)] + [_state(5)] + [_record(i) for i in range(5, 8)]
+    driver, states = _run_write(monkeypatch, lines, batch_size=4, max_sessions=2)
+
+    inserts = [q for q in driver.executed if "INSERT" in q]
+    assert len(inserts) == 8
+    assert states[0] == ({"type": "STATE", "state": {"data": {"cursor": 5}}}, 5)
+    assert states[-1][0] == {"type": "STATE", "state": {"last_write": True}}
+    assert states[-1][1] == 8
+    print("✓ 批量写入与 STATE 回传测试通过")
+
+
+def test_default_batch_size_writes_each_record(monkeypatch):
+    """默认 batch_size=1 时逐条写入，语句与之前一致"""
+    driver, _ = _run_write(monkeypatch, [_record(1), _record(2)])
+    assert driver.executed == [
+        "TABLE INSERT OR IGNORE (@Person{id: 1})",
+        "TABLE INSERT OR IGNORE (@Person{id: 2})",
+    ]
+    print("✓ 逐条写入测试通过")
+
+
+GRAPH_CATALOG = {
+    "streams": [
+        {"stream": {"name": "actors"}, "config": {"tag": "Actor", "field_mapping": {"id": "id", "name": "name"}}},
+        {"stream": {"name": "movies"}, "config": {"tag": "Movie", "field_mapping": {"id": "id", "title": "title"}}},
+        {
+            "stream": {"name": "acts"},
+            "config": {
+                "edge": "Act", "src_tag": "Actor", "dst_tag": "Movie",
+                "field_mapping": {"actor": "_src.id", "movie": "_dst.id", "role": "roleName"},
+            },
+        },
+    ]
+}
+
+
+def _graph_backend(latency):
+    backend = MemoryBackend("movie", latency=latency)
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    backend.add_edge_type("Act", ["roleName"])
+    return backend
+
+
+def _graph_record(stream, data):
+    return json.dumps({"type": "RECORD", "record": {"stream": stream, "data": data}}, ensure_ascii=False)
+
+
+def _write_graph(monkeypatch, backend, lines, **config):
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(GRAPH_CATALOG))
+    config = {"hosts": ["h1:9669"], "graph": "movie", **config}
+    common.install_emitter(common.BufferedEmitter(stream=io.StringIO()), handle_signals=False)
+    try:
+        destination.write(config, lines, client_factory=backend.factory)
+    finally:
+        common.uninstall_emitter()
+
+
+def test_batched_edges_wait_for_vertices(monkeypatch):
+    """批内点与边交错且点写入较慢时，边仍能匹配到同一批中写入的端点"""
+    rng = random.Random(7)
+    # 点写入有随机延迟，边的 MATCH 没有：并发执行时边会先于端点执行
+    backend = _graph_backend(lambda q: 0 if "MATCH" in q else rng.uniform(0, 0.002))
+    lines = []
+    for i in range(200):
+        lines.append(_graph_record("actors", {"id": i, "name": f"a{i}"}))
+        lines.append(_graph_record("movies", {"id": i, "title": f"m{i}"}))
+        lines.append(_graph_record("acts", {"actor": i, "movie": i, "role": f"r{i}"}))
+    _write_graph(monkeypatch, backend, lines, batch_size=30, max_sessions=8)
+    assert backend.node_count() == 400
+    assert backend.edge_count("Act") == 200
+    print("✓ 批内边等待端点测试通过")
+
+
+def test_batched_updates_keep_last_write(monkeypatch):
+    """同一批中同一个点的多次写入按输入顺序执行，最后一次写入生效"""
+    # 先到的写入更慢：并发执行时旧值会覆盖新值
+    backend = _graph_backend(lambda q: 0.005 if '"old' in q else 0)
+    lines = []
+    for i in range(20):
+        lines.append(_graph_record("actors", {"id": i, "name": f"old{i}"}))
+        lines.append(_graph_record("actors", {"id": i, "name": f"new{i}"}))
+    _write_graph(monkeypatch, backend, lines, batch_size=40, max_sessions=8, insert_mode="overwrite")
+    client = backend.factory([], "root", "root")
+    rows = client.execute("MATCH (v@Actor) RETURN v").as_primitive_by_row()
+    names = {row["v"]["properties"]["id"]: row["v"]["properties"]["name"] for row in rows}
+    assert names == {i: f"new{i}" for i in range(20)}
+    print("✓ 批内最后写入生效测试通过")
@@ -0,0 +1,97 @@
+"""
+测试故障注入包装 FaultInjector
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.faults import FaultInjector, FaultRule, fixed, statement_kind
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+from yueshu_airbyte_connector.nebula_client import NebulaClient, NebulaClientError
+
+
+def _setup(rules, hosts=("h1:9669", "h2:9669"), **kwargs):
+    backend = MemoryBackend("g")
+    backend.add_node_type("Item", ["id"], primary_key=["id"])
+    injector = FaultInjector(backend.factory, rules, seed=1)
+    kwargs.setdefault("keepalive_interval", 0)
+    client = NebulaClient(list(hosts), "root", "root", client_factory=injector.factory, **kwargs)
+    client.connect()
+    return backend, injector, client
+
+
+def _inserts(n):
+    return [f"INSERT OR IGNORE (@Item{{id: {i}}})" for i in range(n)]
+
+
+def test_statement_kind():
+    assert statement_kind("USE g") == "session"
+    assert statement_kind("DESC GRAPH TYPE t") == "schema"
+    assert statement_kind("TABLE INSERT OR IGNORE (@A{id: 1})") == "vertex"
+    assert statement_kind("TABLE MATCH (src@A{id: 1}), (dst@A{id: 2}) INSERT (src)-[@E{}]->(dst)") == "edge"
+    assert statement_kind("MATCH (v) RETURN v") == "read"
+    print("✓ 语句分类测试通过")
+
+
+def test_dropped_sessions_are_retried():
+    """会话断开时重试到其它会话，所有语句最终写入"""
+    backend, injector, client = _setup(
+        [FaultRule(statements=("vertex",), drop_rate=0.05)], max_sessions=2, max_retries=5
+    )
+    try:
+        results = client.execute_many(_inserts(200), rows=1)
+    finally:
+        client.close()
+    assert injector.stats.dropped > 0
+    assert all(r.ok for r in results)
+    assert backend.node_count("Item") == 200
+    print("✓ 会话断开重试测试通过")
+
+
+def test_rejections_are_per_statement():
+    """被拒绝的语句单独报错，不影响同一批次的其它语句"""
+    backend, injector, client = _setup(
+        [FaultRule(host="h2:*", statements=("vertex",), reject_rate=1.0)],
+        host_selection="round_robin",
+    )
+    try:
+        results = client.execute_many(_inserts(10), rows=1)
+    finally:
+        client.close()
+    failed = [r for r in results if not r.ok]
+    assert failed and len(failed) < 10
+    assert all(isinstance(r.error, NebulaClientError) for r in failed)
+    assert backend.node_count("Item") == 10 - len(failed)
+    assert injector.stats.by_host["h2:9669"]["rejected"] == len(failed)
+    print("✓ 部分拒绝测试通过")
+
+
+def test_slow_host_latency_and_connect_errors():
+    """延迟只注入到匹配的 host；建连失败的 host 被跳过"""
+    backend, injector, client = _setup(
+        [
+            FaultRule(host="h1:*", latency=fixed(0.01)),
+            FaultRule(host="h3:*", connect_error_rate=1.0),
+        ],
+        hosts=("h1:9669", "h2:9669", "h3:9669"),
+        host_selection="round_robin",
+    )
+    try:
+        for query in _inserts(6):
+            client.execute(query)
+    finally:
+        client.close()
+    assert injector.stats.connect_errors >= 1
+    assert "h3:9669" not in {h for h, c in injector.stats.by_host.items() if c.get("statements")}
+    h1 = injector.stats.by_host["h1:9669"]["statements"]
+    assert abs(injector.stats.injected_latency - 0.01 * h1) < 1e-9
+    print("✓ 慢 host 与建连失败测试通过")
+
+
+if __name__ == "__main__":
+    test_statement_kind()
+    test_dropped_sessions_are_retried()
+    test_rejections_are_per_statement()
+    test_slow_host_latency_and_connect_errors()
+    print("\n✅ 所有测试通过!")
@@ -8,9 +8,13 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 
 from yueshu_airbyte_connector.gql_generator import (
+    compile_edge_template,
+    compile_mapping_template,
+    compile_vertex_template,
     generate_gql_from_mapping,
     transform_flat_config_to_mapping,
 )
+from yueshu_airbyte_connector.schema_reader import EdgeSchema, PropertySchema, VertexSchema
 
 
 def test_vertex_mapping():
@@ -176,6 +180,92 @@ def test_edge_without_multiedge_key():
     print("✅ 测试通过\n")
 
 
+def test_compiled_templates():
+    """测试预编译模板：写入模式编译进语句，参数化语句文本稳定"""
+    print("=" * 60)
+    print("测试 5: 预编译语句模板")
+    print("=" * 60)
+
+    tag = VertexSchema(
+        "Actor",
+        [
+            PropertySchema("id", "int64"),
+            PropertySchema("name", "string"),
+            PropertySchema("birthDate", "date"),
+        ],
+    )
+    template = compile_vertex_template(
+        tag, {"id": "id", "name": "name", "birth": "birthDate"}, "INSERT OR IGNORE", table=True
+    )
+    record = {"id": "1001", "name": "Tom Hanks", "birth": "1956-07-09"}
+    gql = template.render(record)
+    print(f"生成 GQL:\n{gql}\n")
+    assert gql == 'TABLE INSERT OR IGNORE (@Actor{id: 1001, name: "Tom Hanks", birthDate: date("1956-07-09")})'
+
+    text, params = template.bind(record)
+    assert text == "TABLE INSERT OR IGNORE (@Actor{id: $p0, name: $p1, birthDate: date($p2)})"
+    assert params == {"p0": 1001, "p1": "Tom Hanks", "p2": "1956-07-09"}
+    other_text, _ = template.bind({"id": 7, "name": 'say "hi"', "birth": "2000-01-01"})
+    assert other_text == text
+
+    edge = EdgeSchema("Act", [PropertySchema("roleName", "string")])
+    edge_template = compile_edge_template(
+        edge, "Actor", "Movie",
+        {"actor_id": "_src.id", "movie_id": "_dst.id", "role_id": "_ranking", "role": "roleName"},
+        "INSERT OR REPLACE", table=True,
+    )
+    gql = edge_template.render({"actor_id": 1, "movie_id": 2, "role_id": 3, "role": "Forrest"})
+    assert gql == (
+        'TABLE MATCH (src@Actor{id: 1}), (dst@Movie{id: 2}) '
+        'INSERT OR REPLACE (src)-[@Act:3{roleName: "Forrest"}]->(dst)'
+    )
+
+    # 模板与逐条生成的结果一致
+    mapping_config = {
+        "mapping": {
+            "type": "edge",
+            "label": "Act",
+            "src_vertex": {"label": "Actor", "primary_key": {"source_field": "a", "dest_field": "id"}},
+            "dst_vertex": {"label": "Movie", "primary_key": {"source_field": "m", "dest_field": "id"}},
+            "properties": [{"source_field": "since", "dest_field": "since", "transform": "date"}],
+        }
+    }
+    record = {"a": 1, "m": "x", "since": "2020-01-01"}
+    expected = generate_gql_from_mapping(mapping_config, record)
+    assert compile_mapping_template(mapping_config).render(record) == expected
+    print("✅ 测试通过\n")
+
+
+def test_template_keys():
+    """测试模板的元素标识：点按主键，边按端点与 rank；主键未知时按类型"""
+    print("=" * 60)
+    print("测试 6: 写入元素标识")
+    print("=" * 60)
+
+    tag = VertexSchema(
+        "Actor", [PropertySchema("id", "int64", nullable=False), PropertySchema("name", "string")]
+    )
+    template = compile_vertex_template(tag, {"uid": "id", "name": "name"})
+    assert template.key({"uid": 1, "name": "a"}) == template.key({"uid": 1, "name": "b"})
+    assert template.key({"uid": 1}) != template.key({"uid": 2})
+    assert template.column_keys({"uid": [1, 2], "name": ["a", "b"]}, 2) == [
+        template.key({"uid": 1}), template.key({"uid": 2}),
+    ]
+    # schema 中没有主键信息时同一类型共用一个键
+    unknown = compile_vertex_template(VertexSchema("Tag", [PropertySchema("id", "int64")]), {"id": "id"})
+    assert unknown.key({"id": 1}) == unknown.key({"id": 2})
+
+    edge = compile_edge_template(
+        EdgeSchema("Act", [PropertySchema("roleName", "string")]), "Actor", "Movie",
+        {"a": "_src.id", "m": "_dst.id", "r": "_ranking", "role": "roleName"},
+    )
+    assert edge.key({"a": 1, "m": 2, "r": 0, "role": "x"}) == edge.key({"a": 1, "m": 2, "r": 0, "role": "y"})
+    assert edge.key({"a": 1, "m": 2, "r": 0}) != edge.key({"a": 1, "m": 2, "r": 1})
+    mapping = compile_mapping_template({"mapping": {"type": "vertex", "label": "P", "primary_key": {"source_field": "id"}}})
+    assert mapping.key({"id": [1]}) == mapping.key({"id": [1]})
+    print("✅ 测试通过\n")
+
+
 if __name__ == "__main__":
     print("\n" + "=" * 60)
     print("GQL 生成器测试套件")
@@ -186,6 +276,8 @@ if __name__ == "__main__":
         test_edge_mapping()
         test_flat_config_conversion()
         test_edge_without_multiedge_key()
+        test_compiled_templates()
+        test_template_keys()
         
         print("=" * 60)
         print("✅ 所有测试通过！")
@@ -0,0 +1,191 @@
+"""
+测试整图快照导出（export 命令）
+"""
+import gzip
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.graph_export import MANIFEST, PROGRESS, export, plan_partitions
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+
+CONFIG = {"hosts": ["h1:9669"], "username": "root", "password": "root", "graph": "movie", "max_sessions": 3}
+
+
+def _backend(actors=95, movies=12):
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    backend.add_edge_type("Act", ["roleName"])
+    client = backend.factory([], "root", "root")
+    for i in range(actors):
+        client.execute(f'INSERT (@Actor{{id: {i}, name: "演员{i}"}})')
+    for i in range(movies):
+        client.execute(f'INSERT (@Movie{{id: {i}, title: "m{i}"}})')
+    for i in range(actors):
+        client.execute(
+            f"MATCH (src@Actor{{id: {i}}}), (dst@Movie{{id: {i % movies}}}) "
+            f'INSERT (src)-[@Act{{roleName: "r{i}"}}]->(dst)'
+        )
+    return backend
+
+
+def _read_jsonl(directory, manifest, label):
+    rows = []
+    for p in manifest["partitions"]:
+        if p["label"] == label:
+            with gzip.open(directory / p["file"], "rt", encoding="utf-8") as f:
+                rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_plan_partitions():
+    """按 element_id 边界切分，第一个分区不设下界、最后一个分区不设上界；没有边界时只有一个分区"""
+    parts = plan_partitions("vertex", "Actor", ["a", "m"], ".jsonl.gz")
+    assert [(p.lower, p.upper) for p in parts] == [(None, "a"), ("a", "m"), ("m", None)]
+    assert parts[0].file == "vertices/Actor/part-00000.jsonl.gz"
+    assert [(p.lower, p.upper) for p in plan_partitions("edge", "Act", [], ".parquet")] == [(None, None)]
+    print("✓ 分区划分测试通过")
+
+
+def test_export_uses_keyset_pages(tmp_path):
+    """分区与分页都按 element_id 键集分页，扫描语句不使用 SKIP 跳过之前的行"""
+    backend = _backend(actors=50, movies=5)
+    queries = []
+
+    def factory(hosts, username, password):
+        client = backend.factory(hosts, username, password)
+        execute = client.execute
+
+        def recording_execute(query, *, timeout=None):
+            queries.append(query)
+            return execute(query, timeout=timeout)
+
+        client.execute = recording_execute
+        return client
+
+    summary = export(CONFIG, str(tmp_path), page_size=6, partition_rows=20, client_factory=factory)
+    assert summary["rows"] == 105
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    actors = [p for p in manifest["partitions"] if p["label"] == "Actor"]
+    assert len(actors) == 3 and actors[0]["lower"] is None and actors[-1]["upper"] is None
+    assert [p["upper"] for p in actors[:-1]] == [p["lower"] for p in actors[1:]]
+
+    pages = [q for q in queries if "RETURN v, element_id(v)" in q or "RETURN e, element_id(e)" in q]
+    assert pages and not any("SKIP" in q for q in pages)
+    # 每个分区 ceil(rows / 6) 页（整页结尾时多一页空页），不是每页重新扫描
+    assert len(pages) <= sum(-(-20 // 6) + 1 for _ in manifest["partitions"])
+    boundaries = [q for q in queries if "SKIP" in q]
+    assert len(boundaries) == 2 + 2 and all("SKIP 19 LIMIT 1" in q for q in boundaries)
+    assert sorted(a["properties"]["id"] for a in _read_jsonl(tmp_path, manifest, "Actor")) == list(range(50))
+    print("✓ 键集分页测试通过")
+
+
+def test_export_jsonl_and_resume(tmp_path):
+    """并发分页扫描全部类型；中断后重新 export 只扫描未完成的分区"""
+    backend = _backend()
+    summary = export(CONFIG, str(tmp_path), page_size=7, partition_rows=20, client_factory=backend.factory)
+    assert summary["rows"] == 95 + 12 + 95
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    assert manifest["complete"] is True
+    assert manifest["rows"] == {"vertex:Actor": 95, "vertex:Movie": 12, "edge:Act": 95}
+    actors = _read_jsonl(tmp_path, manifest, "Actor")
+    assert sorted(a["properties"]["id"] for a in actors) == list(range(95))
+    assert {e["properties"]["roleName"] for e in _read_jsonl(tmp_path, manifest, "Act")} == {f"r{i}" for i in range(95)}
+
+    # 模拟中断：只保留前两个已完成的分区
+    progress = tmp_path / PROGRESS
+    lines = progress.read_text(encoding="utf-8").splitlines()
+    progress.write_text("\n".join(lines[:2]) + "\n", encoding="utf-8")
+    summary = export(CONFIG, str(tmp_path), page_size=7, partition_rows=20, client_factory=backend.factory)
+    assert summary["skipped_partitions"] == 2
+    assert summary["rows"] == 202 - sum(json.loads(line)["rows"] for line in lines[:2])
+    assert sorted(a["properties"]["id"] for a in _read_jsonl(tmp_path, manifest, "Actor")) == list(range(95))
+
+    with pytest.raises(ValueError):
+        export(CONFIG, str(tmp_path), fmt="parquet", client_factory=backend.factory)
+    print("✓ JSONL 导出与续传测试通过")
+
+
+def test_export_partitions_use_stable_order(tmp_path, monkeypatch):
+    """未排序的扫描每次返回的顺序可能不同；分区按 element_id 排序后不重叠、不遗漏"""
+    backend = _backend()
+    rng = random.Random(3)
+    scan = backend._scan
+
+    def unstable_scan(store, to_row, **groups):
+        if not groups["order"]:
+            store = {l: dict(rng.sample(list(entries.items()), len(entries))) for l, entries in store.items()}
+        return scan(store, to_row, **groups)
+
+    monkeypatch.setattr(backend, "_scan", unstable_scan)
+    export(CONFIG, str(tmp_path), page_size=6, partition_rows=10, client_factory=backend.factory)
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    assert sorted(a["properties"]["id"] for a in _read_jsonl(tmp_path, manifest, "Actor")) == list(range(95))
+    assert sorted(e["properties"]["roleName"] for e in _read_jsonl(tmp_path, manifest, "Act")) == sorted(
+        f"r{i}" for i in range(95)
+    )
+    print("✓ 分区稳定排序测试通过")
+
+
+def test_export_parquet(tmp_path):
+    """Parquet 分区把 properties 展开为列"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    backend = _backend(actors=30, movies=5)
+    summary = export(
+        CONFIG, str(tmp_path), fmt="parquet", workers=2, page_size=8, partition_rows=16,
+        client_factory=backend.factory,
+    )
+    assert summary["rows"] == 65
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    files = [p["file"] for p in manifest["partitions"] if p["label"] == "Actor"]
+    table = pq.read_table([str(tmp_path / f) for f in files][0])
+    assert {"_labels", "id", "name"} <= set(table.column_names)
+    ids = sorted(i for f in files for i in pq.read_table(str(tmp_path / f)).column("id").to_pylist())
+    assert ids == list(range(30))
+    # 每页写为一个 row group，不在内存中汇总整个分区
+    full = next(p for p in manifest["partitions"] if p["label"] == "Actor" and p["upper"] is not None)
+    assert pq.ParquetFile(str(tmp_path / full["file"])).num_row_groups == 2
+    print("✓ Parquet 导出测试通过")
+
+
+def test_export_parquet_null_first_page(tmp_path):
+    """第一页全为空值的列按字符串保存，后续页的值写入同一列"""
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Award", ["id", "year"], primary_key=["id"])
+    client = backend.factory([], "root", "root")
+    for i in range(10, 30):
+        client.execute(f"INSERT (@Award{{id: {i}, year: {'NULL' if i < 18 else 2000 + i}}})")
+    export(CONFIG, str(tmp_path), fmt="parquet", page_size=8, client_factory=backend.factory)
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    table = pq.read_table(str(tmp_path / manifest["partitions"][0]["file"]))
+    assert table.schema.field("year").type == pa.string()
+    assert table.column("year").to_pylist() == [None] * 8 + [str(2000 + i) for i in range(18, 30)]
+    print("✓ Parquet 空值列测试通过")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_plan_partitions()
+    for test in (
+        test_export_jsonl_and_resume,
+        test_export_uses_keyset_pages,
+        test_export_parquet,
+        test_export_parquet_null_first_page,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,184 @@
+"""
+测试内存 Yueshu 替身 MemoryBackend
+"""
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import common, destination, source
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+from yueshu_airbyte_connector.nebula_client import NebulaClient, NebulaTimeoutError
+from yueshu_airbyte_connector.schema_reader import read_graph_schema
+
+
+def _movie_backend(**kwargs):
+    backend = MemoryBackend("movie", **kwargs)
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    backend.add_edge_type("Act", ["roleName"])
+    return backend
+
+
+def test_insert_modes():
+    """INSERT 主键冲突报错，OR IGNORE / OR REPLACE / OR UPDATE 按语义处理"""
+    backend = _movie_backend()
+    client = backend.factory([], "root", "root")
+
+    assert client.execute('INSERT (@Actor{id: 1, name: "A \\"Tom\\""})').is_succeeded
+    assert backend.nodes["Actor"][(1,)] == {"id": 1, "name": 'A "Tom"'}
+    failed = client.execute('INSERT (@Actor{id: 1, name: "B"})')
+    assert not failed.is_succeeded and "主键冲突" in failed.error_msg
+
+    client.execute('TABLE INSERT OR IGNORE (@Actor{id: 1, name: "B"}), (@Actor{id: 2})')
+    assert backend.nodes["Actor"][(1,)]["name"] == 'A "Tom"'
+    client.execute("INSERT OR UPDATE (@Actor{id: 2, name: \"C\"})")
+    client.execute("INSERT OR REPLACE (@Actor{id: 1})")
+    assert backend.nodes["Actor"] == {(1,): {"id": 1}, (2,): {"id": 2, "name": "C"}}
+
+    client.execute('INSERT (@Movie{id: 10, title: date("2024-01-01")})')
+    client.execute(
+        'TABLE MATCH (src@Actor{id: 1}), (dst@Movie{id: 10}) '
+        'INSERT OR IGNORE (src)-[@Act:3{roleName: "Lead"}]->(dst)'
+    )
+    # 端点不存在时 MATCH 为空，不插入边
+    client.execute(
+        "MATCH (src@Actor{id: 9}), (dst@Movie{id: 10}) INSERT (src)-[@Act{}]->(dst)"
+    )
+    assert backend.edge_count("Act") == 1
+
+    rows = client.execute("MATCH ()-[e@Act]->() RETURN e").as_primitive_by_row()
+    assert rows[0]["e"]["rank"] == 3
+    assert rows[0]["e"]["properties"] == {"roleName": "Lead"}
+    assert client.execute("MATCH (v@Actor) RETURN count(v)").as_primitive_by_row() == [
+        {"count(v)": 2}
+    ]
+    assert not client.execute("DELETE (v)").is_succeeded
+    print("✓ 写入语义测试通过")
+
+
+def test_schema_and_timeout():
+    """DESC GRAPH / DESC GRAPH TYPE 与 schema_reader 兼容；延迟超过超时时触发超时"""
+    backend = _movie_backend(latency=lambda q: 0.2 if q.startswith("MATCH") else 0.0)
+    client = NebulaClient(
+        ["h1:9669"], "root", "root",
+        keepalive_interval=0, statement_timeout=0.05, client_factory=backend.factory,
+    )
+    client.connect()
+    try:
+        schema = read_graph_schema(client, "movie")
+        assert sorted(schema.vertices) == ["Actor", "Movie"]
+        assert [p.name for p in schema.edges["Act"].properties] == ["roleName"]
+        try:
+            client.execute("MATCH (v) RETURN v")
+        except NebulaTimeoutError:
+            pass
+        else:
+            raise AssertionError("应当超时")
+    finally:
+        client.close()
+    print("✓ schema 与超时测试通过")
+
+
+def test_end_to_end_write_and_read(monkeypatch):
+    """destination.write 与 source.read 通过 client_factory 在内存后端上端到端运行"""
+    backend = _movie_backend(latency=0.0005)
+    catalog = {
+        "streams": [
+            {"stream": {"name": "actors"}, "config": {"tag": "Actor", "field_mapping": {"id": "id", "name": "name"}}},
+            {"stream": {"name": "movies"}, "config": {"tag": "Movie", "field_mapping": {"id": "id", "title": "title"}}},
+            {
+                "stream": {"name": "acts"},
+                "config": {
+                    "edge": "Act", "src_tag": "Actor", "dst_tag": "Movie",
+                    "field_mapping": {"actor": "_src.id", "movie": "_dst.id", "role": "roleName"},
+                },
+            },
+        ]
+    }
+    lines = []
+    for i in range(20):
+        lines.append({"stream": "actors", "data": {"id": i, "name": f"a{i}"}})
+        lines.append({"stream": "movies", "data": {"id": i, "title": f"m{i}"}})
+    for i in range(20):
+        lines.append({"stream": "acts", "data": {"actor": i, "movie": (i + 1) % 20, "role": "r"}})
+    lines = [json.dumps({"type": "RECORD", "record": record}) for record in lines]
+
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(catalog))
+    out = io.StringIO()
+    common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+    try:
+        destination.write(
+            {"hosts": ["h1:9669"], "graph": "movie", "batch_size": 8, "max_sessions": 4},
+            lines,
+            client_factory=backend.factory,
+        )
+    finally:
+        common.uninstall_emitter()
+    assert backend.node_count("Actor") == 20
+    assert backend.node_count("Movie") == 20
+    assert backend.edge_count("Act") == 20
+
+    read_catalog = {
+        "streams": [{"stream": {"name": "count"}, "config": {"read_query": "MATCH ()-[e@Act]->() RETURN count(e)"}}]
+    }
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(read_catalog))
+    out = io.StringIO()
+    common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+    try:
+        source.read(
+            {"hosts": ["h1:9669"], "username": "root", "password": "root"},
+            client_factory=backend.factory,
+        )
+    finally:
+        common.uninstall_emitter()
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    records = [m for m in records if m["type"] == "RECORD"]
+    assert records[0]["record"]["data"]["payload"] == str({"count(e)": [20]})
+    print("✓ 端到端写入与读取测试通过")
+
+
+def _people_client(count):
+    backend = MemoryBackend("g")
+    backend.add_node_type("P", ["id"])
+    raw = backend.factory([], "root", "root")
+    for i in range(count):
+        raw.execute(f"INSERT (@P{{id: {i}}})")
+    client = NebulaClient(["h1:9669"], "root", "root", keepalive_interval=0, client_factory=backend.factory)
+    client.connect()
+    return backend, client
+
+
+def test_paged_read(monkeypatch):
+    """配置了 page_size 的读查询每页输出一条 RECORD，payload 与整体读取的格式一致"""
+    backend, client = _people_client(23)
+    client.close()
+    catalog = {
+        "streams": [
+            {"stream": {"name": "people"}, "config": {"read_query": "MATCH (v@P) RETURN v ORDER BY element_id(v)", "page_size": 10}},
+        ]
+    }
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(catalog))
+    for mode in ("sync", "asyncio"):
+        out = io.StringIO()
+        common.install_emitter(common.BufferedEmitter(stream=out), handle_signals=False)
+        try:
+            source.read(
+                {"hosts": ["h1:9669"], "username": "root", "password": "root", "execution_mode": mode},
+                client_factory=backend.factory,
+            )
+        finally:
+            common.uninstall_emitter()
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        data = [m["record"]["data"] for m in records if m["type"] == "RECORD"]
+        assert [d["page"] for d in data] == [0, 1, 2], mode
+        assert data[2]["payload"] == str({"v": [{"labels": ["P"], "properties": {"id": i}} for i in range(20, 23)]})
+    print("✓ 分页 source.read 测试通过")
+
+
+if __name__ == "__main__":
+    test_insert_modes()
+    test_schema_and_timeout()
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,96 @@
+"""
+测试 Metrics 模块
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.metrics import Histogram, MetricsRegistry, encoded_size
+
+
+def test_histogram_quantile():
+    """直方图按桶上界估算分位数"""
+    hist = Histogram(buckets=(0.01, 0.1, 1.0))
+    for _ in range(90):
+        hist.observe(0.005)
+    for _ in range(10):
+        hist.observe(0.5)
+    assert hist.count == 100
+    assert hist.quantile(0.5) == 0.01
+    assert hist.quantile(0.99) == 1.0
+    hist.observe(5.0)
+    assert hist.quantile(1.0) == float("inf")
+    print("✓ Histogram 测试通过")
+
+
+def test_registry_summary():
+    """汇总 stream 计数、阶段耗时、延迟与事件"""
+    registry = MetricsRegistry(connector="destination", progress_interval=0)
+    registry.add_records("actors", 2, 100)
+    registry.add_records("movies", 1, 50)
+    registry.add_stage_time("generate", 0.5)
+    with registry.timed("execute"):
+        pass
+    registry.observe_execute("h1:9669", 0.02)
+    registry.inc("rejects")
+    registry.inc_retry("h1:9669")
+
+    summary = registry.summary()
+    assert summary["records"] == 3
+    assert summary["bytes"] == 150
+    assert summary["streams"]["actors"] == {"records": 2, "bytes": 100}
+    assert summary["stages"]["generate"]["seconds"] == 0.5
+    assert summary["stages"]["execute"]["count"] == 1
+    assert summary["execute_latency"]["h1:9669"]["count"] == 1
+    assert summary["retries"] == {"h1:9669": 1}
+    assert summary["events"] == {"rejects": 1}
+    print("✓ MetricsRegistry 汇总测试通过")
+
+
+def test_prometheus_textfile(tmp_path):
+    """写出 Prometheus textfile"""
+    registry = MetricsRegistry(connector="source", progress_interval=0)
+    registry.add_records("q1", 5, 500)
+    registry.observe_execute("h1:9669", 0.003)
+    path = tmp_path / "yueshu.prom"
+    registry.write_textfile(str(path))
+
+    text = path.read_text(encoding="utf-8")
+    assert 'yueshu_records_total{connector="source",stream="q1"} 5' in text
+    assert 'yueshu_execute_latency_seconds_bucket{connector="source",host="h1:9669",le="+Inf"} 1' in text
+    assert 'yueshu_execute_latency_seconds_count{connector="source",host="h1:9669"} 1' in text
+    print("✓ Prometheus textfile 测试通过")
+
+
+def test_prometheus_escapes_label_values():
+    """标签值中的反斜杠、双引号与换行按 Prometheus 文本格式转义"""
+    registry = MetricsRegistry(connector="source", progress_interval=0)
+    registry.add_records('a"b\\c\nd', 1, 10)
+    registry.inc_retry("h1:9669")
+    text = registry.to_prometheus()
+    assert 'yueshu_records_total{connector="source",stream="a\\"b\\\\c\\nd"} 1' in text
+    assert 'yueshu_retries_total{connector="source",host="h1:9669"} 1' in text
+    assert all(line.startswith(("#", "yueshu_")) for line in text.splitlines())
+    print("✓ Prometheus 标签转义测试通过")
+
+
+def test_encoded_size():
+    """字节数按 UTF-8 编码计算"""
+    assert encoded_size("abc") == 3
+    assert encoded_size("演员") == 6
+    assert encoded_size(b"\xe6\xbc\x94") == 3
+    print("✓ 字节数测试通过")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_histogram_quantile()
+    test_registry_summary()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_prometheus_textfile(pathlib.Path(tmp))
+    test_prometheus_escapes_label_values()
+    test_encoded_size()
+    print("\n✅ 所有测试通过!")
@@ -0,0 +1,531 @@
+"""
+测试 NebulaClient 会话池：故障转移、会话驱逐、重连与 host 选择
+"""
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.memory_backend import MemoryBackend
+from yueshu_airbyte_connector.nebula_client import (
+    HostSelector,
+    NebulaClient,
+    NebulaClientError,
+    NebulaTimeoutError,
+    SessionPool,
+    SlowStatementWatchdog,
+    is_connection_error,
+    split_window,
+)
+from yueshu_airbyte_connector.schema_reader import read_graph_schema
+
+
+class ExecutingError(Exception):
+    """模拟驱动的 ExecutingError：任何 RPC 失败都包装为该异常"""
+
+
+class RpcError(Exception):
+    """模拟 grpc.RpcError，code() 返回状态码"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._name = name
+
+    def code(self):
+        return type("StatusCode", (), {"name": self._name})()
+
+
+def _rpc_error(name, details):
+    """与驱动相同：RpcError 作为 ExecutingError 的 __cause__"""
+    try:
+        raise ExecutingError(f"RPC error: {details}") from RpcError(name)
+    except ExecutingError as exc:
+        return exc
+
+
+class FakeResult:
+    def __init__(self, query, host):
+        self.query = query
+        self.host = host
+        self.is_succeeded = True
+
+
+class FailedResult:
+    is_succeeded = False
+    error_msg = "syntax error"
+
+
+class FakeCluster:
+    """按 host 控制可用性的假驱动"""
+
+    def __init__(self):
+        self.down = set()
+        self.failing = set()
+        self.slow = {}
+        self.created = []
+        self.executed = []
+
+    def factory(self, hosts, username, password):
+        host = hosts[0]
+        if host in self.down:
+            raise ConnectionError(f"{host} refused")
+        cluster = self
+
+        class _Client:
+            closed = False
+
+            def execute(self, query):
+                if host in cluster.down:
+                    raise _rpc_error("UNAVAILABLE", "unavailable")
+                if host in cluster.slow:
+                    time.sleep(cluster.slow[host])
+                cluster.executed.append((host, query))
+                if query in cluster.failing:
+                    return FailedResult()
+                return FakeResult(query, host)
+
+            def close(self):
+                self.closed = True
+
+        client = _Client()
+        self.created.append((host, client))
+        return client
+
+
+def _client(cluster, hosts, **kwargs):
+    kwargs.setdefault("keepalive_interval", 0)
+    client = NebulaClient(hosts, "root", "root", client_factory=cluster.factory, **kwargs)
+    client.connect()
+    return client
+
+
+def test_connect_skips_dead_host():
+    """启动时跳过不可用 host"""
+    cluster = FakeCluster()
+    cluster.down.add("h1:9669")
+    client = _client(cluster, ["h1:9669", "h2:9669"])
+    try:
+        for _ in range(5):
+            assert client.execute("RETURN 1").host == "h2:9669"
+    finally:
+        client.close()
+    print("✓ 启动故障转移测试通过")
+
+
+def test_execute_fails_over_on_connection_error():
+    """执行中 host 失效时驱逐会话并在其它 host 重试；重试与延迟按执行的 host 计入 metrics"""
+    from yueshu_airbyte_connector.metrics import reset_registry
+
+    metrics = reset_registry("destination")
+    cluster = FakeCluster()
+    client = _client(cluster, ["h1:9669", "h2:9669"], min_sessions=1, max_sessions=1)
+    try:
+        first = client.execute("RETURN 1")
+        cluster.down.add(first.host)
+        second = client.execute("RETURN 2")
+        assert second.host != first.host
+        assert client.pool.host_states[first.host].healthy is False
+        assert client.pool.stats()["total"] == 1
+        assert metrics.retries == {first.host: 1}
+        assert metrics.latency[first.host].count == 2
+        assert metrics.latency[second.host].count == 1
+    finally:
+        client.close()
+    print("✓ 执行故障转移测试通过")
+
+
+def test_all_hosts_down_raises():
+    """所有 host 不可用时抛出 NebulaClientError"""
+    cluster = FakeCluster()
+    client = _client(cluster, ["h1:9669"])
+    try:
+        cluster.down.add("h1:9669")
+        with pytest.raises(NebulaClientError):
+            client.execute("RETURN 1")
+    finally:
+        client.close()
+    print("✓ 全部不可用测试通过")
+
+
+def test_statement_error_not_retried():
+    """语句级的 ExecutingError 不重试，也不把 host 标记为不可用"""
+    assert is_connection_error(_rpc_error("UNAVAILABLE", "unavailable"))
+    assert is_connection_error(ConnectionResetError("reset"))
+    assert not is_connection_error(_rpc_error("INVALID_ARGUMENT", "syntax error"))
+    assert not is_connection_error(ExecutingError("Unexpected error during execute"))
+
+    attempts = []
+
+    class _Client:
+        def execute(self, query):
+            if query.startswith("INSERT"):
+                attempts.append(query)
+                raise _rpc_error("INVALID_ARGUMENT", "semantic error")
+            return FakeResult(query, "h")
+
+        def close(self):
+            pass
+
+    client = NebulaClient(
+        ["h1:9669", "h2:9669"], "root", "root", keepalive_interval=0,
+        client_factory=lambda hosts, username, password: _Client(),
+    )
+    client.connect()
+    try:
+        with pytest.raises(NebulaClientError):
+            client.execute("INSERT (@T{id: 1})")
+        assert len(attempts) == 1
+        assert client.pool.healthy_hosts() == ["h1:9669", "h2:9669"]
+        assert client.execute("RETURN 1").query == "RETURN 1"
+    finally:
+        client.close()
+    print("✓ 语句错误不重试测试通过")
+
+
+def test_pool_max_sessions_and_reuse():
+    """checkout 达到上限后等待，归还后复用"""
+    cluster = FakeCluster()
+    pool = SessionPool(["h1:9669"], "root", "root", client_factory=cluster.factory,
+                       min_sessions=1, max_sessions=2, keepalive_interval=0)
+    pool.start()
+    try:
+        a = pool.checkout()
+        b = pool.checkout()
+        with pytest.raises(NebulaClientError):
+            pool.checkout(timeout=0.01)
+        pool.checkin(a)
+        assert pool.checkout(timeout=0.01) is a
+        pool.checkin(a)
+        pool.checkin(b)
+        assert len(cluster.created) == 2
+    finally:
+        pool.close()
+    print("✓ 会话上限与复用测试通过")
+
+
+def test_keepalive_recovers_host():
+    """后台探测恢复不健康的 host，并补足最小会话数"""
+    cluster = FakeCluster()
+    pool = SessionPool(["h1:9669"], "root", "root", client_factory=cluster.factory,
+                       min_sessions=1, max_sessions=2, keepalive_interval=0.02)
+    pool.start()
+    try:
+        session = pool.checkout()
+        cluster.down.add("h1:9669")
+        pool.checkin(session, broken=True)
+        assert pool.host_states["h1:9669"].healthy is False
+        cluster.down.clear()
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and not pool.host_states["h1:9669"].healthy:
+            time.sleep(0.01)
+        assert pool.host_states["h1:9669"].healthy is True
+        assert pool.stats()["total"] >= 1
+    finally:
+        pool.close()
+    print("✓ 健康探测恢复测试通过")
+
+
+def test_p2c_prefers_fast_host():
+    """p2c 策略优先选择延迟低、在途请求少的 host"""
+    selector = HostSelector(["fast", "slow"], policy="p2c", rng=random.Random(1))
+    for _ in range(10):
+        selector.record("fast", 0.01)
+        selector.record("slow", 0.5)
+    picks = [selector.choose() for _ in range(100)]
+    assert picks.count("fast") == 100
+
+    # fast 上在途请求足够多时转向 slow
+    for _ in range(100):
+        selector.begin("fast")
+    assert selector.choose() == "slow"
+    print("✓ p2c 选择测试通过")
+
+
+def test_error_rate_ejects_host():
+    """错误率过高的 host 被暂时剔除"""
+    selector = HostSelector(["h1", "h2"], policy="round_robin", eject_min_samples=3,
+                            eject_duration=60)
+    for _ in range(5):
+        selector.record("h1", None, error=True)
+    assert selector.available() == ["h2"]
+    assert {selector.choose() for _ in range(10)} == {"h2"}
+
+    selector.states["h1"].ejected_until = 0
+    assert selector.available() == ["h1", "h2"]
+    print("✓ 错误率剔除测试通过")
+
+
+def test_execute_hedged_uses_faster_host():
+    """主请求超过对冲延迟时在另一个 host 上重发，采用先返回的结果"""
+    from yueshu_airbyte_connector.metrics import reset_registry
+
+    metrics = reset_registry("source")
+    cluster = FakeCluster()
+    cluster.slow["h1:9669"] = 0.5
+    client = _client(cluster, ["h1:9669", "h2:9669"], max_sessions=4)
+    client.pool.selector.choose = lambda: "h1:9669"
+    try:
+        start = time.monotonic()
+        result = client.execute_hedged("MATCH (v) RETURN v", delay=0.05)
+        assert time.monotonic() - start < 0.4
+        assert result.host == "h2:9669"
+        assert metrics.events["hedges"] == 1
+        assert metrics.events["hedge_wins"] == 1
+
+        # 主请求及时返回时不对冲
+        cluster.slow.clear()
+        assert client.execute_hedged("MATCH (v) RETURN v", delay=1.0).host == "h1:9669"
+        assert metrics.events["hedges"] == 1
+    finally:
+        client.close()
+    print("✓ 对冲读测试通过")
+
+
+def test_session_statements_replayed_on_other_sessions():
+    """USE / SESSION SET 在池中其它会话首次使用前重放，且每个会话只重放一次"""
+    cluster = FakeCluster()
+    client = _client(cluster, ["h1:9669"], max_sessions=2, min_sessions=2)
+    try:
+        client.execute("USE g")
+        client.execute("SESSION SET GRAPH g")
+        # 占用执行过会话语句的会话，迫使后续语句使用另一个会话
+        held = client.pool.checkout()
+        client.execute("RETURN 1")
+        client.pool.checkin(held)
+        for _ in range(4):
+            client.execute("RETURN 1")
+        queries = [q for _, q in cluster.executed]
+        assert queries.count("USE g") == 2
+        assert queries.count("SESSION SET GRAPH g") == 2
+        assert queries.index("USE g") < queries.index("SESSION SET GRAPH g")
+    finally:
+        client.close()
+    print("✓ 会话语句重放测试通过")
+
+
+def test_statement_timeout_not_retried():
+    """超时传给驱动，超时错误不在其它 host 上重试"""
+    calls = []
+
+    class _Client:
+        def execute(self, query, timeout=None):
+            calls.append((query, timeout))
+            if query.startswith("MATCH"):
+                raise ExecutingError("RPC error: Deadline Exceeded")
+            return FakeResult(query, "h")
+
+        def close(self):
+            pass
+
+    client = NebulaClient(
+        ["h1:9669", "h2:9669"], "root", "root",
+        keepalive_interval=0,
+        statement_timeout=0.5,
+        client_factory=lambda hosts, username, password: _Client(),
+    )
+    client.connect()
+    try:
+        with pytest.raises(NebulaTimeoutError):
+            client.execute("MATCH (v:Person{name: 'x'}) RETURN v")
+        assert calls == [("MATCH (v:Person{name: 'x'}) RETURN v", 0.5)]
+        # 会话未被驱逐，后续语句照常执行
+        assert client.execute("RETURN 1").query == "RETURN 1"
+    finally:
+        client.close()
+    print("✓ 语句超时测试通过")
+
+
+def test_slow_statement_watchdog(monkeypatch):
+    """在途语句超过阈值时告警，结束时记录最终耗时"""
+    from yueshu_airbyte_connector import nebula_client
+
+    messages = []
+    monkeypatch.setattr(
+        nebula_client._SLOW_LOG, "warn", lambda msg, *args: messages.append(msg % args)
+    )
+    watchdog = SlowStatementWatchdog(threshold=0.01)
+    token = watchdog.begin("h1:9669", "MATCH (v) RETURN v", "actors")
+    time.sleep(0.02)
+    watchdog.check()
+    watchdog.check()
+    watchdog.end(token)
+    assert len(messages) == 2
+    assert "仍在执行" in messages[0] and "stream=actors" in messages[0]
+    assert "慢语句完成" in messages[1] and "大小 18 字节" in messages[1]
+
+    # 未超过阈值的语句不记录
+    watchdog.threshold = 10
+    watchdog.end(watchdog.begin("h1:9669", "RETURN 1", "actors"))
+    assert len(messages) == 2
+    print("✓ 慢语句看门狗测试通过")
+
+
+def test_supports_parameters_probe():
+    """驱动 execute 没有参数入口时退回字面量；有参数入口时探测并传递参数"""
+    cluster = FakeCluster()
+    client = _client(cluster, ["h1:9669"])
+    try:
+        assert client.supports_parameters() is False
+    finally:
+        client.close()
+
+    calls = []
+
+    class _Client:
+        def execute(self, query, params=None):
+            calls.append((query, params))
+            return FakeResult(query, "h1:9669")
+
+        def close(self):
+            pass
+
+    client = NebulaClient(
+        ["h1:9669"], "root", "root",
+        keepalive_interval=0,
+        client_factory=lambda hosts, username, password: _Client(),
+    )
+    client.connect()
+    try:
+        assert client.supports_parameters() is True
+        client.execute("INSERT (@T{id: $p0})", params={"p0": 1})
+        assert calls == [("RETURN $p AS v", {"p": 1}), ("INSERT (@T{id: $p0})", {"p0": 1})]
+    finally:
+        client.close()
+    print("✓ 查询参数探测测试通过")
+
+
+def test_execute_many_results_and_errors():
+    """execute_many 按输入顺序返回每条语句的结果或错误，会话语句作为屏障"""
+    cluster = FakeCluster()
+    cluster.failing.add("BAD")
+    client = _client(cluster, ["h1:9669", "h2:9669"], max_sessions=4)
+    try:
+        queries = ["RETURN 1", "BAD", "USE g", "RETURN 2", "RETURN 3"]
+        results = client.execute_many(queries)
+        assert [r.query for r in results] == queries
+        assert [r.ok for r in results] == [True, False, True, True, True]
+        assert isinstance(results[1].error, NebulaClientError)
+        assert results[3].result.query == "RETURN 2"
+        executed = [q for _, q in cluster.executed]
+        # USE 之后的语句在 USE 执行之后才发出
+        assert executed.index("USE g") < executed.index("RETURN 2")
+        assert executed.index("USE g") > executed.index("RETURN 1")
+    finally:
+        client.close()
+    print("✓ execute_many 测试通过")
+
+
+ORDERED = "MATCH (v@P) RETURN v ORDER BY element_id(v)"
+
+
+def _people_client(count):
+    backend = MemoryBackend("g")
+    backend.add_node_type("P", ["id"])
+    raw = backend.factory([], "root", "root")
+    for i in range(count):
+        raw.execute(f"INSERT (@P{{id: {i}}})")
+    client = NebulaClient(["h1:9669"], "root", "root", keepalive_interval=0, client_factory=backend.factory)
+    client.connect()
+    return backend, client
+
+
+def _ids(pages):
+    return [row["v"]["properties"]["id"] for page in pages for row in page]
+
+
+def test_split_window():
+    """拆出查询末尾的 SKIP / LIMIT；没有窗口时原样返回"""
+    assert split_window("MATCH (v) RETURN v SKIP 3 LIMIT 4;") == ("MATCH (v) RETURN v", 3, 4)
+    assert split_window("MATCH (v) RETURN v LIMIT 4") == ("MATCH (v) RETURN v", 0, 4)
+    assert split_window("MATCH (v) RETURN v skip 7") == ("MATCH (v) RETURN v", 7, None)
+    assert split_window("DESC GRAPH g") == ("DESC GRAPH g", 0, None)
+    print("✓ SKIP/LIMIT 拆分测试通过")
+
+
+def test_execute_iter_pages():
+    """execute_iter 以 SKIP/LIMIT 分页，某页不足 page_size 行时结束；DESC 等语句只执行一次"""
+    backend, client = _people_client(25)
+    try:
+        pages = list(client.execute_iter(ORDERED, page_size=10))
+        assert [len(p) for p in pages] == [10, 10, 5]
+        assert _ids(pages) == list(range(25))
+
+        before = backend.statements
+        rows = [r for page in client.execute_iter("DESC GRAPH TYPE g_type", page_size=1) for r in page]
+        assert len(rows) == 1 and backend.statements - before == 1
+        assert read_graph_schema(client, "g").vertices["P"].properties[0].name == "id"
+    finally:
+        client.close()
+    print("✓ 分页读取测试通过")
+
+
+def test_execute_iter_existing_window():
+    """查询末尾已有 SKIP / LIMIT 时在该窗口内分页，窗口用完即结束"""
+    backend, client = _people_client(25)
+    try:
+        pages = list(client.execute_iter(ORDERED + " SKIP 5 LIMIT 12", page_size=5))
+        assert [len(p) for p in pages] == [5, 5, 2]
+        assert _ids(pages) == list(range(5, 17))
+
+        # 窗口恰好是 page_size 的整数倍：不再多查询一页
+        before = backend.statements
+        pages = list(client.execute_iter(ORDERED + " LIMIT 20", page_size=10))
+        assert [len(p) for p in pages] == [10, 10]
+        assert backend.statements - before == 2
+
+        pages = list(client.execute_iter(ORDERED + " SKIP 18;", page_size=5))
+        assert [len(p) for p in pages] == [5, 2]
+        assert _ids(pages) == list(range(18, 25))
+
+        # 窗口超出结果集：按实际行数结束
+        pages = list(client.execute_iter(ORDERED + " SKIP 20 LIMIT 100", page_size=10))
+        assert _ids(pages) == list(range(20, 25))
+    finally:
+        client.close()
+    print("✓ 已有窗口的分页测试通过")
+
+
+def test_execute_iter_full_last_page():
+    """最后一页恰好 page_size 行时多查询一次空页确认结束，不返回空页"""
+    backend, client = _people_client(20)
+    try:
+        before = backend.statements
+        pages = list(client.execute_iter(ORDERED, page_size=10))
+        assert [len(p) for p in pages] == [10, 10]
+        assert _ids(pages) == list(range(20))
+        assert backend.statements - before == 3
+    finally:
+        client.close()
+    print("✓ 整页结尾的分页测试通过")
+
+
+def test_execute_iter_requires_order_by(monkeypatch):
+    """没有 ORDER BY 的查询每次执行的顺序可能不同，不分页，整体执行一次；带 ORDER BY 的分页不重叠、不遗漏"""
+    backend, client = _people_client(25)
+    rng = random.Random(5)
+    scan = backend._scan
+
+    def unstable_scan(store, to_row, **groups):
+        if not groups["order"]:
+            store = {l: dict(rng.sample(list(entries.items()), len(entries))) for l, entries in store.items()}
+        return scan(store, to_row, **groups)
+
+    monkeypatch.setattr(backend, "_scan", unstable_scan)
+    try:
+        before = backend.statements
+        pages = list(client.execute_iter("MATCH (v@P) RETURN v", page_size=10))
+        assert backend.statements - before == 1
+        assert [len(p) for p in pages] == [10, 10, 5]
+        assert sorted(_ids(pages)) == list(range(25))
+
+        before = backend.statements
+        pages = list(client.execute_iter(ORDERED, page_size=10))
+        assert backend.statements - before == 3
+        assert _ids(pages) == list(range(25))
+    finally:
+        client.close()
+    print("✓ 分页要求 ORDER BY 测试通过")
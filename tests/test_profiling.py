@@ -0,0 +1,45 @@
+"""
+测试 Profiling 模块
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector.profiling import Profiler, parse_modes
+
+
+def _busy(n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def test_parse_modes():
+    """解析模式列表"""
+    assert parse_modes(None) == set()
+    assert parse_modes("cprofile, Sample") == {"cprofile", "sample"}
+    with pytest.raises(ValueError):
+        parse_modes("perf")
+    print("✓ 模式解析测试通过")
+
+
+def test_profiler_writes_outputs(tmp_path):
+    """各模式结果写入输出目录"""
+    profiler = Profiler(
+        ["cprofile", "sample", "tracemalloc"],
+        output_dir=str(tmp_path),
+        label="test-write",
+        sample_interval=0.001,
+    )
+    with profiler:
+        _busy(300000)
+
+    suffixes = sorted(os.path.basename(p).split(".", 1)[1] for p in profiler.outputs)
+    assert suffixes == ["folded", "prof", "tracemalloc.txt", "txt"]
+    for path in profiler.outputs:
+        assert os.path.getsize(path) > 0
+    print("✓ Profiler 输出测试通过")
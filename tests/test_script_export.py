@@ -0,0 +1,207 @@
+"""
+测试导出模式（export_dir）与 apply 回放
+"""
+import gzip
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import common, destination
+from yueshu_airbyte_connector.memory_backend import MemoryBackend, MemoryBackendError
+from yueshu_airbyte_connector.script_export import APPLIED, MANIFEST, apply, iter_statements
+
+CATALOG = {
+    "streams": [
+        {
+            "stream": {"name": "actors"},
+            "config": {
+                "tag": "Actor", "field_mapping": {"id": "id", "name": "name"},
+                "setup_queries": ["SESSION SET TIME ZONE \"+08:00\""],
+            },
+        },
+        {"stream": {"name": "movies"}, "config": {"tag": "Movie", "field_mapping": {"id": "id", "title": "title"}}},
+        {
+            "stream": {"name": "acts"},
+            "config": {
+                "edge": "Act", "src_tag": "Actor", "dst_tag": "Movie",
+                "field_mapping": {"actor": "_src.id", "movie": "_dst.id", "role": "roleName"},
+            },
+        },
+    ]
+}
+
+
+def _backend():
+    backend = MemoryBackend("movie")
+    backend.add_node_type("Actor", ["id", "name"], primary_key=["id"])
+    backend.add_node_type("Movie", ["id", "title"], primary_key=["id"])
+    backend.add_edge_type("Act", ["roleName"])
+    return backend
+
+
+def _lines(count):
+    """边记录在前：apply 按阶段先执行点语句，与输入顺序无关"""
+    def record(stream, data):
+        return json.dumps({"type": "RECORD", "record": {"stream": stream, "data": data}}, ensure_ascii=False)
+
+    lines = [record("acts", {"actor": i, "movie": i % 7, "role": f"角色\n{i}"}) for i in range(count)]
+    lines += [record("actors", {"id": i, "name": f"演员{i}"}) for i in range(count)]
+    lines.append(json.dumps({"type": "STATE", "state": {"data": {"cursor": 1}}}))
+    lines += [record("movies", {"id": i, "title": f"m{i}"}) for i in range(7)]
+    return lines
+
+
+def _export(monkeypatch, backend, directory, count, lines=None, **config):
+    monkeypatch.setenv("AIRBYTE_CATALOG", json.dumps(CATALOG))
+    config = {"hosts": ["h1:9669"], "graph": "movie", "export_dir": str(directory), **config}
+    with open(os.devnull, "w") as sink:
+        common.install_emitter(common.BufferedEmitter(stream=sink), handle_signals=False)
+        try:
+            destination.write(config, lines or _lines(count), client_factory=backend.factory)
+        finally:
+            common.uninstall_emitter()
+
+
+def test_export_writes_shards_and_manifest(monkeypatch, tmp_path):
+    """导出不执行写入；分片文件按 stream 与阶段划分，manifest 记录语句数"""
+    backend = _backend()
+    _export(monkeypatch, backend, tmp_path, 50, export_shards=3)
+    assert backend.node_count() == 0 and backend.edge_count() == 0
+
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    assert manifest["statements"] == 107
+    assert manifest["sharding"] == "key"
+    assert manifest["setup"] == ['SESSION SET TIME ZONE "+08:00"']
+    assert manifest["streams"]["acts"]["phase"] == 1
+    assert manifest["streams"]["movies"] == {"phase": 0, "statements": 7, "bytes": manifest["streams"]["movies"]["bytes"]}
+    # 分片按 key 的哈希选择：每个 stream 最多 3 个分片，分片语句数之和等于 stream 的语句数
+    for name, stream in manifest["streams"].items():
+        shards = [s for s in manifest["shards"] if s["stream"] == name]
+        assert 1 <= len(shards) <= 3
+        assert sum(s["statements"] for s in shards) == stream["statements"]
+    assert len([s for s in manifest["shards"] if s["stream"] == "actors"]) == 3
+    for shard in manifest["shards"]:
+        path = tmp_path / shard["file"]
+        assert shard["file"].endswith(".gql.gz")
+        statements = list(iter_statements(str(path)))
+        assert len(statements) == shard["statements"]
+        assert all(s.startswith("TABLE ") for s in statements)
+    # 字符串中的换行写为转义，每行一条语句
+    edge_shard = next(s for s in manifest["shards"] if s["stream"] == "acts")
+    assert edge_shard["file"].startswith("1-")
+    with gzip.open(tmp_path / edge_shard["file"], "rt", encoding="utf-8") as f:
+        first = f.readline()
+    assert "MATCH" in first and "角色\\n" in first
+
+    with pytest.raises(ValueError):
+        _export(monkeypatch, backend, tmp_path, 1)
+    print("✓ 导出测试通过")
+
+
+def test_apply_runs_phases_and_resumes(monkeypatch, tmp_path):
+    """apply 先执行点语句再执行边语句；已完成的分片在重新 apply 时跳过"""
+    _export(monkeypatch, _backend(), tmp_path, 40, export_shards=2, export_compress=False)
+    backend = _backend()
+    config = {"hosts": ["h1:9669"], "batch_size": 8, "max_sessions": 3}
+    summary = apply(config, str(tmp_path), workers=3, client_factory=backend.factory)
+    assert summary["statements"] == 87
+    assert backend.node_count("Actor") == 40
+    assert backend.node_count("Movie") == 7
+    assert backend.edge_count("Act") == 40
+
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    progress = {}
+    for line in (tmp_path / APPLIED).read_text(encoding="utf-8").splitlines():
+        file, offset = line.split("\t")
+        progress[file] = int(offset)
+    assert progress == {s["file"]: s["statements"] for s in manifest["shards"]}
+    assert summary["shards"] == 6
+    summary = apply(config, str(tmp_path), client_factory=backend.factory)
+    assert summary["skipped_shards"] == 6 and summary["statements"] == 0
+    print("✓ 回放测试通过")
+
+
+def test_apply_keeps_same_key_order(monkeypatch, tmp_path):
+    """同一个点的多次写入落在同一分片并按导出顺序执行，覆盖写入以最后一次为准"""
+    def record(version, i):
+        data = {"id": i, "name": f"演员{i}-v{version}"}
+        return json.dumps({"type": "RECORD", "record": {"stream": "actors", "data": data}}, ensure_ascii=False)
+
+    lines = [record(version, i) for version in range(6) for i in range(10)]
+    _export(monkeypatch, _backend(), tmp_path, 0, lines=lines, export_shards=4, insert_mode="overwrite")
+    manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+    shards = {}
+    for shard in manifest["shards"]:
+        for statement in iter_statements(str(tmp_path / shard["file"])):
+            actor = statement.split("演员")[1].split("-v")[0]
+            assert shards.setdefault(actor, shard["file"]) == shard["file"]
+
+    rng = random.Random(7)
+    backend = _backend()
+    backend.latency = lambda query: rng.random() * 0.002
+    config = {"hosts": ["h1:9669"], "batch_size": 8, "max_sessions": 4}
+    apply(config, str(tmp_path), workers=4, client_factory=backend.factory)
+    names = {props["id"]: props["name"] for props in backend.nodes["Actor"].values()}
+    assert names == {i: f"演员{i}-v5" for i in range(10)}
+    print("✓ 同键写入顺序测试通过")
+
+
+def test_apply_resumes_from_statement_offset(monkeypatch, tmp_path):
+    """apply 中途失败后重新执行时从已完成的批次之后继续，不重复执行已完成的语句"""
+    _export(monkeypatch, _backend(), tmp_path, 40, export_shards=1, insert_mode="insert or ignore")
+    backend = _backend()
+    config = {"hosts": ["h1:9669"], "batch_size": 8, "max_sessions": 2}
+
+    def failing_factory(hosts, username, password):
+        client = backend.factory(hosts, username, password)
+        execute = client.execute
+
+        def execute_or_fail(query, *, timeout=None):
+            if "演员30" in query:
+                raise MemoryBackendError("写入失败")
+            return execute(query, timeout=timeout)
+
+        client.execute = execute_or_fail
+        return client
+
+    with pytest.raises(Exception):
+        apply(config, str(tmp_path), client_factory=failing_factory)
+    actors = next(s for s in json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))["shards"]
+                  if s["stream"] == "actors")
+    progress = {}
+    for line in (tmp_path / APPLIED).read_text(encoding="utf-8").splitlines():
+        file, offset = line.split("\t")
+        progress[file] = max(progress.get(file, 0), int(offset))
+    assert progress[actors["file"]] == 24  # 第 31 条语句所在的第 4 批失败
+
+    before = backend.statements
+    summary = apply(config, str(tmp_path), client_factory=backend.factory)
+    done = sum(progress.values())
+    assert summary["statements"] == 87 - done
+    assert backend.statements - before == 87 - done + 1  # 另有一条 setup 语句
+    assert backend.node_count("Actor") == 40 and backend.edge_count("Act") == 40
+    print("✓ 按语句位置续传测试通过")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    monkeypatch = pytest.MonkeyPatch()
+    try:
+        for test in (
+            test_export_writes_shards_and_manifest,
+            test_apply_runs_phases_and_resumes,
+            test_apply_keeps_same_key_order,
+            test_apply_resumes_from_statement_offset,
+        ):
+            with tempfile.TemporaryDirectory() as tmp:
+                test(monkeypatch, Path(tmp))
+    finally:
+        monkeypatch.undo()
+    print("\n✅ 所有测试通过!")
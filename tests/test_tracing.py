@@ -0,0 +1,54 @@
+"""
+测试 Tracing 模块
+"""
+import gc
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from yueshu_airbyte_connector import tracing
+from yueshu_airbyte_connector.tracing import NullTracer, Tracer
+
+
+def test_null_tracer():
+    """未开启时 span 为空上下文"""
+    tracer = NullTracer()
+    assert not tracer.enabled
+    with tracer.span("noop"):
+        pass
+    print("✓ NullTracer 测试通过")
+
+
+def test_tracer_writes_chrome_trace(tmp_path):
+    """span 与 GC 事件写出为 Chrome trace JSON"""
+    path = tmp_path / "trace.json"
+    tracer = tracing.configure_tracing(str(path))
+    try:
+        with tracer.span("generate", stream="actors"):
+            pass
+        gc.collect()
+    finally:
+        tracing.finish_tracing()
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    events = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    names = {e["name"] for e in events}
+    assert "generate" in names
+    assert "gc" in names
+    generate = next(e for e in events if e["name"] == "generate")
+    assert generate["args"] == {"stream": "actors"}
+    assert generate["dur"] >= 0
+    assert isinstance(tracing.get_tracer(), NullTracer)
+    print("✓ Chrome trace 输出测试通过")
+
+
+def test_tracer_max_events(tmp_path):
+    """超过事件上限后丢弃"""
+    tracer = Tracer(str(tmp_path / "t.json"), max_events=3)
+    for _ in range(5):
+        tracer.add_complete("x", 0.0, 0.001)
+    assert len(tracer.events) == 3
+    assert tracer.dropped == 2
+    print("✓ 事件上限测试通过")